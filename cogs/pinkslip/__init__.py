@@ -12,12 +12,15 @@ from .pinkslip_embeds import EmbedManager
 from .pinkslip_views import (
     PinkSlipSubmissionView,
     PinkSlipReviewView,
+    PinkSlipReviewButton,
     RaceTrackerView,
+    RaceTrackerButton,
     PinkSlipInventoryView,
     VehicleRegistrationModal,
     RegistrationDenialModal,
     InfoRequestModal,
-    TransferConfirmationView
+    TransferConfirmationView,
+    TransferConfirmationButton
 )
 from .pinkslip_validators import ValidationHelper, SecurityHelper, DataFormatter
 
@@ -36,12 +39,15 @@ __all__ = [
     'EmbedManager',
     'PinkSlipSubmissionView',
     'PinkSlipReviewView',
+    'PinkSlipReviewButton',
     'RaceTrackerView',
+    'RaceTrackerButton',
     'PinkSlipInventoryView',
     'VehicleRegistrationModal',
     'RegistrationDenialModal',
     'InfoRequestModal',
     'TransferConfirmationView',
+    'TransferConfirmationButton',
     'ValidationHelper',
     'SecurityHelper',
     'DataFormatter',
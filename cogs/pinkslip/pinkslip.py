@@ -1,4 +1,6 @@
 
+import logging
+import time
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -7,13 +9,17 @@ import aiosqlite
 from .pinkslip_database import PinkslipDatabase
 from .pinkslip_views import (
     PinkSlipSubmissionView, 
-    PinkSlipReviewView, 
+    PinkSlipReviewButton, 
+    RaceTrackerButton, 
     RaceTrackerView, 
+    TransferConfirmationButton, 
     PinkSlipInventoryView
 )
 from .pinkslip_embeds import EmbedManager
 from .pinkslip_validators import ValidationHelper
 
+logger = logging.getLogger(__name__)
+
 class PinkslipCog(commands.Cog):
     """Professional vehicle registration and race tracking system."""
     
@@ -26,11 +32,15 @@ class PinkslipCog(commands.Cog):
     async def cog_load(self) -> None:
         """Initialize the cog and database tables."""
         try:
+            started = time.perf_counter()
             await self.db.initialize()
+            # Warm the guild settings cache before the gateway starts dispatching
+            guilds = await self.db.warm_up()
             self._setup_complete = True
-            print(f"✅ {self.__class__.__name__} loaded successfully")
+            logger.info(f"{self.__class__.__name__} loaded successfully "
+                        f"(warmed {guilds} guild settings in {(time.perf_counter() - started) * 1000:.0f} ms)")
         except Exception as e:
-            print(f"❌ Failed to load {self.__class__.__name__}: {e}")
+            logger.error(f"Failed to load {self.__class__.__name__}: {e}")
             raise
 
     async def _ensure_setup(self) -> bool:
@@ -182,7 +192,7 @@ class PinkslipCog(commands.Cog):
             return
 
         embed = self.embed_manager.create_race_tracker_intro(interaction.guild)
-        view = RaceTrackerView(interaction.user, opponent, self.db, self.embed_manager)
+        view = RaceTrackerView(interaction.user.id, opponent.id)
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
     async def autocomplete_vehicle_id(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
@@ -359,5 +369,6 @@ async def setup(bot: commands.Bot) -> None:
     """Setup function for the cog."""
     cog = PinkslipCog(bot)
     await bot.add_cog(cog)
-    # Add persistent view for review system
-    bot.add_view(PinkSlipReviewView(None, None, None))
+    # Persistent review, race and transfer buttons: state lives in the
+    # custom_id, so they survive restarts without per-message views
+    bot.add_dynamic_items(PinkSlipReviewButton, RaceTrackerButton, TransferConfirmationButton)
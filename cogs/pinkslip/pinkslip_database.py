@@ -10,6 +10,8 @@ class PinkslipDatabase:
     def __init__(self):
         self.db_path = "data/pinkslip.db"
         self.guild_settings_path = "data/guild_settings.db"
+        # guild_id -> (review_channel_id, notification_channel_id), filled by warm_up()
+        self._guild_settings: Optional[Dict[int, Tuple[int, int]]] = None
 
     async def initialize(self):
         """Initialize all database tables."""
@@ -55,6 +57,19 @@ class PinkslipDatabase:
                 )
             ''')
 
+            # Registrations awaiting staff review, keyed by the review message
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS pending_reviews (
+                    message_id INTEGER PRIMARY KEY,
+                    guild_id INTEGER NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    make_model TEXT NOT NULL,
+                    year TEXT NOT NULL,
+                    slip_id TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
             await db.commit()
 
         # Initialize guild settings database
@@ -204,6 +219,74 @@ class PinkslipDatabase:
         except Exception:
             return False
 
+    async def add_pending_review(self, message_id: int, guild_id: int, user_id: int,
+                                 make_model: str, year: str, slip_id: str) -> bool:
+        """Record the review message posted for a registration."""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                await db.execute('''
+                    INSERT OR REPLACE INTO pending_reviews
+                    (message_id, guild_id, user_id, make_model, year, slip_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (message_id, guild_id, user_id, make_model, year, slip_id))
+
+                await db.commit()
+                return True
+
+        except Exception:
+            return False
+
+    async def get_pending_review(self, message_id: int) -> Optional[Dict[str, Any]]:
+        """Get the registration a review message is for."""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                async with db.execute('''
+                    SELECT guild_id, user_id, make_model, year, slip_id
+                    FROM pending_reviews WHERE message_id = ?
+                ''', (message_id,)) as cursor:
+                    row = await cursor.fetchone()
+        except Exception:
+            return None
+
+        if not row:
+            return None
+        guild_id, user_id, make_model, year, slip_id = row
+        return {
+            'guild_id': guild_id,
+            'user_id': user_id,
+            'make_model': make_model,
+            'year': year,
+            'slip_id': slip_id
+        }
+
+    async def get_pending_slip_id(self, user_id: int, guild_id: int,
+                                  make_model: str, year: str) -> Optional[str]:
+        """Get the slip ID of a registration still awaiting review."""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                async with db.execute('''
+                    SELECT slip_id FROM vehicles
+                    WHERE user_id = ? AND guild_id = ? AND make_model = ? AND year = ? AND status = 'pending'
+                ''', (user_id, guild_id, make_model, year)) as cursor:
+                    row = await cursor.fetchone()
+                    return row[0] if row else None
+        except Exception:
+            return None
+
+    async def delete_pending_review(self, message_id: int) -> bool:
+        """Forget a review once it has been decided."""
+        try:
+            async with aiosqlite.connect(self.db_path) as db:
+                cursor = await db.execute('''
+                    DELETE FROM pending_reviews WHERE message_id = ?
+                ''', (message_id,))
+
+                await db.commit()
+                return cursor.rowcount > 0
+
+        except Exception:
+            return False
+
     async def update_user_stats(self, user_id: int, guild_id: int, stat_type: str, amount: int = 1) -> None:
         """Update user racing statistics."""
         try:
@@ -285,8 +368,27 @@ class PinkslipDatabase:
         except Exception:
             return False
 
+    async def warm_up(self) -> int:
+        """Load every guild's channel settings into memory in one query.
+
+        Once warmed, get_guild_settings is served from memory and
+        update_guild_settings writes through. Returns the number of guilds.
+        """
+        async with aiosqlite.connect(self.guild_settings_path) as db:
+            async with db.execute('''
+                SELECT guild_id, review_channel_id, notification_channel_id
+                FROM guild_settings
+            ''') as cursor:
+                self._guild_settings = {
+                    guild_id: (review_channel_id, notification_channel_id)
+                    for guild_id, review_channel_id, notification_channel_id in await cursor.fetchall()
+                }
+        return len(self._guild_settings)
+
     async def get_guild_settings(self, guild_id: int) -> Optional[Tuple[int, int]]:
         """Get guild channel settings."""
+        if self._guild_settings is not None:
+            return self._guild_settings.get(guild_id)
         try:
             async with aiosqlite.connect(self.guild_settings_path) as db:
                 async with db.execute('''
@@ -309,7 +411,9 @@ class PinkslipDatabase:
                 ''', (guild_id, review_channel_id, notification_channel_id))
 
                 await db.commit()
-                return True
+            if self._guild_settings is not None:
+                self._guild_settings[guild_id] = (review_channel_id, notification_channel_id)
+            return True
 
         except Exception:
             return False
\ No newline at end of file
@@ -1,9 +1,24 @@
-import discord
-from discord.ui import View, Button, Modal, Select
-from typing import List, Optional, Dict, Any
+import logging
 import re
+import discord
+from discord.ui import View, Button, Modal, Select, DynamicItem
+from typing import List, Optional, Dict, Any, Tuple
 from .pinkslip_validators import ValidationHelper
 
+def _pinkslip_cog(interaction: discord.Interaction):
+    """The loaded cog, which owns the database and embeds persistent buttons use."""
+    return interaction.client.get_cog('PinkslipCog')
+
+async def _resolve_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Member from the cache, fetched if it isn't there (e.g. after a restart)."""
+    member = guild.get_member(user_id)
+    if member is None:
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.HTTPException:
+            return None
+    return member
+
 class PinkSlipSubmissionView(View):
     """Professional vehicle registration submission interface."""
 
@@ -172,7 +187,7 @@ class VehicleRegistrationModal(Modal, title='🚗 Vehicle Registration Form'):
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
             # Notify staff
-            await self._notify_staff(interaction, vehicle_data)
+            await self._notify_staff(interaction, vehicle_data, result)
 
         except Exception as e:
             embed = self.embed_manager.create_error(
@@ -193,8 +208,9 @@ class VehicleRegistrationModal(Modal, title='🚗 Vehicle Registration Form'):
         
         return ValidationHelper.validate_vehicle_data(vehicle_data)
 
-    async def _notify_staff(self, interaction: discord.Interaction, vehicle_data: Dict[str, str]) -> None:
-        """Send registration to staff review channel."""
+    async def _notify_staff(self, interaction: discord.Interaction, vehicle_data: Dict[str, str],
+                            slip_id: str) -> None:
+        """Send registration to staff review channel and record it as pending."""
         guild_settings = await self.db.get_guild_settings(interaction.guild_id)
         if not guild_settings:
             return
@@ -204,141 +220,181 @@ class VehicleRegistrationModal(Modal, title='🚗 Vehicle Registration Form'):
             return
 
         embed = self.embed_manager.create_review_request(interaction.user, vehicle_data)
-        view = PinkSlipReviewView(interaction, self.db, self.embed_manager)
+        view = PinkSlipReviewView(slip_id)
 
         try:
-            await channel.send(embed=embed, view=view)
+            message = await channel.send(embed=embed, view=view)
         except discord.Forbidden:
-            pass  # Silently fail if no permissions
+            return  # Silently fail if no permissions
 
-class PinkSlipReviewView(View):
-    """Staff review interface with enhanced functionality."""
+        recorded = await self.db.add_pending_review(
+            message.id, interaction.guild_id, interaction.user.id,
+            vehicle_data['make_model'], vehicle_data['year'], slip_id
+        )
+        if not recorded:
+            # The buttons fall back to the slip ID they carry, but say so
+            logging.error(f"Could not record pending review {message.id} for slip {slip_id}")
+
+# action -> (label, style, emoji); the review message itself is the key
+REVIEW_BUTTONS = {
+    'approve_registration': ('✅ Approve Registration', discord.ButtonStyle.success, '✅'),
+    'deny_registration': ('❌ Deny Registration', discord.ButtonStyle.danger, '❌'),
+    'request_info': ('🔍 Request More Info', discord.ButtonStyle.secondary, '🔍'),
+}
+
+async def _record_review(db, interaction: discord.Interaction, user_id: int, make_model: str,
+                         year: str, slip_id: str) -> Dict[str, Any]:
+    """Store a pending_reviews row for the clicked review message."""
+    if not await db.add_pending_review(interaction.message.id, interaction.guild_id, user_id, make_model, year, slip_id):
+        logging.error(f"Could not record pending review {interaction.message.id} for slip {slip_id}")
+    return {
+        'guild_id': interaction.guild_id,
+        'user_id': user_id,
+        'make_model': make_model,
+        'year': year,
+        'slip_id': slip_id
+    }
+
+async def _review_from_slip(db, interaction: discord.Interaction, slip_id: str) -> Optional[Dict[str, Any]]:
+    """Recover a review whose pending_reviews row could not be saved from
+    the registration its buttons name."""
+    vehicle = await db.get_vehicle_by_id(slip_id)
+    if not vehicle:
+        return None
+    user_id, guild_id, make_model, year, _, _, _, status = vehicle[:8]
+    if guild_id != interaction.guild_id or status != 'pending':
+        return None
+    return await _record_review(db, interaction, user_id, make_model, year, slip_id)
+
+# Legacy reviews. Review messages posted before the pending_reviews table
+# existed carry bare action custom_ids and no row, so their registration can
+# only be read back from the embed. Each is recorded on its first click; remove
+# this path once no review from before the migration is left pending.
+
+def _parse_review_embed(embed: discord.Embed) -> Optional[Tuple[int, str, str]]:
+    """``(user_id, make_model, year)`` from a legacy review request embed."""
+    user_match = re.search(r'<@!?(\d+)>', embed.description or '')
+    vehicle_field = next((f for f in embed.fields if "🚗 Vehicle Details" in f.name), None)
+    if not user_match or not vehicle_field:
+        return None
+
+    make_model, year = "", ""
+    for line in vehicle_field.value.split('\n'):
+        if '**Make/Model:**' in line:
+            make_model = line.split('**Make/Model:**', 1)[1].strip()
+        elif '**Year:**' in line:
+            year = line.split('**Year:**', 1)[1].strip()
+    if not make_model or not year:
+        return None
+    return int(user_match.group(1)), make_model, year
+
+async def _backfill_legacy_review(db, interaction: discord.Interaction) -> Optional[Dict[str, Any]]:
+    """Record a review posted before pending_reviews existed, recovering the
+    registration from its embed once."""
+    if not interaction.message.embeds:
+        return None
+    parsed = _parse_review_embed(interaction.message.embeds[0])
+    if parsed is None:
+        return None
+    user_id, make_model, year = parsed
+    slip_id = await db.get_pending_slip_id(user_id, interaction.guild_id, make_model, year)
+    if slip_id is None:
+        return None
+    return await _record_review(db, interaction, user_id, make_model, year, slip_id)
+
+class PinkSlipReviewButton(DynamicItem[Button],
+                           template=r'(?:pinkslip:review:)?(?P<action>approve_registration|deny_registration|request_info)'
+                                    r'(?::(?P<slip_id>\d+))?'):
+    """Staff review button. It acts on the review message it is attached to;
+    the custom_id names the action and the registration's slip ID, which
+    legacy buttons (bare action custom_ids) lack."""
+
+    def __init__(self, action: str, slip_id: Optional[str] = None) -> None:
+        label, style, emoji = REVIEW_BUTTONS[action]
+        custom_id = f"pinkslip:review:{action}:{slip_id}" if slip_id else action
+        super().__init__(Button(label=label, style=style, emoji=emoji, custom_id=custom_id))
+        self.action = action
+        self.slip_id = slip_id
 
-    def __init__(self, interaction: Optional[discord.Interaction], db, embed_manager) -> None:
-        super().__init__(timeout=None)
-        self.interaction = interaction
-        self.db = db
-        self.embed_manager = embed_manager
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match) -> 'PinkSlipReviewButton':
+        return cls(match['action'], match['slip_id'])
 
-    @discord.ui.button(
-        label='✅ Approve Registration', 
-        style=discord.ButtonStyle.success, 
-        custom_id='approve_registration',
-        emoji='✅'
-    )
-    async def approve_registration(self, interaction: discord.Interaction, button: Button) -> None:
-        """Approve the vehicle registration."""
-        embed_data = self._extract_embed_data(interaction.message.embeds[0])
+    async def callback(self, interaction: discord.Interaction) -> None:
+        cog = _pinkslip_cog(interaction)
+        if cog is None:
+            await interaction.response.send_message("❌ Registration review is currently unavailable.", ephemeral=True)
+            return
 
-        # Debug: Check if we extracted data correctly
-        if not embed_data['make_model'] or not embed_data['year'] or not embed_data['user_id']:
-            embed = self.embed_manager.create_error(
-                "Data Extraction Failed",
-                f"Failed to extract vehicle data from embed. Got: {embed_data}"
+        review = await cog.db.get_pending_review(interaction.message.id)
+        if review is None:
+            if self.slip_id:
+                review = await _review_from_slip(cog.db, interaction, self.slip_id)
+            else:
+                review = await _backfill_legacy_review(cog.db, interaction)
+        if review is None:
+            embed = cog.embed_manager.create_error(
+                "Review Not Found",
+                "This registration is no longer pending review."
             )
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
+        if self.action == 'approve_registration':
+            await self._approve_registration(interaction, review, cog.db, cog.embed_manager)
+        elif self.action == 'deny_registration':
+            # Deny the vehicle registration with reason
+            await interaction.response.send_modal(
+                RegistrationDenialModal(cog.db, cog.embed_manager, review)
+            )
+        else:
+            # Request additional information from the user
+            await interaction.response.send_modal(
+                InfoRequestModal(cog.db, cog.embed_manager, review)
+            )
+
+    async def _approve_registration(self, interaction: discord.Interaction, review: Dict[str, Any],
+                                    db, embed_manager) -> None:
+        """Approve the vehicle registration."""
         try:
-            success = await self.db.update_vehicle_status(
-                int(embed_data['user_id']), interaction.guild_id,
-                embed_data['make_model'], embed_data['year'], 'approved'
+            success = await db.update_vehicle_status(
+                review['user_id'], review['guild_id'],
+                review['make_model'], review['year'], 'approved'
             )
 
             if not success:
-                embed = self.embed_manager.create_error(
+                embed = embed_manager.create_error(
                     "Approval Failed",
-                    f"Could not find vehicle: {embed_data['make_model']} ({embed_data['year']}) for user {embed_data['user_id']}"
+                    f"Could not find vehicle: {review['make_model']} ({review['year']}) for user {review['user_id']}"
                 )
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
+            await db.delete_pending_review(interaction.message.id)
+
             # Update staff message
-            embed = self.embed_manager.create_success(
+            embed = embed_manager.create_success(
                 "Registration Approved",
-                f"**Vehicle:** {embed_data['make_model']} ({embed_data['year']})\n"
+                f"**Vehicle:** {review['make_model']} ({review['year']})\n"
                 f"**Approved by:** {interaction.user.mention}\n"
                 f"**User notified:** ✅"
             )
             await interaction.response.edit_message(embed=embed, view=None)
 
             # Notify user
-            await self._notify_user_approval(interaction, embed_data)
+            await self._notify_user_approval(interaction, review, db, embed_manager)
 
         except Exception as e:
-            embed = self.embed_manager.create_error(
+            embed = embed_manager.create_error(
                 "Approval Failed",
                 f"An error occurred while processing the approval: {str(e)}"
             )
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    @discord.ui.button(
-        label='❌ Deny Registration', 
-        style=discord.ButtonStyle.danger, 
-        custom_id='deny_registration',
-        emoji='❌'
-    )
-    async def deny_registration(self, interaction: discord.Interaction, button: Button) -> None:
-        """Deny the vehicle registration with reason."""
-        await interaction.response.send_modal(
-            RegistrationDenialModal(self.db, self.embed_manager)
-        )
-
-    @discord.ui.button(
-        label='🔍 Request More Info', 
-        style=discord.ButtonStyle.secondary, 
-        custom_id='request_info',
-        emoji='🔍'
-    )
-    async def request_additional_info(self, interaction: discord.Interaction, button: Button) -> None:
-        """Request additional information from the user."""
-        await interaction.response.send_modal(
-            InfoRequestModal(self.db, self.embed_manager)
-        )
-
-    def _extract_embed_data(self, embed: discord.Embed) -> Dict[str, str]:
-        """Extract vehicle data from the review embed."""
-        description = embed.description
-        fields = embed.fields
-
-        # Extract user ID from mention in description
-        mention_pattern = r'<@!?(\d+)>'
-        user_match = re.search(mention_pattern, description)
-        user_id = user_match.group(1) if user_match else "0"
-
-        # Initialize variables
-        make_model, year = "", ""
-        engine_spec, transmission = "", ""
-
-        # Extract vehicle data from fields - match the actual field structure from create_review_request
-        for field in fields:
-            if "🚗 Vehicle Details" in field.name:
-                lines = field.value.split('\n')
-                for line in lines:
-                    if '**Make/Model:**' in line:
-                        make_model = line.split('**Make/Model:**', 1)[1].strip()
-                    elif '**Year:**' in line:
-                        year = line.split('**Year:**', 1)[1].strip()
-
-            elif "⚡ Performance Specs" in field.name:
-                lines = field.value.split('\n')
-                for line in lines:
-                    if '**Engine:**' in line:
-                        engine_spec = line.split('**Engine:**', 1)[1].strip()
-                    elif '**Transmission:**' in line:
-                        transmission = line.split('**Transmission:**', 1)[1].strip()
-
-        return {
-            'user_id': user_id,
-            'make_model': make_model,
-            'year': year,
-            'engine_spec': engine_spec,
-            'transmission': transmission
-        }
-
-    async def _notify_user_approval(self, interaction: discord.Interaction, embed_data: Dict[str, str]) -> None:
+    async def _notify_user_approval(self, interaction: discord.Interaction, review: Dict[str, Any],
+                                    db, embed_manager) -> None:
         """Send approval notification to user."""
-        guild_settings = await self.db.get_guild_settings(interaction.guild_id)
+        guild_settings = await db.get_guild_settings(interaction.guild_id)
         if not guild_settings:
             return
 
@@ -346,22 +402,35 @@ class PinkSlipReviewView(View):
         if not channel:
             return
 
-        embed = self.embed_manager.create_approval_notification(
-            interaction.user, embed_data['make_model'], embed_data['year']
+        embed = embed_manager.create_approval_notification(
+            interaction.user, review['make_model'], review['year']
         )
 
         try:
-            await channel.send(f"<@{embed_data['user_id']}>", embed=embed)
+            await channel.send(f"<@{review['user_id']}>", embed=embed)
         except discord.Forbidden:
             pass
 
+class PinkSlipReviewView(View):
+    """Staff review interface with enhanced functionality.
+
+    Persistent: every button is a PinkSlipReviewButton, registered once at
+    startup, so pending reviews hold no view objects and survive restarts.
+    """
+
+    def __init__(self, slip_id: str) -> None:
+        super().__init__(timeout=None)
+        for action in REVIEW_BUTTONS:
+            self.add_item(PinkSlipReviewButton(action, slip_id))
+
 class RegistrationDenialModal(Modal, title='❌ Registration Denial'):
     """Modal for denying registrations with detailed reasons."""
 
-    def __init__(self, db, embed_manager) -> None:
+    def __init__(self, db, embed_manager, review: Dict[str, Any]) -> None:
         super().__init__()
         self.db = db
         self.embed_manager = embed_manager
+        self.review = review
 
     denial_reason = discord.ui.TextInput(
         label='Reason for Denial',
@@ -373,19 +442,20 @@ class RegistrationDenialModal(Modal, title='❌ Registration Denial'):
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
         """Process the denial with reason."""
-        embed_data = self._extract_embed_data(interaction.message.embeds[0])
+        review = self.review
 
         try:
             # Delete the registration
             await self.db.delete_vehicle_by_details(
-                int(embed_data['user_id']), interaction.guild_id,
-                embed_data['make_model'], embed_data['year']
+                review['user_id'], review['guild_id'],
+                review['make_model'], review['year']
             )
+            await self.db.delete_pending_review(interaction.message.id)
 
             # Update staff message
             embed = self.embed_manager.create_error(
                 "Registration Denied",
-                f"**Vehicle:** {embed_data['make_model']} ({embed_data['year']})\n"
+                f"**Vehicle:** {review['make_model']} ({review['year']})\n"
                 f"**Denied by:** {interaction.user.mention}\n"
                 f"**Reason:** {self.denial_reason.value}\n"
                 f"**User notified:** ✅"
@@ -393,7 +463,7 @@ class RegistrationDenialModal(Modal, title='❌ Registration Denial'):
             await interaction.response.edit_message(embed=embed, view=None)
 
             # Notify user
-            await self._notify_user_denial(interaction, embed_data)
+            await self._notify_user_denial(interaction)
 
         except Exception as e:
             embed = self.embed_manager.create_error(
@@ -402,33 +472,7 @@ class RegistrationDenialModal(Modal, title='❌ Registration Denial'):
             )
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    def _extract_embed_data(self, embed: discord.Embed) -> Dict[str, str]:
-        """Extract data from embed."""
-        description = embed.description
-        fields = embed.fields
-
-        mention_pattern = r'<@!?(\d+)>'
-        user_match = re.search(mention_pattern, description)
-        user_id = user_match.group(1) if user_match else "0"
-
-        vehicle_field = next((f for f in fields if "🚗 Vehicle Details" in f.name), None)
-
-        make_model, year = "", ""
-        if vehicle_field:
-            lines = vehicle_field.value.split('\n')
-            for line in lines:
-                if '**Make/Model:**' in line:
-                    make_model = line.split('**Make/Model:**', 1)[1].strip()
-                elif '**Year:**' in line:
-                    year = line.split('**Year:**', 1)[1].strip()
-
-        return {
-            'user_id': user_id,
-            'make_model': make_model,
-            'year': year
-        }
-
-    async def _notify_user_denial(self, interaction: discord.Interaction, embed_data: Dict[str, str]) -> None:
+    async def _notify_user_denial(self, interaction: discord.Interaction) -> None:
         """Send denial notification to user."""
         guild_settings = await self.db.get_guild_settings(interaction.guild_id)
         if not guild_settings:
@@ -439,21 +483,22 @@ class RegistrationDenialModal(Modal, title='❌ Registration Denial'):
             return
 
         embed = self.embed_manager.create_denial_notification(
-            interaction.user, embed_data['make_model'], embed_data['year'], self.denial_reason.value
+            interaction.user, self.review['make_model'], self.review['year'], self.denial_reason.value
         )
 
         try:
-            await channel.send(f"<@{embed_data['user_id']}>", embed=embed)
+            await channel.send(f"<@{self.review['user_id']}>", embed=embed)
         except discord.Forbidden:
             pass
 
 class InfoRequestModal(Modal, title='🔍 Request Additional Information'):
     """Modal for requesting more information from users."""
 
-    def __init__(self, db, embed_manager) -> None:
+    def __init__(self, db, embed_manager, review: Dict[str, Any]) -> None:
         super().__init__()
         self.db = db
         self.embed_manager = embed_manager
+        self.review = review
 
     info_request = discord.ui.TextInput(
         label='Information Needed',
@@ -465,48 +510,22 @@ class InfoRequestModal(Modal, title='🔍 Request Additional Information'):
 
     async def on_submit(self, interaction: discord.Interaction) -> None:
         """Send information request."""
-        embed_data = self._extract_embed_data(interaction.message.embeds[0])
+        review = self.review
 
-        # Update staff message
+        # Update staff message; the review stays pending, so keep its buttons
         embed = self.embed_manager.create_warning(
             "Additional Information Requested",
-            f"**Vehicle:** {embed_data['make_model']} ({embed_data['year']})\n"
+            f"**Vehicle:** {review['make_model']} ({review['year']})\n"
             f"**Requested by:** {interaction.user.mention}\n"
             f"**Information Needed:** {self.info_request.value}\n\n"
             "*User has been notified. Registration remains pending.*"
         )
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=embed, view=PinkSlipReviewView(review['slip_id']))
 
         # Notify user
-        await self._notify_user_info_request(interaction, embed_data)
-
-    def _extract_embed_data(self, embed: discord.Embed) -> Dict[str, str]:
-        """Extract data from embed."""
-        description = embed.description
-        fields = embed.fields
-
-        mention_pattern = r'<@!?(\d+)>'
-        user_match = re.search(mention_pattern, description)
-        user_id = user_match.group(1) if user_match else "0"
-
-        vehicle_field = next((f for f in fields if "🚗 Vehicle Details" in f.name), None)
-
-        make_model, year = "", ""
-        if vehicle_field:
-            lines = vehicle_field.value.split('\n')
-            for line in lines:
-                if '**Make/Model:**' in line:
-                    make_model = line.split('**Make/Model:**', 1)[1].strip()
-                elif '**Year:**' in line:
-                    year = line.split('**Year:**', 1)[1].strip()
-
-        return {
-            'user_id': user_id,
-            'make_model': make_model,
-            'year': year
-        }
+        await self._notify_user_info_request(interaction)
 
-    async def _notify_user_info_request(self, interaction: discord.Interaction, embed_data: Dict[str, str]) -> None:
+    async def _notify_user_info_request(self, interaction: discord.Interaction) -> None:
         """Notify user about information request."""
         guild_settings = await self.db.get_guild_settings(interaction.guild_id)
         if not guild_settings:
@@ -518,80 +537,86 @@ class InfoRequestModal(Modal, title='🔍 Request Additional Information'):
 
         embed = self.embed_manager.create_warning(
             "Additional Information Required",
-            f"Your registration for **{embed_data['make_model']} ({embed_data['year']})** requires additional information.\n\n"
+            f"Your registration for **{self.review['make_model']} ({self.review['year']})** requires additional information.\n\n"
             f"**Information Needed:**\n{self.info_request.value}\n\n"
             "Please contact staff to provide the requested information. Your registration will remain pending until resolved."
         )
 
         try:
-            await channel.send(f"<@{embed_data['user_id']}>", embed=embed)
+            await channel.send(f"<@{self.review['user_id']}>", embed=embed)
         except discord.Forbidden:
             pass
 
-class RaceTrackerView(View):
-    """Enhanced race result tracking interface."""
+# action -> (label, style, emoji)
+RACE_BUTTONS = {
+    'win': ('🏆 I Won the Race', discord.ButtonStyle.success, '🏆'),
+    'lose': ('💔 I Lost the Race', discord.ButtonStyle.danger, '💔'),
+    'cancel': ('❌ Cancel', discord.ButtonStyle.secondary, None),
+}
+
+class RaceTrackerButton(DynamicItem[Button], template=r'pinkslip:race:(?P<action>win|lose|cancel):(?P<user_id>\d+):(?P<opponent_id>\d+)'):
+    """Race result button; the custom_id carries the action and both racers."""
+
+    def __init__(self, action: str, user_id: int, opponent_id: int) -> None:
+        label, style, emoji = RACE_BUTTONS[action]
+        super().__init__(Button(
+            label=label,
+            style=style,
+            emoji=emoji,
+            custom_id=f'pinkslip:race:{action}:{user_id}:{opponent_id}'
+        ))
+        self.action = action
+        self.user_id = user_id
+        self.opponent_id = opponent_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match) -> 'RaceTrackerButton':
+        return cls(match['action'], int(match['user_id']), int(match['opponent_id']))
 
-    def __init__(self, user: discord.Member, opponent: discord.Member, db, embed_manager) -> None:
-        super().__init__(timeout=900)
-        self.user = user
-        self.opponent = opponent
-        self.db = db
-        self.embed_manager = embed_manager
+    async def callback(self, interaction: discord.Interaction) -> None:
+        cog = _pinkslip_cog(interaction)
+        if cog is None:
+            await interaction.response.send_message("❌ Race tracking is currently unavailable.", ephemeral=True)
+            return
 
-    @discord.ui.button(
-        label='🏆 I Won the Race', 
-        style=discord.ButtonStyle.success,
-        emoji='🏆'
-    )
-    async def record_victory(self, interaction: discord.Interaction, button: Button) -> None:
-        """Handle victory recording."""
-        if interaction.user.id != self.user.id:
-            await interaction.response.send_message(
-                "❌ Only the person who initiated this can record their result.", ephemeral=True
+        if self.action == 'cancel':
+            embed = cog.embed_manager.create_info(
+                "Race Tracking Cancelled",
+                "No race results have been recorded."
             )
+            await interaction.response.edit_message(embed=embed, view=None)
             return
 
-        # Don't update stats yet - wait for confirmation
-        await self._handle_vehicle_selection(interaction, "win")
-
-    @discord.ui.button(
-        label='💔 I Lost the Race', 
-        style=discord.ButtonStyle.danger,
-        emoji='💔'
-    )
-    async def record_loss(self, interaction: discord.Interaction, button: Button) -> None:
-        """Handle loss recording."""
-        if interaction.user.id != self.user.id:
+        if interaction.user.id != self.user_id:
             await interaction.response.send_message(
                 "❌ Only the person who initiated this can record their result.", ephemeral=True
             )
             return
 
         # Don't update stats yet - wait for confirmation
-        await self._handle_vehicle_selection(interaction, "lose")
-
-    @discord.ui.button(
-        label='❌ Cancel', 
-        style=discord.ButtonStyle.secondary
-    )
-    async def cancel_race_tracking(self, interaction: discord.Interaction, button: Button) -> None:
-        """Cancel race tracking."""
-        embed = self.embed_manager.create_info(
-            "Race Tracking Cancelled",
-            "No race results have been recorded."
-        )
-        await interaction.response.edit_message(embed=embed, view=None)
+        await self._handle_vehicle_selection(interaction, self.action, cog.db, cog.embed_manager)
 
-    async def _handle_vehicle_selection(self, interaction: discord.Interaction, outcome: str) -> None:
+    async def _handle_vehicle_selection(self, interaction: discord.Interaction, outcome: str,
+                                        db, embed_manager) -> None:
         """Handle vehicle selection for transfer."""
+        opponent = await _resolve_member(interaction.guild, self.opponent_id)
+        if opponent is None:
+            embed = embed_manager.create_error(
+                "Opponent Not Found",
+                "Your opponent is no longer a member of this server."
+            )
+            await interaction.response.edit_message(embed=embed, view=None)
+            return
+        user = interaction.user
+
         # Determine who loses the vehicle based on outcome
-        losing_user = self.opponent if outcome == "win" else self.user
-        winning_user = self.user if outcome == "win" else self.opponent
-        
-        user_data = await self.db.get_user_complete_data(losing_user.id, interaction.guild_id)
+        losing_user = opponent if outcome == "win" else user
+        winning_user = user if outcome == "win" else opponent
+
+        user_data = await db.get_user_complete_data(losing_user.id, interaction.guild_id)
 
         if not user_data['vehicles']:
-            embed = self.embed_manager.create_info(
+            embed = embed_manager.create_info(
                 "No Vehicles Available",
                 f"{losing_user.mention} has no registered vehicles to transfer."
             )
@@ -602,24 +627,36 @@ class RaceTrackerView(View):
         approved_vehicles = [v for v in user_data['vehicles'] if v[7] == 'approved']
 
         if not approved_vehicles:
-            embed = self.embed_manager.create_info(
+            embed = embed_manager.create_info(
                 "No Approved Vehicles",
                 f"{losing_user.mention} has no approved vehicles available for transfer."
             )
             await interaction.response.edit_message(embed=embed, view=None)
             return
 
-        embed = self.embed_manager.create_info(
+        embed = embed_manager.create_info(
             "Select Vehicle for Transfer",
             f"Choose which vehicle to transfer from {losing_user.mention} to {winning_user.mention}:"
         )
 
         view = VehicleSelectionView(
-            self.user, self.opponent, approved_vehicles, outcome, self.db, self.embed_manager
+            user, opponent, approved_vehicles, outcome, db, embed_manager
         )
 
         await interaction.response.edit_message(embed=embed, view=view)
 
+class RaceTrackerView(View):
+    """Enhanced race result tracking interface.
+
+    Persistent: the buttons carry their state in the custom_id, so they keep
+    working after a restart without the view being held in memory.
+    """
+
+    def __init__(self, user_id: int, opponent_id: int) -> None:
+        super().__init__(timeout=None)
+        for action in RACE_BUTTONS:
+            self.add_item(RaceTrackerButton(action, user_id, opponent_id))
+
 class VehicleSelectionView(View):
     """Vehicle selection interface for transfers."""
 
@@ -685,7 +722,7 @@ class VehicleDropdown(Select):
         )
 
         view = TransferConfirmationView(
-            self.initiator, self.opponent, self.outcome, selected_slip_id, self.db, self.embed_manager
+            self.initiator.id, self.opponent.id, self.outcome, selected_slip_id
         )
 
         await interaction.response.edit_message(embed=embed, view=None)
@@ -711,55 +748,68 @@ class VehicleDropdown(Select):
         except discord.Forbidden:
             pass
 
-class TransferConfirmationView(View):
-    """Transfer confirmation interface."""
+class TransferConfirmationButton(DynamicItem[Button], template=r'pinkslip:transfer:(?P<action>confirm|dispute):(?P<initiator_id>\d+):(?P<opponent_id>\d+):(?P<outcome>win|lose):(?P<slip_id>\d+)'):
+    """Transfer confirmation button; the custom_id carries the action, both
+    racers, the claimed outcome and the vehicle's slip ID."""
 
-    def __init__(self, initiator: discord.Member, opponent: discord.Member,
-                 outcome: str, slip_id: str, db, embed_manager) -> None:
-        super().__init__(timeout=1800)  # 30 minutes
-        self.initiator = initiator
-        self.opponent = opponent
+    def __init__(self, action: str, initiator_id: int, opponent_id: int, outcome: str, slip_id: str) -> None:
+        if action == 'confirm':
+            button = Button(label='✅ Confirm Transfer', style=discord.ButtonStyle.success, emoji='✅')
+        else:
+            button = Button(label='🚨 Dispute Transfer', style=discord.ButtonStyle.danger, emoji='🚨')
+        button.custom_id = f'pinkslip:transfer:{action}:{initiator_id}:{opponent_id}:{outcome}:{slip_id}'
+        super().__init__(button)
+        self.action = action
+        self.initiator_id = initiator_id
+        self.opponent_id = opponent_id
         self.outcome = outcome
         self.slip_id = slip_id
-        self.db = db
-        self.embed_manager = embed_manager
 
-    @discord.ui.button(
-        label='✅ Confirm Transfer', 
-        style=discord.ButtonStyle.success,
-        emoji='✅'
-    )
-    async def confirm_transfer(self, interaction: discord.Interaction, button: Button) -> None:
-        """Confirm the vehicle transfer."""
-        if interaction.user.id != self.opponent.id:
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: Button, match) -> 'TransferConfirmationButton':
+        return cls(match['action'], int(match['initiator_id']), int(match['opponent_id']),
+                   match['outcome'], match['slip_id'])
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        if interaction.user.id != self.opponent_id:
             await interaction.response.send_message(
-                "❌ Only the mentioned user can confirm this transfer.", ephemeral=True
+                f"❌ Only the mentioned user can {self.action} this transfer.", ephemeral=True
             )
             return
 
+        cog = _pinkslip_cog(interaction)
+        if cog is None:
+            await interaction.response.send_message("❌ Race tracking is currently unavailable.", ephemeral=True)
+            return
+
+        if self.action == 'confirm':
+            await self._confirm_transfer(interaction, cog.db, cog.embed_manager)
+        else:
+            await self._dispute_transfer(interaction, cog.embed_manager)
+
+    async def _confirm_transfer(self, interaction: discord.Interaction, db, embed_manager) -> None:
+        """Confirm the vehicle transfer."""
         # Now that it's confirmed, update stats for both users
         if self.outcome == "win":
             # Initiator won, opponent lost
-            await self.db.update_user_stats(self.initiator.id, interaction.guild_id, "wins", 1)
-            await self.db.update_user_stats(self.opponent.id, interaction.guild_id, "losses", 1)
-            winner_id = self.initiator.id
-            loser_id = self.opponent.id
-            new_owner_id = self.initiator.id
+            await db.update_user_stats(self.initiator_id, interaction.guild_id, "wins", 1)
+            await db.update_user_stats(self.opponent_id, interaction.guild_id, "losses", 1)
+            winner_id = self.initiator_id
+            loser_id = self.opponent_id
         else:
             # Initiator lost, opponent won
-            await self.db.update_user_stats(self.initiator.id, interaction.guild_id, "losses", 1)
-            await self.db.update_user_stats(self.opponent.id, interaction.guild_id, "wins", 1)
-            winner_id = self.opponent.id
-            loser_id = self.initiator.id
-            new_owner_id = self.opponent.id
+            await db.update_user_stats(self.initiator_id, interaction.guild_id, "losses", 1)
+            await db.update_user_stats(self.opponent_id, interaction.guild_id, "wins", 1)
+            winner_id = self.opponent_id
+            loser_id = self.initiator_id
 
         # Transfer vehicle ownership
-        success = await self.db.transfer_vehicle_ownership(
-            self.slip_id, new_owner_id, interaction.guild_id
+        success = await db.transfer_vehicle_ownership(
+            self.slip_id, winner_id, interaction.guild_id
         )
 
         if not success:
-            embed = self.embed_manager.create_error(
+            embed = embed_manager.create_error(
                 "Transfer Failed",
                 "Vehicle ownership transfer failed. Please contact an administrator."
             )
@@ -767,37 +817,25 @@ class TransferConfirmationView(View):
             return
 
         # Record race result
-        await self.db.record_race_result(interaction.guild_id, winner_id, loser_id, self.slip_id)
+        await db.record_race_result(interaction.guild_id, winner_id, loser_id, self.slip_id)
 
-        winner_mention = self.initiator.mention if self.outcome == "win" else self.opponent.mention
-        embed = self.embed_manager.create_success(
+        embed = embed_manager.create_success(
             "Transfer Confirmed",
             f"✅ **Race Result Recorded**\n"
-            f"**Winner:** 🏆 {winner_mention}\n"
+            f"**Winner:** 🏆 <@{winner_id}>\n"
             f"**Vehicle Transferred:** Successfully\n"
             f"**Statistics Updated:** Both participants\n\n"
             "*Thank you for using the official racing system!*"
         )
         await interaction.response.edit_message(embed=embed, view=None)
 
-    @discord.ui.button(
-        label='🚨 Dispute Transfer', 
-        style=discord.ButtonStyle.danger,
-        emoji='🚨'
-    )
-    async def dispute_transfer(self, interaction: discord.Interaction, button: Button) -> None:
+    async def _dispute_transfer(self, interaction: discord.Interaction, embed_manager) -> None:
         """Dispute the vehicle transfer."""
-        if interaction.user.id != self.opponent.id:
-            await interaction.response.send_message(
-                "❌ Only the mentioned user can dispute this transfer.", ephemeral=True
-            )
-            return
-
         # No stats to revert since we haven't updated them yet
-        embed = self.embed_manager.create_error(
+        embed = embed_manager.create_error(
             "Transfer Disputed",
             f"🚨 **Race Result Disputed**\n\n"
-            f"**Disputed by:** {self.opponent.mention}\n"
+            f"**Disputed by:** <@{self.opponent_id}>\n"
             f"**No changes have been made**\n\n"
             "**Staff has been notified** and will investigate this dispute. "
             "Please provide evidence of the actual race outcome to staff members.\n\n"
@@ -805,6 +843,18 @@ class TransferConfirmationView(View):
         )
         await interaction.response.edit_message(embed=embed, view=None)
 
+class TransferConfirmationView(View):
+    """Transfer confirmation interface.
+
+    Persistent like RaceTrackerView: a pending transfer holds no Python
+    objects and survives restarts.
+    """
+
+    def __init__(self, initiator_id: int, opponent_id: int, outcome: str, slip_id: str) -> None:
+        super().__init__(timeout=None)
+        for action in ('confirm', 'dispute'):
+            self.add_item(TransferConfirmationButton(action, initiator_id, opponent_id, outcome, slip_id))
+
 class PinkSlipInventoryView(View):
     """Enhanced vehicle inventory browser."""
 
@@ -8,6 +8,11 @@ and streamer monitoring functionality.
 
 from .twitch_announce_commands import TwitchAnnounceCommands
 from .twitch_announce_handler import TwitchAnnounceHandler
+from .twitch_cache import HelixCache
+from .twitch_client import TwitchClient
+from .twitch_database import TwitchDatabase
+from .twitch_metrics import TwitchMetrics
+from .twitch_ratelimit import HelixRateLimiter, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
 
 __version__ = "1.0.0"
 __author__ = "Twitch Integration Team"
@@ -21,5 +26,12 @@ async def setup(bot):
 __all__ = [
     'TwitchAnnounceCommands',
     'TwitchAnnounceHandler',
+    'TwitchClient',
+    'HelixCache',
+    'TwitchDatabase',
+    'TwitchMetrics',
+    'HelixRateLimiter',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_BACKGROUND',
     'setup'
 ]
@@ -2,10 +2,79 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import aiosqlite
-from typing import Optional
+import io
+import json
+import re
+from datetime import datetime
+from typing import List, Optional
+from .twitch_client import HELIX_BATCH_SIZE
+from .twitch_database import TwitchDatabase
+from .twitch_ratelimit import PRIORITY_INTERACTIVE
+from .twitch_templates import DEFAULT_MESSAGE, compile_message, parse_color
 
 twitch_db = "data/twitch_announce.db"
 
+# Streamers shown per /twitch list page
+LIST_PAGE_SIZE = 25
+
+# Entries shown by /twitch history
+HISTORY_RECENT_SESSIONS = 5
+HISTORY_TOP_STREAMERS = 10
+
+# Games a guild can restrict announcements to
+GAME_FILTER_MAX = 25
+
+# Limits for /twitch import
+IMPORT_MAX_USERNAMES = 1000
+IMPORT_MAX_FILE_BYTES = 64 * 1024
+
+TWITCH_LOGIN_RE = re.compile(r'^[a-z0-9_]{1,25}$')
+# Channel URL prefix in any of its forms: http(s)://, www./m., or bare twitch.tv/
+TWITCH_URL_PREFIX_RE = re.compile(r'^(?:https?://)?(?:(?:www|m)\.)?twitch\.tv/')
+
+def _parse_usernames(text: str) -> List[str]:
+    """Split a comma, space or newline separated list into unique logins."""
+    usernames = []
+    seen = set()
+    for token in re.split(r'[\s,;]+', text):
+        username = TWITCH_URL_PREFIX_RE.sub('', token.lower().strip().lstrip('@'))
+        # Keep only the login from channel URLs with a path or query after it
+        username = re.split(r'[/?#]', username, maxsplit=1)[0]
+        if username and username not in seen:
+            seen.add(username)
+            usernames.append(username)
+    return usernames
+
+def _truncated_list(names: List[str], limit: int = 1000) -> str:
+    """Join names for an embed field, summarising whatever doesn't fit."""
+    text = ""
+    for i, name in enumerate(names):
+        entry = f"`{name}`" if not text else f", `{name}`"
+        if len(text) + len(entry) > limit - 20:
+            return text + f" …and {len(names) - i} more"
+        text += entry
+    return text
+
+def _stream_tracker(bot):
+    """The live handler's in-memory tracker, kept in step with command changes."""
+    handler = bot.get_cog('TwitchAnnounceHandler')
+    return handler.tracker if handler else None
+
+def _announcement_templates(bot):
+    """The live handler's template cache, recompiled on settings changes."""
+    handler = bot.get_cog('TwitchAnnounceHandler')
+    return handler.templates if handler else None
+
+async def _guild_configured(bot, guild_id: int) -> bool:
+    """Whether the guild has run /twitch setup, answered from the warmed
+    tracker when the handler is loaded."""
+    tracker = _stream_tracker(bot)
+    if tracker and guild_id in tracker.settings:
+        return True
+    async with aiosqlite.connect(twitch_db) as db:
+        cursor = await db.execute("SELECT 1 FROM twitch_settings WHERE guild_id = ?", (guild_id,))
+        return await cursor.fetchone() is not None
+
 class TwitchConfirmView(discord.ui.View):
     def __init__(self, guild_id: int, username: str, user_info: dict):
         super().__init__(timeout=300)
@@ -18,11 +87,15 @@ class TwitchConfirmView(discord.ui.View):
         async with aiosqlite.connect(twitch_db) as db:
             try:
                 await db.execute("""
-                    INSERT INTO twitch_streamers (guild_id, twitch_username)
-                    VALUES (?, ?)
-                """, (self.guild_id, self.username))
+                    INSERT INTO twitch_streamers (guild_id, twitch_username, twitch_user_id)
+                    VALUES (?, ?, ?)
+                """, (self.guild_id, self.username, self.user_info.get('id')))
                 await db.commit()
 
+                tracker = _stream_tracker(interaction.client)
+                if tracker and self.user_info.get('id'):
+                    tracker.add(self.guild_id, self.username, self.user_info['id'])
+
                 embed = discord.Embed(
                     title="✅ Streamer Added Successfully",
                     description=f"Now monitoring **{self.user_info['display_name']}** (@{self.username}) for live streams!",
@@ -69,40 +142,96 @@ class TwitchConfirmView(discord.ui.View):
         for item in self.children:
             item.disabled = True
 
+class TwitchListView(discord.ui.View):
+    """Page buttons for /twitch list, fetching one keyset page per click."""
+
+    def __init__(self, db: TwitchDatabase, guild_id: int, total: int, live: int):
+        super().__init__(timeout=300)
+        self.db = db
+        self.guild_id = guild_id
+        self.total = total
+        self.live = live
+        self.page = 0
+        self.rows = []
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.total // LIST_PAGE_SIZE))
+
+    async def load(self, after=None, before=None):
+        """Fetch the page after or before the given key, or the first page."""
+        rows = await self.db.get_streamer_page(self.guild_id, LIST_PAGE_SIZE + 1, after=after, before=before)
+        if before is not None:
+            has_prev = len(rows) > LIST_PAGE_SIZE
+            self.rows = rows[-LIST_PAGE_SIZE:]
+            has_next = True
+        else:
+            has_next = len(rows) > LIST_PAGE_SIZE
+            self.rows = rows[:LIST_PAGE_SIZE]
+            has_prev = after is not None
+        self.previous_page.disabled = not has_prev
+        self.next_page.disabled = not has_next
+
+    def render(self) -> discord.Embed:
+        live_streamers = [f"🔴 **{username}** (LIVE)" for username, is_live in self.rows if is_live]
+        offline_streamers = [f"⚫ {username}" for username, is_live in self.rows if not is_live]
+
+        description = ""
+        if live_streamers:
+            description += "**Currently Live:**\n" + "\n".join(live_streamers) + "\n\n"
+        if offline_streamers:
+            description += "**Offline:**\n" + "\n".join(offline_streamers)
+
+        embed = discord.Embed(
+            title="📺 Monitored Twitch Streamers",
+            description=description,
+            color=discord.Color.purple()
+        )
+        footer = f"Total: {self.total} streamers · {self.live} live"
+        if self.page_count > 1:
+            footer += f" · Page {self.page + 1}/{self.page_count}"
+        embed.set_footer(text=footer)
+        return embed
+
+    @discord.ui.button(label='Previous', style=discord.ButtonStyle.secondary, emoji='◀️')
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        first_username, first_live = self.rows[0]
+        await self.load(before=(first_live, first_username))
+        self.page = max(0, self.page - 1)
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label='Next', style=discord.ButtonStyle.secondary, emoji='▶️')
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        last_username, last_live = self.rows[-1]
+        await self.load(after=(last_live, last_username))
+        self.page = min(self.page_count - 1, self.page + 1)
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    async def on_timeout(self):
+        # Disable all buttons when view times out
+        for item in self.children:
+            item.disabled = True
+
 @app_commands.allowed_installs(guilds=True, users=False)
 @app_commands.allowed_contexts(guilds=True, dms=False, private_channels=False)
 class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
     def __init__(self, bot):
         self.bot = bot
+        self.db = TwitchDatabase()
 
     async def cog_load(self):
-        async with aiosqlite.connect(twitch_db) as db:
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS twitch_settings (
-                    guild_id INTEGER PRIMARY KEY,
-                    channel_id INTEGER NOT NULL,
-                    role_id INTEGER
-                )
-            """)
-            await db.execute("""
-                CREATE TABLE IF NOT EXISTS twitch_streamers (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    guild_id INTEGER NOT NULL,
-                    twitch_username TEXT NOT NULL,
-                    is_live INTEGER DEFAULT 0,
-                    last_stream_id TEXT,
-                    UNIQUE(guild_id, twitch_username)
-                )
-            """)
-            await db.commit()
+        await self.db.initialize()
 
     @app_commands.command(name="setup", description="Set up Twitch live announcements for this server")
     @app_commands.describe(
         channel="The channel where Twitch live announcements will be sent",
-        role="Optional role to ping when streamers go live"
+        role="Optional role to ping when streamers go live",
+        message="Announcement text with {mention}, {streamer}, {title}, {game} and {url} placeholders",
+        color="Embed color as a hex code, e.g. #9146FF"
     )
     @app_commands.default_permissions(manage_guild=True)
-    async def setup_twitch(self, interaction: discord.Interaction, channel: discord.TextChannel, role: Optional[discord.Role] = None):
+    async def setup_twitch(self, interaction: discord.Interaction, channel: discord.TextChannel, role: Optional[discord.Role] = None,
+                           message: Optional[str] = None, color: Optional[str] = None):
         if not interaction.user.guild_permissions.manage_guild:
             embed = discord.Embed(
                 title="❌ Permission Denied",
@@ -122,13 +251,35 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
+        try:
+            compile_message(message)
+            color_value = parse_color(color)
+        except ValueError as e:
+            embed = discord.Embed(
+                title="❌ Invalid Template",
+                description=str(e),
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
         async with aiosqlite.connect(twitch_db) as db:
             await db.execute("""
-                INSERT OR REPLACE INTO twitch_settings (guild_id, channel_id, role_id)
-                VALUES (?, ?, ?)
-            """, (interaction.guild_id, channel.id, role.id if role else None))
+                INSERT INTO twitch_settings (guild_id, channel_id, role_id, message, color)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(guild_id) DO UPDATE SET
+                    channel_id = excluded.channel_id, role_id = excluded.role_id,
+                    message = excluded.message, color = excluded.color
+            """, (interaction.guild_id, channel.id, role.id if role else None, message or None, color_value))
             await db.commit()
 
+        tracker = _stream_tracker(self.bot)
+        if tracker:
+            tracker.set_guild_settings(interaction.guild_id, channel.id, role.id if role else None)
+        templates = _announcement_templates(self.bot)
+        if templates:
+            templates.configure(interaction.guild_id, channel.id, role.id if role else None, message or None, color_value)
+
         embed = discord.Embed(
             title="✅ Twitch Announcements Setup Complete",
             description=f"Twitch live announcements will be sent to {channel.mention}",
@@ -136,6 +287,8 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
         )
         if role:
             embed.add_field(name="Ping Role", value=role.mention, inline=False)
+        if message:
+            embed.add_field(name="Message", value=message, inline=False)
         embed.add_field(
             name="Next Steps",
             value="Use `/twitch add <username>` to add Twitch streamers to monitor.",
@@ -143,31 +296,106 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
-    @app_commands.command(name="add", description="Add a Twitch streamer to monitor for live announcements")
-    @app_commands.describe(username="The Twitch username to monitor (without @)")
+    @app_commands.command(name="games", description="Only announce streams of certain games")
+    @app_commands.describe(games="Comma-separated game names, e.g. Assetto Corsa (leave empty to announce every game)")
     @app_commands.default_permissions(manage_guild=True)
-    async def add_streamer(self, interaction: discord.Interaction, username: str):
+    async def set_games(self, interaction: discord.Interaction, games: Optional[str] = None):
         if not interaction.user.guild_permissions.manage_guild:
             embed = discord.Embed(
                 title="❌ Permission Denied",
-                description="You need the `Manage Server` permission to add Twitch streamers.",
+                description="You need the `Manage Server` permission to change the game filter.",
                 color=discord.Color.red()
             )
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-        async with aiosqlite.connect(twitch_db) as db:
-            cursor = await db.execute("SELECT channel_id FROM twitch_settings WHERE guild_id = ?", (interaction.guild_id,))
-            settings = await cursor.fetchone()
-            if not settings:
+        names = list(dict.fromkeys(name.strip() for name in (games or '').split(',') if name.strip()))
+        if len(names) > GAME_FILTER_MAX:
+            embed = discord.Embed(
+                title="❌ Too Many Games",
+                description=f"You can filter on at most {GAME_FILTER_MAX} games.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        resolved = {}
+        if names:
+            handler = self.bot.get_cog('TwitchAnnounceHandler')
+            if handler:
+                resolved = await handler.client.get_games(names, PRIORITY_INTERACTIVE)
+            if not handler or resolved is None:
+                embed = discord.Embed(
+                    title="❌ Service Error",
+                    description="Twitch service is not available. Please try again later.",
+                    color=discord.Color.red()
+                )
+                await interaction.response.send_message(embed=embed, ephemeral=True)
+                return
+            if not resolved:
                 embed = discord.Embed(
-                    title="❌ Setup Required",
-                    description="Please set up Twitch announcements first using `/twitch setup`.",
+                    title="❌ Games Not Found",
+                    description="None of those games exist on Twitch. Use the exact category name.",
                     color=discord.Color.red()
                 )
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
+        if not await self.db.set_guild_games(interaction.guild_id, resolved):
+            embed = discord.Embed(
+                title="❌ Setup Required",
+                description="Please set up Twitch announcements first using `/twitch setup`.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        tracker = _stream_tracker(self.bot)
+        if tracker:
+            tracker.set_game_filter(interaction.guild_id, resolved)
+
+        if not resolved:
+            embed = discord.Embed(
+                title="✅ Game Filter Cleared",
+                description="Streams of every game will be announced.",
+                color=discord.Color.green()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="✅ Game Filter Updated",
+            description=f"Only streams of these games will be announced: {_truncated_list(sorted(resolved.values()))}",
+            color=discord.Color.green()
+        )
+        found = {name.lower() for name in resolved.values()}
+        not_found = [name for name in names if name.lower() not in found]
+        if not_found:
+            embed.add_field(name="Not Found", value=_truncated_list(not_found), inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="add", description="Add a Twitch streamer to monitor for live announcements")
+    @app_commands.describe(username="The Twitch username to monitor (without @)")
+    @app_commands.default_permissions(manage_guild=True)
+    async def add_streamer(self, interaction: discord.Interaction, username: str):
+        if not interaction.user.guild_permissions.manage_guild:
+            embed = discord.Embed(
+                title="❌ Permission Denied",
+                description="You need the `Manage Server` permission to add Twitch streamers.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        if not await _guild_configured(self.bot, interaction.guild_id):
+            embed = discord.Embed(
+                title="❌ Setup Required",
+                description="Please set up Twitch announcements first using `/twitch setup`.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
         username = username.lower().strip().replace('@', '').replace('twitch.tv/', '')
 
         # Check if already monitoring
@@ -194,7 +422,7 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
             return
 
         # Check if user exists on Twitch
-        user_id = await handler.get_twitch_user_id(username)
+        user_id = await handler.get_twitch_user_id(username, PRIORITY_INTERACTIVE)
         if not user_id:
             embed = discord.Embed(
                 title="❌ User Not Found",
@@ -210,7 +438,7 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
             return
 
         # Get user profile information
-        user_info = await handler.get_user_info(user_id)
+        user_info = await handler.get_user_info(user_id, PRIORITY_INTERACTIVE)
         if not user_info:
             embed = discord.Embed(
                 title="❌ Profile Error",
@@ -254,6 +482,117 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
         
         await interaction.response.send_message(embed=confirm_embed, view=view, ephemeral=True)
 
+    @app_commands.command(name="import", description="Add many Twitch streamers at once from a list or text file")
+    @app_commands.describe(
+        usernames="Twitch usernames separated by spaces, commas or new lines",
+        file="A text file with one Twitch username per line"
+    )
+    @app_commands.default_permissions(manage_guild=True)
+    async def import_streamers(self, interaction: discord.Interaction, usernames: Optional[str] = None,
+                               file: Optional[discord.Attachment] = None):
+        if not interaction.user.guild_permissions.manage_guild:
+            embed = discord.Embed(
+                title="❌ Permission Denied",
+                description="You need the `Manage Server` permission to add Twitch streamers.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        if not usernames and not file:
+            embed = discord.Embed(
+                title="❌ Nothing to Import",
+                description="Provide a list of usernames or attach a text file with one username per line.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        if file and file.size > IMPORT_MAX_FILE_BYTES:
+            embed = discord.Embed(
+                title="❌ File Too Large",
+                description=f"Import files can be at most {IMPORT_MAX_FILE_BYTES // 1024} KB.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        if not await _guild_configured(self.bot, interaction.guild_id):
+            embed = discord.Embed(
+                title="❌ Setup Required",
+                description="Please set up Twitch announcements first using `/twitch setup`.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        handler = self.bot.get_cog('TwitchAnnounceHandler')
+        if not handler:
+            embed = discord.Embed(
+                title="❌ Service Error",
+                description="Twitch service is not available. Please try again later.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        text = usernames or ""
+        if file:
+            text += "\n" + (await file.read()).decode('utf-8', errors='ignore')
+        requested = _parse_usernames(text)
+        if len(requested) > IMPORT_MAX_USERNAMES:
+            embed = discord.Embed(
+                title="❌ Too Many Usernames",
+                description=f"You can import at most {IMPORT_MAX_USERNAMES} streamers at a time ({len(requested)} given).",
+                color=discord.Color.red()
+            )
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+
+        existing = await self.db.get_guild_usernames(interaction.guild_id)
+        already = [name for name in requested if name in existing]
+        invalid = [name for name in requested if name not in existing and not TWITCH_LOGIN_RE.match(name)]
+        candidates = [name for name in requested if name not in existing and TWITCH_LOGIN_RE.match(name)]
+
+        # Resolve logins 100 at a time through /users?login=
+        resolved = {}
+        failed = []
+        for i in range(0, len(candidates), HELIX_BATCH_SIZE):
+            batch = candidates[i:i + HELIX_BATCH_SIZE]
+            user_ids = await handler.client.get_user_ids(batch, PRIORITY_INTERACTIVE)
+            if user_ids is None:
+                failed.extend(batch)
+            else:
+                resolved.update(user_ids)
+        unknown = invalid + [name for name in candidates if name not in resolved and name not in failed]
+
+        to_add = [(name, resolved[name]) for name in candidates if name in resolved]
+        added = await self.db.add_streamers(interaction.guild_id, to_add) if to_add else 0
+
+        tracker = _stream_tracker(self.bot)
+        if tracker:
+            for name, user_id in to_add:
+                tracker.add(interaction.guild_id, name, user_id)
+
+        embed = discord.Embed(
+            title="📥 Twitch Import Complete",
+            description=f"Now monitoring **{added}** new streamer{'s' if added != 1 else ''} out of {len(requested)} submitted.",
+            color=discord.Color.green() if added and not unknown and not failed else discord.Color.orange()
+        )
+        if already:
+            embed.add_field(name=f"Already Monitored ({len(already)})", value=_truncated_list(already), inline=False)
+        if unknown:
+            embed.add_field(name=f"Unknown Usernames ({len(unknown)})", value=_truncated_list(unknown), inline=False)
+        if failed:
+            embed.add_field(
+                name=f"Not Checked ({len(failed)})",
+                value=_truncated_list(failed) + "\nTwitch could not be reached for these; run the import again to retry them.",
+                inline=False
+            )
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @app_commands.command(name="remove", description="Remove a Twitch streamer from monitoring")
     @app_commands.describe(username="The Twitch username to stop monitoring")
     @app_commands.default_permissions(manage_guild=True)
@@ -276,6 +615,10 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
             """, (interaction.guild_id, username))
             await db.commit()
 
+            tracker = _stream_tracker(self.bot)
+            if tracker:
+                tracker.remove(interaction.guild_id, username)
+
             if cursor.rowcount > 0:
                 embed = discord.Embed(
                     title="✅ Streamer Removed",
@@ -293,50 +636,94 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
 
     @app_commands.command(name="list", description="List all monitored Twitch streamers for this server")
     async def list_streamers(self, interaction: discord.Interaction):
-        async with aiosqlite.connect(twitch_db) as db:
-            cursor = await db.execute("""
-                SELECT twitch_username, is_live FROM twitch_streamers 
-                WHERE guild_id = ? ORDER BY twitch_username
-            """, (interaction.guild_id,))
-            streamers = await cursor.fetchall()
+        total, live = await self.db.count_streamers(interaction.guild_id)
+        if not total:
+            embed = discord.Embed(
+                title="📺 No Streamers Monitored",
+                description="No Twitch streamers are currently being monitored in this server.\nUse `/twitch add <username>` to add some!",
+                color=discord.Color.orange()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
 
-            if not streamers:
+        view = TwitchListView(self.db, interaction.guild_id, total, live)
+        await view.load()
+        if view.page_count > 1:
+            await interaction.response.send_message(embed=view.render(), view=view, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=view.render(), ephemeral=True)
+
+    @app_commands.command(name="history", description="Show stream history and totals for monitored streamers")
+    @app_commands.describe(username="A monitored Twitch username (leave empty for this server's top streamers)")
+    async def stream_history(self, interaction: discord.Interaction, username: Optional[str] = None):
+        if not username:
+            top = await self.db.get_guild_top_streamers(interaction.guild_id, HISTORY_TOP_STREAMERS)
+            if not top:
                 embed = discord.Embed(
-                    title="📺 No Streamers Monitored",
-                    description="No Twitch streamers are currently being monitored in this server.\nUse `/twitch add <username>` to add some!",
+                    title="📈 No Stream History",
+                    description="No streams have been recorded for this server's streamers yet.",
                     color=discord.Color.orange()
                 )
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            live_streamers = []
-            offline_streamers = []
-
-            for username, is_live in streamers:
-                if is_live:
-                    live_streamers.append(f"🔴 **{username}** (LIVE)")
-                else:
-                    offline_streamers.append(f"⚫ {username}")
-
-            description = ""
-            if live_streamers:
-                description += "**Currently Live:**\n" + "\n".join(live_streamers) + "\n\n"
-            if offline_streamers:
-                description += "**Offline:**\n" + "\n".join(offline_streamers)
-
+            lines = []
+            for i, (name, sessions, seconds, viewer_seconds, peak) in enumerate(top, 1):
+                avg = viewer_seconds / seconds if seconds else 0
+                lines.append(
+                    f"**{i}. {name}** — {seconds / 3600:.1f}h over {sessions} stream{'s' if sessions != 1 else ''} "
+                    f"· avg {avg:.0f} · peak {peak}"
+                )
             embed = discord.Embed(
-                title="📺 Monitored Twitch Streamers",
-                description=description,
+                title="📈 Top Streamers by Hours Streamed",
+                description="\n".join(lines),
                 color=discord.Color.purple()
             )
-            embed.set_footer(text=f"Total: {len(streamers)} streamers")
             await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        username = username.lower().strip().replace('@', '').replace('twitch.tv/', '')
+        user_id = await self.db.get_streamer_user_id(interaction.guild_id, username)
+        stats = await self.db.get_streamer_stats(user_id) if user_id else None
+        if not stats:
+            embed = discord.Embed(
+                title="📈 No Stream History",
+                description=f"No streams have been recorded for **{username}** yet."
+                            if user_id else f"**{username}** is not being monitored in this server.",
+                color=discord.Color.orange()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        sessions, seconds, viewer_seconds, peak, last_stream_at = stats
+        embed = discord.Embed(
+            title=f"📈 Stream History: {username}",
+            color=discord.Color.purple(),
+            url=f"https://twitch.tv/{username}"
+        )
+        embed.add_field(name="Streams", value=str(sessions), inline=True)
+        embed.add_field(name="Hours Streamed", value=f"{seconds / 3600:.1f}", inline=True)
+        embed.add_field(name="Average Viewers", value=f"{viewer_seconds / seconds:.0f}" if seconds else "0", inline=True)
+        embed.add_field(name="Peak Viewers", value=str(peak), inline=True)
+        embed.add_field(name="Last Stream", value=_relative_time(last_stream_at), inline=True)
+
+        recent = await self.db.get_recent_sessions(user_id, HISTORY_RECENT_SESSIONS)
+        lines = []
+        for started_at, ended_at, session_peak, avg, title, game_name in recent:
+            hours = (datetime.fromisoformat(ended_at) - datetime.fromisoformat(started_at)).total_seconds() / 3600
+            line = f"{_relative_time(started_at, 'd')} · {hours:.1f}h · avg {avg:.0f} · peak {session_peak}"
+            if game_name:
+                line += f" · *{game_name}*"
+            lines.append(line)
+        if lines:
+            embed.add_field(name="Recent Streams", value="\n".join(lines), inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="settings", description="View current Twitch announcement settings")
     async def view_settings(self, interaction: discord.Interaction):
         async with aiosqlite.connect(twitch_db) as db:
             cursor = await db.execute("""
-                SELECT channel_id, role_id FROM twitch_settings 
+                SELECT channel_id, role_id, games, message, color FROM twitch_settings 
                 WHERE guild_id = ?
             """, (interaction.guild_id,))
             settings = await cursor.fetchone()
@@ -350,7 +737,7 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-            channel_id, role_id = settings
+            channel_id, role_id, games, message, color = settings
             channel = interaction.guild.get_channel(channel_id)
             role = interaction.guild.get_role(role_id) if role_id else None
 
@@ -369,6 +756,11 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
             else:
                 embed.add_field(name="Ping Role", value="None", inline=False)
 
+            games = sorted(json.loads(games).values()) if games else []
+            embed.add_field(name="Games", value=_truncated_list(games) if games else "All games", inline=False)
+            embed.add_field(name="Message", value=f"`{message or DEFAULT_MESSAGE}`", inline=False)
+            embed.add_field(name="Color", value=f"#{color:06X}" if color is not None else "Twitch purple", inline=False)
+
             cursor = await db.execute("SELECT COUNT(*) FROM twitch_streamers WHERE guild_id = ?", (interaction.guild_id,))
             count = await cursor.fetchone()
             embed.add_field(name="Monitored Streamers", value=str(count[0]), inline=False)
@@ -392,6 +784,13 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
             cursor2 = await db.execute("DELETE FROM twitch_streamers WHERE guild_id = ?", (interaction.guild_id,))
             await db.commit()
 
+            tracker = _stream_tracker(self.bot)
+            if tracker:
+                tracker.remove_guild(interaction.guild_id)
+            templates = _announcement_templates(self.bot)
+            if templates:
+                templates.remove(interaction.guild_id)
+
             if cursor1.rowcount > 0:
                 embed = discord.Embed(
                     title="✅ Twitch Announcements Disabled",
@@ -407,5 +806,97 @@ class TwitchAnnounceCommands(commands.GroupCog, group_name="twitch"):
                 )
                 await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @app_commands.command(name="stats", description="Show Twitch poller metrics (bot owner only)")
+    @app_commands.describe(export="Attach all metrics in Prometheus text format")
+    async def view_stats(self, interaction: discord.Interaction, export: bool = False):
+        if not await self.bot.is_owner(interaction.user):
+            embed = discord.Embed(
+                title="❌ Permission Denied",
+                description="Only the bot owner can view Twitch poller metrics.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        handler = self.bot.get_cog('TwitchAnnounceHandler')
+        if not handler:
+            embed = discord.Embed(
+                title="❌ Service Error",
+                description="Twitch service is not available. Please try again later.",
+                color=discord.Color.red()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+
+        metrics = handler.metrics
+        gauges = handler.metric_gauges()
+        embed = discord.Embed(title="📊 Twitch Poller Stats", color=discord.Color.purple())
+
+        last = metrics.last_cycle
+        if last:
+            embed.add_field(
+                name="Last Cycle",
+                value=f"{last['duration']:.2f}s · {last['requests']} requests · {last['rate_limited']} × 429\n"
+                      f"Finished <t:{int(last['finished_at'])}:R>",
+                inline=False
+            )
+        embed.add_field(
+            name="Cycles",
+            value=f"{metrics.cycles} run · {metrics.cycle_timeouts} timed out · {metrics.cycles_skipped} skipped\n"
+                  f"Duration p50 ≤ {_bound(metrics.cycle_duration.quantile(0.5))}s, "
+                  f"p95 ≤ {_bound(metrics.cycle_duration.quantile(0.95))}s\n"
+                  f"Requests p50 ≤ {_bound(metrics.cycle_requests.quantile(0.5))}, "
+                  f"p95 ≤ {_bound(metrics.cycle_requests.quantile(0.95))}",
+            inline=False
+        )
+
+        endpoints = []
+        for endpoint, histogram in sorted(metrics.http_latency.items()):
+            endpoints.append(
+                f"`/{endpoint}` {histogram.count} calls · "
+                f"p50 ≤ {_bound(histogram.quantile(0.5))}s · p95 ≤ {_bound(histogram.quantile(0.95))}s · "
+                f"{metrics.rate_limited.get(endpoint, 0)} × 429"
+            )
+        embed.add_field(name="Helix Latency", value="\n".join(endpoints) or "No requests yet", inline=False)
+
+        embed.add_field(
+            name="Announcements",
+            value=f"{metrics.sends['delivered']} sent · {metrics.sends['failed']} failed · "
+                  f"{gauges['twitch_pending_announcements']} queued\n"
+                  f"Send latency p50 ≤ {_bound(metrics.send_latency.quantile(0.5))}s, "
+                  f"p95 ≤ {_bound(metrics.send_latency.quantile(0.95))}s",
+            inline=False
+        )
+        embed.add_field(
+            name="State",
+            value=f"{gauges['twitch_tracked_streamers']} tracked · {gauges['twitch_live_streamers']} live\n"
+                  f"Rate limit tokens: {gauges['twitch_ratelimit_tokens']:g} · "
+                  f"EventSub: {'connected' if gauges['twitch_eventsub_connected'] else 'off'}\n"
+                  f"Circuit breaker: {handler.client.breaker.state.replace('_', '-')} "
+                  f"(opened {gauges['twitch_circuit_opened']} times)",
+            inline=False
+        )
+
+        if export:
+            data = io.BytesIO(metrics.render_prometheus(gauges).encode())
+            await interaction.response.send_message(
+                embed=embed, file=discord.File(data, filename="twitch_metrics.prom"), ephemeral=True
+            )
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+def _relative_time(timestamp, style='R'):
+    """Discord timestamp markup for a stored ISO timestamp."""
+    try:
+        return f"<t:{int(datetime.fromisoformat(timestamp).timestamp())}:{style}>"
+    except (TypeError, ValueError):
+        return "Unknown"
+
+def _bound(value):
+    """Format a histogram bucket bound for display."""
+    if value is None:
+        return "–"
+    return "∞" if value == float('inf') else f"{value:g}"
+
 async def setup(bot):
     await bot.add_cog(TwitchAnnounceCommands(bot))
\ No newline at end of file
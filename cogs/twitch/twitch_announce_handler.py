@@ -1,254 +1,393 @@
-
 import discord
 from discord.ext import commands, tasks
-import aiosqlite
-import aiohttp
+import asyncio
 import os
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 import logging
-
-twitch_db = "data/twitch_announce.db"
+from .twitch_breaker import STATE_CODES
+from .twitch_client import TwitchClient, HELIX_BATCH_SIZE
+from .twitch_database import TwitchDatabase
+from .twitch_dispatch import AnnouncementDispatcher
+from .twitch_config import (
+    TWITCH_BREAKER_WINDOW,
+    TWITCH_EVENTSUB_TOKEN,
+    TWITCH_POLL_INTERVAL,
+    TWITCH_POLL_REQUEST_BUDGET,
+    TWITCH_POLL_CONCURRENCY,
+    TWITCH_POLL_CYCLE_TIMEOUT,
+    TWITCH_POLL_SPREAD,
+    TWITCH_POLL_JITTER,
+    TWITCH_REQUEST_TIMEOUT,
+    TWITCH_METRICS_FILE,
+    TWITCH_POLL_INSTANCE_ID,
+    TWITCH_POLL_LEASE_SECONDS,
+    TWITCH_POLL_SHARD_REFRESH,
+)
+from .twitch_eventsub import EventSubWebSocket
+from .twitch_live_messages import LiveMessageUpdater
+from .twitch_metrics import TwitchMetrics
+from .twitch_poll_schedule import AdaptivePollScheduler, spread_offsets
+from .twitch_ratelimit import PRIORITY_BACKGROUND
+from .twitch_shard import ShardCoordinator
+from .twitch_state import StreamTracker, OFFLINE
+from .twitch_templates import TemplateCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds over which a tick's batches are spread; the last one still starts
+# early enough to finish before the cycle timeout
+POLL_SPREAD_WINDOW = max(0.0, min(
+    TWITCH_POLL_SPREAD * TWITCH_POLL_INTERVAL,
+    TWITCH_POLL_CYCLE_TIMEOUT - TWITCH_REQUEST_TIMEOUT
+))
 
 class TwitchAnnounceHandler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.twitch_client_id = os.getenv('TWITCH_CLIENT_ID')
-        self.twitch_client_secret = os.getenv('TWITCH_CLIENT_SECRET')
-        self.twitch_access_token = None
-        self.token_expires_at = None
+        self.db = TwitchDatabase()
+        self.metrics = TwitchMetrics()
+        self.client = TwitchClient(
+            os.getenv('TWITCH_CLIENT_ID'), os.getenv('TWITCH_CLIENT_SECRET'),
+            token_store=self.db, metrics=self.metrics
+        )
+        self.templates = TemplateCache(bot)
+        self.schedule = AdaptivePollScheduler()
+        self.tracker = StreamTracker()
+        self._tracker_loaded_at = 0.0
+        self._owned = []
+        self._owned_key = None
+        self.shards = ShardCoordinator(self.db, TWITCH_POLL_INSTANCE_ID, TWITCH_POLL_LEASE_SECONDS)
+        self._helix_slots = asyncio.Semaphore(TWITCH_POLL_CONCURRENCY)
+        self.dispatcher = AnnouncementDispatcher(
+            bot, self.render_live_announcement, self.render_digest, metrics=self.metrics,
+            # Guilds owned by this poller may live on another process's Discord shard
+            uncached_channels=self.shards.enabled, on_sent=self._record_announcement,
+            resolve_channel=self.templates.channel
+        )
+        self.live_messages = LiveMessageUpdater(
+            self.db, self.dispatcher,
+            self.render_live_announcement, self.render_ended_announcement, self.get_user_info
+        )
+        self.eventsub = None
+        if TWITCH_EVENTSUB_TOKEN:
+            self.eventsub = EventSubWebSocket(
+                self.client, TWITCH_EVENTSUB_TOKEN,
+                self.handle_stream_online, self.handle_stream_offline
+            )
         self.check_live_streams.start()
 
-    def cog_unload(self):
+    async def cog_load(self):
+        # Warm the tracker, templates and announcement records in bulk before
+        # the gateway starts dispatching, so first interactions hit memory
+        started = time.perf_counter()
+        await self.db.initialize()
+        await self._load_tracker()
+        await self.live_messages.load()
+        logger.info(f"Twitch state warmed up in {(time.perf_counter() - started) * 1000:.0f} ms "
+                    f"({len(self.tracker.settings)} guilds, {self.tracker.registry.subscriptions} subscriptions)")
+        self.client.start()
+        if self.eventsub:
+            self.eventsub.start()
+
+    async def cog_unload(self):
         self.check_live_streams.cancel()
-
-    async def get_twitch_access_token(self):
-        if self.twitch_access_token and self.token_expires_at and datetime.now(timezone.utc) < self.token_expires_at:
-            return self.twitch_access_token
-
-        if not self.twitch_client_id or not self.twitch_client_secret:
-            logging.error("Twitch Client ID or Client Secret not set in environment variables")
-            return None
-
-        url = "https://id.twitch.tv/oauth2/token"
-        data = {
-            'client_id': self.twitch_client_id,
-            'client_secret': self.twitch_client_secret,
-            'grant_type': 'client_credentials'
-        }
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, data=data) as response:
-                    if response.status == 200:
-                        token_data = await response.json()
-                        self.twitch_access_token = token_data['access_token']
-                        expires_in = token_data.get('expires_in', 3600)
-                        self.token_expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in - 300)
-                        return self.twitch_access_token
-                    else:
-                        logging.error(f"Failed to get Twitch access token: {response.status}")
-                        return None
-        except Exception as e:
-            logging.error(f"Error getting Twitch access token: {e}")
-            return None
-
-    async def get_twitch_user_id(self, username):
+        await self.dispatcher.close()
+        await self.live_messages.close()
+        if self.eventsub:
+            await self.eventsub.stop()
+        await self.shards.release()
+        await self.client.close()
+
+    async def _load_tracker(self, keep=()):
+        settings, streamers = await self.db.load_state()
+        self.tracker.load([row[:4] for row in settings], streamers, keep)
+        self.templates.load([(guild_id, channel_id, role_id, message, color)
+                             for guild_id, channel_id, role_id, _, message, color in settings])
+        self._tracker_loaded_at = time.monotonic()
+
+    async def get_twitch_user_id(self, username, priority=PRIORITY_BACKGROUND):
         """Get Twitch user ID from username"""
-        access_token = await self.get_twitch_access_token()
-        if not access_token:
-            return None
-
-        url = f"https://api.twitch.tv/helix/users?login={username}"
-        headers = {
-            'Client-ID': self.twitch_client_id,
-            'Authorization': f'Bearer {access_token}'
-        }
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data['data']:
-                            return data['data'][0]['id']
-                    return None
-        except Exception as e:
-            logging.error(f"Error getting Twitch user ID for {username}: {e}")
-            return None
-
-    async def check_stream_status(self, user_id):
-        access_token = await self.get_twitch_access_token()
-        if not access_token:
-            return None
-
-        url = f"https://api.twitch.tv/helix/streams?user_id={user_id}"
-        headers = {
-            'Client-ID': self.twitch_client_id,
-            'Authorization': f'Bearer {access_token}'
-        }
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data['data']:
-                            stream_data = data['data'][0]
-                            return {
-                                'is_live': True,
-                                'stream_id': stream_data['id'],
-                                'title': stream_data['title'],
-                                'game_name': stream_data['game_name'],
-                                'viewer_count': stream_data['viewer_count'],
-                                'started_at': stream_data['started_at'],
-                                'thumbnail_url': stream_data['thumbnail_url']
-                            }
-                        else:
-                            return {'is_live': False}
-                    return None
-        except Exception as e:
-            logging.error(f"Error checking stream status for user {user_id}: {e}")
-            return None
-
-    async def get_user_info(self, user_id):
-        access_token = await self.get_twitch_access_token()
-        if not access_token:
-            return None
-
-        url = f"https://api.twitch.tv/helix/users?id={user_id}"
-        headers = {
-            'Client-ID': self.twitch_client_id,
-            'Authorization': f'Bearer {access_token}'
-        }
-
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data['data']:
-                            user_data = data['data'][0]
-                            return {
-                                'display_name': user_data['display_name'],
-                                'profile_image_url': user_data['profile_image_url'],
-                                'login': user_data['login']
-                            }
-                    return None
-        except Exception as e:
-            logging.error(f"Error getting user info for {user_id}: {e}")
-            return None
-
-    @tasks.loop(minutes=2)
+        return await self.client.get_user_id(username, priority)
+
+    async def check_stream_status(self, user_id, priority=PRIORITY_BACKGROUND):
+        return await self.client.get_stream(user_id, priority)
+
+    async def get_user_info(self, user_id, priority=PRIORITY_BACKGROUND):
+        return await self.client.get_user_info(user_id, priority)
+
+    async def _apply_stream_status(self, user_id, stream_status, transitions):
+        """Feed a stream status into the tracker and announce new go-lives.
+
+        Subscriber rows whose stored state changes are appended to
+        ``transitions`` (a ``(went_live, went_offline)`` pair of lists) for
+        the caller to checkpoint in one go.
+        """
+        went_live, went_offline = transitions
+        games = self.tracker.game_filter(user_id)
+        if stream_status['is_live'] and (games is None or stream_status.get('game_id') in games):
+            stream_id = stream_status['stream_id']
+            live_at = datetime.now(timezone.utc).isoformat()
+            # Claimed until marked announced; whatever is left is released
+            # below so the next check retries it
+            claimed = self.tracker.observe_live(user_id, stream_id)
+            try:
+                targets = []
+                for guild_id, username in claimed:
+                    if not self.tracker.allows_game(guild_id, stream_status.get('game_id')):
+                        continue
+                    if self.live_messages.announced(user_id, guild_id, stream_id):
+                        # Posted before a restart that lost the checkpoint
+                        self.tracker.mark_announced(user_id, guild_id, stream_id)
+                        went_live.append((stream_id, live_at, guild_id, username))
+                        continue
+                    targets.append((guild_id, username))
+                self.tracker.record_sample(user_id, stream_status)
+                self.live_messages.refresh(user_id, stream_status)
+                if not targets:
+                    return
+
+                async with self._helix_slots:
+                    user_info = await self.get_user_info(user_id)
+                if not user_info:
+                    # Subscribers stay unannounced and are retried on the next check
+                    return
+
+                for guild_id, username in targets:
+                    settings = self.tracker.settings.get(guild_id)
+                    if not settings:
+                        continue
+                    channel_id, role_id = settings
+                    await self.send_live_announcement(
+                        guild_id, channel_id, role_id,
+                        username, user_info, stream_status
+                    )
+                    self.tracker.mark_announced(user_id, guild_id, stream_id)
+                    went_live.append((stream_id, live_at, guild_id, username))
+            finally:
+                for guild_id, _ in claimed:
+                    self.tracker.release(user_id, guild_id)
+
+        else:
+            went_offline.extend(self.tracker.observe_offline(user_id))
+
+    def _observe_schedule(self, user_id, now=None):
+        stream = self.tracker.get(user_id)
+        if stream:
+            self.schedule.observe(user_id, stream.state != OFFLINE, now)
+
+    async def handle_stream_online(self, user_id, event):
+        """Push path: a monitored broadcaster went live."""
+        # /streams can trail the notification by a few seconds
+        stream_status = None
+        for _ in range(3):
+            stream_status = await self.check_stream_status(user_id)
+            if stream_status and stream_status['is_live']:
+                break
+            await asyncio.sleep(5)
+        if not stream_status or not stream_status['is_live']:
+            return
+
+        transitions = ([], [])
+        await self._apply_stream_status(user_id, stream_status, transitions)
+        self._observe_schedule(user_id)
+        await self._checkpoint(transitions)
+
+    async def handle_stream_offline(self, user_id, event):
+        """Push path: a monitored broadcaster ended their stream."""
+        transitions = ([], [])
+        await self._apply_stream_status(user_id, {'is_live': False}, transitions)
+        self._observe_schedule(user_id)
+        await self._checkpoint(transitions)
+
+    async def _checkpoint(self, transitions):
+        """Write transitions and any finished sessions in one transaction,
+        and switch announcements of ended streams to their final state."""
+        sessions = self.tracker.drain_sessions()
+        finished = {session[0]: session for session in sessions}
+        for user_id in self.tracker.drain_ended():
+            self.live_messages.finish(user_id, finished.get(user_id))
+        await self.db.save_transitions(*transitions, sessions)
+
+    async def _record_announcement(self, announcements, message, digest):
+        await self.live_messages.add(announcements, message, digest)
+
+    async def _resolve_user_ids(self):
+        """Resolve and store Twitch IDs for rows added before IDs were kept."""
+        missing = sorted({username for _, username in self.tracker.unresolved})
+        resolved = {}
+        for i in range(0, len(missing), HELIX_BATCH_SIZE):
+            user_ids = await self.client.get_user_ids(missing[i:i + HELIX_BATCH_SIZE])
+            if user_ids:
+                resolved.update(user_ids)
+        await self.db.set_twitch_user_ids(resolved)
+
+        for guild_id, username in list(self.tracker.unresolved):
+            if username in resolved:
+                self.tracker.resolve(guild_id, username, resolved[username])
+
+    @tasks.loop(seconds=TWITCH_POLL_INTERVAL)
     async def check_live_streams(self):
+        if self.client.breaker.blocking:
+            # Helix is down; wait for the breaker's next probe
+            self.metrics.cycles_skipped += 1
+            self._export_metrics()
+            return
+
+        timed_out = False
+        self.metrics.start_cycle()
         try:
-            async with aiosqlite.connect(twitch_db) as db:
-                cursor = await db.execute("""
-                    SELECT s.guild_id, s.twitch_username, s.is_live, s.last_stream_id,
-                           st.channel_id, st.role_id
-                    FROM twitch_streamers s
-                    JOIN twitch_settings st ON s.guild_id = st.guild_id
-                """)
-                streamers = await cursor.fetchall()
-
-                for guild_id, username, is_currently_live, last_stream_id, channel_id, role_id in streamers:
-                    try:
-                        user_id = await self.get_twitch_user_id(username)
-                        if not user_id:
-                            continue
-                        stream_status = await self.check_stream_status(user_id)
-                        if not stream_status:
-                            continue
-
-                        if stream_status['is_live'] and not is_currently_live:
-                            stream_id = stream_status['stream_id']
-                            
-                            if stream_id == last_stream_id:
-                                continue
-
-                            user_info = await self.get_user_info(user_id)
-                            if not user_info:
-                                continue
-
-                            await self.send_live_announcement(
-                                guild_id, channel_id, role_id, 
-                                username, user_info, stream_status
-                            )
-
-                            await db.execute("""
-                                UPDATE twitch_streamers 
-                                SET is_live = 1, last_stream_id = ?
-                                WHERE guild_id = ? AND twitch_username = ?
-                            """, (stream_id, guild_id, username))
-
-                        elif not stream_status['is_live'] and is_currently_live:
-                            await db.execute("""
-                                UPDATE twitch_streamers 
-                                SET is_live = 0
-                                WHERE guild_id = ? AND twitch_username = ?
-                            """, (guild_id, username))
-
-                        await db.commit()
-
-                    except Exception as e:
-                        logging.error(f"Error processing streamer {username} in guild {guild_id}: {e}")
-                        continue
-
+            await asyncio.wait_for(self._run_poll_cycle(), timeout=TWITCH_POLL_CYCLE_TIMEOUT)
+        except asyncio.TimeoutError:
+            timed_out = True
+            logging.error(f"check_live_streams cycle exceeded {TWITCH_POLL_CYCLE_TIMEOUT}s and was cut short")
         except Exception as e:
             logging.error(f"Error in check_live_streams task: {e}")
+        finally:
+            self.metrics.end_cycle(timed_out)
+            self._export_metrics()
+
+    def _export_metrics(self):
+        if TWITCH_METRICS_FILE:
+            self.metrics.export(TWITCH_METRICS_FILE, self.metric_gauges())
+
+    def metric_gauges(self):
+        """Point-in-time values exported alongside the cycle metrics."""
+        return {
+            'twitch_tracked_streamers': len(self.tracker.streams),
+            'twitch_subscriptions': self.tracker.registry.subscriptions,
+            'twitch_registry_bytes': self.tracker.registry.nbytes(),
+            'twitch_live_streamers': sum(1 for stream in self.tracker.streams.values() if stream.state != OFFLINE),
+            'twitch_pending_announcements': self.dispatcher.pending,
+            'twitch_ratelimit_tokens': round(self.client.limiter.tokens, 1),
+            'twitch_eventsub_connected': int(bool(self.eventsub and self.eventsub.connected)),
+            'twitch_circuit_state': STATE_CODES[self.client.breaker.state],
+            'twitch_circuit_opened': self.client.breaker.opened,
+        }
 
-    async def send_live_announcement(self, guild_id, channel_id, role_id, username, user_info, stream_status):
+    async def _run_poll_cycle(self):
+        now = datetime.now(timezone.utc)
+        if self.shards.enabled:
+            changed = await self.shards.renew()
+            if changed or time.monotonic() - self._tracker_loaded_at >= TWITCH_POLL_SHARD_REFRESH:
+                # Other instances checkpoint their ranges and may add streamers;
+                # pick up their writes before taking over any of their IDs.
+                # IDs polled here keep their sessions and grace windows.
+                await self._load_tracker(keep=self._owned)
+
+        if self.tracker.unresolved:
+            await self._resolve_user_ids()
+
+        # Only rebuilt when tracked IDs or this instance's shard range change
+        owned_key = (self.tracker.version, self.shards.index, self.shards.count)
+        if owned_key != self._owned_key:
+            self._owned = [user_id for user_id in self.tracker.streams if self.shards.owns(user_id)]
+            self.schedule.sync({
+                user_id: (self.tracker.streams[user_id].state != OFFLINE, self.tracker.streams[user_id].last_live_at)
+                for user_id in self._owned
+            })
+            self._owned_key = owned_key
+            # At most one /streams request per batch each tick
+            batches = -(-len(self._owned) // HELIX_BATCH_SIZE)
+            self.client.breaker.scale(batches * TWITCH_BREAKER_WINDOW / TWITCH_POLL_INTERVAL)
+        owned = self._owned
+
+        if self.eventsub:
+            await self.eventsub.sync(owned)
+        # EventSub detects go-lives for the IDs it covers; they are polled on
+        # a long fallback interval while offline, and as usual once live for
+        # viewer, title and game updates
+        self.schedule.set_pushed(self.eventsub.covered_ids() if self.eventsub else ())
+
+        # Streams that stayed offline past the grace window end now
+        await asyncio.shield(self._checkpoint(([], self.tracker.expire_ending(now))))
+
+        due = self.schedule.due(now, TWITCH_POLL_REQUEST_BUDGET * HELIX_BATCH_SIZE, batch_size=HELIX_BATCH_SIZE)
+        # Streamers whose guilds all restrict games are batched by their
+        # allowlist so Twitch filters /streams server-side
+        groups = {}
+        for user_id in due:
+            groups.setdefault(self.tracker.game_filter(user_id), []).append(user_id)
+        batches = [
+            (user_ids[i:i + HELIX_BATCH_SIZE], games)
+            for games, user_ids in groups.items()
+            for i in range(0, len(user_ids), HELIX_BATCH_SIZE)
+        ]
+        # Split groups can need a few extra requests; the rest stay due
+        batches = batches[:TWITCH_POLL_REQUEST_BUDGET]
+        offsets = spread_offsets(len(batches), POLL_SPREAD_WINDOW, TWITCH_POLL_JITTER)
+        results = await asyncio.gather(
+            *(self._poll_batch(batch, games, now, delay) for (batch, games), delay in zip(batches, offsets)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error(f"Error polling a streamer batch: {result}")
+
+    async def _poll_batch(self, batch, games, now, delay=0.0):
+        """Poll one batch ``delay`` seconds into the cycle and checkpoint
+        its transitions."""
+        if delay:
+            await asyncio.sleep(delay)
+
+        transitions = ([], [])
         try:
-            guild = self.bot.get_guild(guild_id)
-            if not guild:
-                return
-
-            channel = guild.get_channel(channel_id)
-            if not channel:
+            async with self._helix_slots:
+                statuses = await self.client.get_streams(batch, game_ids=games)
+            if statuses is None:
+                # Left unobserved, so these stay due for the next tick
                 return
 
-            embed = discord.Embed(
-                title=f"🔴 {user_info['display_name']} is now live on Twitch!",
-                description=stream_status['title'],
-                color=0x9146FF,
-                url=f"https://twitch.tv/{user_info['login']}"
-            )
-
-            if stream_status['game_name']:
-                embed.add_field(name="Game", value=stream_status['game_name'], inline=True)
-            
-            embed.add_field(name="Viewers", value=str(stream_status['viewer_count']), inline=True)
-            
-            try:
-                started_at = datetime.fromisoformat(stream_status['started_at'].replace('Z', '+00:00'))
-                embed.add_field(name="Started", value=f"<t:{int(started_at.timestamp())}:R>", inline=True)
-            except:
-                pass
-
-            if stream_status['thumbnail_url']:
-                thumbnail_url = stream_status['thumbnail_url'].format(width=320, height=180)
-                embed.set_image(url=thumbnail_url)
-
-            if user_info['profile_image_url']:
-                embed.set_author(
-                    name=user_info['display_name'],
-                    icon_url=user_info['profile_image_url'],
-                    url=f"https://twitch.tv/{user_info['login']}"
-                )
-
-            embed.set_footer(text="Twitch", icon_url="https://static-cdn.jtvnw.net/jtv_user_pictures/8a6381c7-d0c0-4576-b179-38bd5ce1d6af-profile_image-70x70.png")
+            async def process(user_id):
+                try:
+                    await self._apply_stream_status(user_id, statuses[user_id], transitions)
+                except Exception as e:
+                    logging.error(f"Error processing Twitch user {user_id}: {e}")
+                # Scheduled from the cycle start, not the batch's slot, so the
+                # streamer is due again at the next tick
+                self._observe_schedule(user_id, now)
+
+            await asyncio.gather(*(process(user_id) for user_id in batch))
+        finally:
+            # Checkpoint even if the cycle is cut short, so announcements
+            # already queued are never repeated
+            await asyncio.shield(self._checkpoint(transitions))
 
-            content = ""
-            if role_id:
-                role = guild.get_role(role_id)
-                if role:
-                    content = f"{role.mention} "
-
-            content += f"**{user_info['display_name']}** is now live! 🎮"
-
-            await channel.send(content=content, embed=embed)
-
-        except Exception as e:
-            logging.error(f"Error sending live announcement for {username}: {e}")
+    async def send_live_announcement(self, guild_id, channel_id, role_id, username, user_info, stream_status):
+        """Queue a live announcement; the dispatcher delivers it to Discord."""
+        self.dispatcher.enqueue({
+            'guild_id': guild_id,
+            'channel_id': channel_id,
+            'role_id': role_id,
+            'username': username,
+            'user_info': user_info,
+            'stream_status': stream_status
+        })
+
+    def render_live_announcement(self, guild, announcement):
+        template = self.templates.get(announcement['guild_id'], announcement['role_id'])
+        return template.render_live(announcement['user_info'], announcement['stream_status'])
+
+    def render_ended_announcement(self, guild, announcement, session):
+        template = self.templates.get(announcement['guild_id'], announcement['role_id'])
+        return template.render_ended(announcement['user_info'], announcement['stream_status'], session)
+
+    def render_digest(self, guild, announcements):
+        template = self.templates.get(announcements[0]['guild_id'], announcements[0]['role_id'])
+        return template.render_digest(announcements)
+
+    # Cached templates hold channel and role objects; recompile on changes
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.templates.invalidate(channel.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.templates.invalidate(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild):
+        self.templates.invalidate(guild.id)
 
     @check_live_streams.before_loop
     async def before_check_live_streams(self):
@@ -0,0 +1,135 @@
+"""
+Helix Circuit Breaker
+
+Stops the bot hammering Twitch while Helix is down. The breaker watches the
+outcome of recent requests; once enough of them fail (server errors and
+timeouts, not 4xx or rate limiting) it opens and requests fail fast without
+touching the network, so the poller skips whole cycles. After a backoff a
+single half-open probe is let through: success closes the breaker, failure
+reopens it with the backoff doubled. Only the probe's own outcome counts;
+requests still in flight from before the breaker opened are ignored.
+
+Helix batches 100 IDs per request, so a small deployment makes only a few
+requests per window; ``scale`` lowers the request threshold to the expected
+rate so the breaker can still trip.
+
+    CLOSED --error rate over threshold--> OPEN --backoff elapsed--> HALF_OPEN
+      ^                                    ^                           |
+      +-----------probe succeeded----------+------probe failed---------+
+"""
+
+import logging
+import math
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Numeric state codes for metrics export
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Fewest requests in a window the breaker ever judges the error rate on
+MIN_REQUESTS_FLOOR = 2
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker with exponential half-open backoff."""
+
+    def __init__(self, error_rate: float, min_requests: int, window: float,
+                 backoff: float, max_backoff: float) -> None:
+        self.error_rate = error_rate
+        self.max_min_requests = min_requests
+        self.min_requests = min_requests
+        self.window = window
+        self.base_backoff = backoff
+        self.max_backoff = max_backoff
+        self.state = CLOSED
+        self.backoff = backoff
+        self.open_until = 0.0
+        self.opened = 0
+        self._outcomes = deque()
+        self._probing = False
+
+    @property
+    def closed(self) -> bool:
+        return self.state == CLOSED
+
+    @property
+    def probing(self) -> bool:
+        """True while the half-open probe is out; right after allow(), the
+        caller's request is that probe."""
+        return self.state == HALF_OPEN and self._probing
+
+    @property
+    def blocking(self) -> bool:
+        """True while open and not yet due for a probe."""
+        return self.state == OPEN and time.monotonic() < self.open_until
+
+    def allow(self) -> bool:
+        """Whether a request may go out now."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() < self.open_until:
+                return False
+            self.state = HALF_OPEN
+            self._probing = False
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def scale(self, requests_per_window: float) -> None:
+        """Judge the error rate after as many requests as are expected per
+        window, between MIN_REQUESTS_FLOOR and the configured minimum."""
+        expected = math.ceil(requests_per_window)
+        self.min_requests = max(MIN_REQUESTS_FLOOR, min(self.max_min_requests, expected))
+
+    def abandon(self, probe: bool = False) -> None:
+        """A request let through by allow() ended without an outcome
+        (cancelled, or failed before a response).
+
+        An abandoned probe counts as failed, so the breaker reopens and
+        probes again after the backoff instead of staying half-open.
+        """
+        if probe:
+            self.record(False, probe=True)
+
+    def record(self, success: bool, probe: bool = False) -> None:
+        """Count a request's outcome; ``probe`` is whether it was sent as
+        the half-open probe (``probing`` right after its allow())."""
+        now = time.monotonic()
+        if self.state == HALF_OPEN:
+            if not probe or not self._probing:
+                # Sent before the breaker opened; says nothing about recovery
+                return
+            self._probing = False
+            if success:
+                logging.info("Twitch API recovered; circuit breaker closed")
+                self.state = CLOSED
+                self.backoff = self.base_backoff
+                self._outcomes.clear()
+            else:
+                self._open(now, min(self.backoff * 2, self.max_backoff))
+            return
+        if self.state == OPEN:
+            return
+
+        self._outcomes.append((now, success))
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+        if len(self._outcomes) < self.min_requests:
+            return
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        if failures / len(self._outcomes) >= self.error_rate:
+            self._open(now, self.base_backoff)
+
+    def _open(self, now: float, backoff: float) -> None:
+        self.state = OPEN
+        self.backoff = backoff
+        self.open_until = now + backoff
+        self.opened += 1
+        self._outcomes.clear()
+        logging.error(f"Twitch API failing; circuit breaker open, next probe in {backoff:.0f}s")
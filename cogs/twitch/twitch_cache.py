@@ -0,0 +1,88 @@
+"""
+Helix Response Cache
+
+Small in-process cache for Helix lookups that rarely change, such as
+``/users``. Responses are stored by request URL with a TTL; once an entry goes
+stale it is revalidated with ``If-None-Match`` when Helix supplied an ETag,
+so an unchanged resource costs a 304 instead of a full payload. Logins that
+Helix reported as nonexistent are remembered for a while as well, so a
+misspelled name typed again does not cost another request.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlencode
+
+
+class CacheEntry:
+    __slots__ = ('payload', 'etag', 'expires_at')
+
+    def __init__(self, payload: Dict[str, Any], etag: Optional[str], expires_at: float) -> None:
+        self.payload = payload
+        self.etag = etag
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class HelixCache:
+    """URL-keyed response cache with LRU eviction and a negative login cache."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._missing: Dict[str, float] = {}
+
+    @staticmethod
+    def key(path: str, params: Any) -> str:
+        return f"{path}?{urlencode(params or [])}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key, fresh or stale, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: str, payload: Dict[str, Any], ttl: float, etag: Optional[str] = None) -> None:
+        self._entries[key] = CacheEntry(payload, etag, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def revalidated(self, key: str, ttl: float) -> Optional[Dict[str, Any]]:
+        """Extend an entry after a 304 and return its payload."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        entry.expires_at = time.monotonic() + ttl
+        return entry.payload
+
+    def store_users(self, users: Iterable[Dict[str, Any]], ttl: float) -> None:
+        """Seed single-user entries from any /users response, so a login
+        lookup also answers the follow-up lookup by ID and vice versa."""
+        for user in users:
+            payload = {'data': [user]}
+            self.store(self.key('users', {'id': user['id']}), payload, ttl)
+            self.store(self.key('users', {'login': user['login']}), payload, ttl)
+            self._missing.pop(user['login'], None)
+
+    def is_missing(self, login: str) -> bool:
+        expires_at = self._missing.get(login)
+        if expires_at is None:
+            return False
+        if time.monotonic() >= expires_at:
+            del self._missing[login]
+            return False
+        return True
+
+    def mark_missing(self, login: str, ttl: float) -> None:
+        if len(self._missing) >= self.max_entries:
+            now = time.monotonic()
+            self._missing = {name: expiry for name, expiry in self._missing.items() if expiry > now}
+            if len(self._missing) >= self.max_entries:
+                del self._missing[next(iter(self._missing))]
+        self._missing[login] = time.monotonic() + ttl
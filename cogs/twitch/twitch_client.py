@@ -0,0 +1,429 @@
+"""
+Twitch Helix Client
+
+Shared HTTP client for the Twitch integration. Every Helix call goes through
+``helix_request`` so that a single rate limiter sees all traffic, 429 responses
+are retried once the bucket resets, and user-initiated lookups can jump ahead
+of background polling.
+
+The app access token is fetched once for all concurrent callers, refreshed
+in the background ahead of expiry and, when ``cryptography`` is installed,
+cached encrypted in the local database so restarts can reuse it. User lookups
+go through a ``HelixCache`` so repeated lookups of the same login or ID are
+served locally. A ``CircuitBreaker`` makes requests fail fast while Helix is
+having an outage.
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+import aiohttp
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
+
+from .twitch_config import (
+    TWITCH_API_BASE,
+    TWITCH_OAUTH_URL,
+    TWITCH_RATELIMIT_BUCKET,
+    TWITCH_RATELIMIT_WINDOW,
+    TWITCH_MAX_RETRIES,
+    TWITCH_REQUEST_TIMEOUT,
+    TWITCH_TOKEN_REFRESH_MARGIN,
+    TWITCH_CACHE_MAX_ENTRIES,
+    TWITCH_USER_CACHE_TTL,
+    TWITCH_MISSING_LOGIN_TTL,
+    TWITCH_BREAKER_ERROR_RATE,
+    TWITCH_BREAKER_MIN_REQUESTS,
+    TWITCH_BREAKER_WINDOW,
+    TWITCH_BREAKER_BACKOFF,
+    TWITCH_BREAKER_MAX_BACKOFF,
+)
+from .twitch_breaker import CircuitBreaker
+from .twitch_cache import HelixCache
+from .twitch_ratelimit import HelixRateLimiter, PRIORITY_BACKGROUND
+
+# Helix accepts at most 100 IDs or logins per lookup
+HELIX_BATCH_SIZE = 100
+
+
+class TwitchClient:
+    """Rate-limit-aware client for the Twitch Helix API."""
+
+    def __init__(self, client_id: Optional[str], client_secret: Optional[str], token_store=None,
+                 metrics=None) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.access_token: Optional[str] = None
+        self.token_expires_at: Optional[datetime] = None
+        self.limiter = HelixRateLimiter(TWITCH_RATELIMIT_BUCKET, TWITCH_RATELIMIT_WINDOW)
+        self.cache = HelixCache(TWITCH_CACHE_MAX_ENTRIES)
+        self.breaker = CircuitBreaker(
+            TWITCH_BREAKER_ERROR_RATE, TWITCH_BREAKER_MIN_REQUESTS, TWITCH_BREAKER_WINDOW,
+            TWITCH_BREAKER_BACKOFF, TWITCH_BREAKER_MAX_BACKOFF
+        )
+        # Optional TwitchMetrics that records every Helix response
+        self.metrics = metrics
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Optional TwitchDatabase used to keep the app token across restarts
+        self.token_store = token_store
+        self._cipher = _token_cipher(client_secret) if token_store else None
+        self._token_loaded = self._cipher is None
+        self._token_refresh: Optional[asyncio.Task] = None
+        self._token_refresher: Optional[asyncio.Task] = None
+        if token_store and self._cipher is None:
+            logging.warning("cryptography is not installed; the Twitch app token will not be cached")
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=TWITCH_REQUEST_TIMEOUT))
+        return self._session
+
+    def start(self) -> None:
+        """Keep the app access token refreshed in the background."""
+        if self._token_refresher is None or self._token_refresher.done():
+            self._token_refresher = asyncio.create_task(self._refresh_loop())
+
+    async def close(self) -> None:
+        for task in (self._token_refresher, self._token_refresh):
+            if task and not task.done():
+                task.cancel()
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    def _token_valid(self, margin: int = 0) -> bool:
+        return bool(
+            self.access_token and self.token_expires_at
+            and datetime.now(timezone.utc) + timedelta(seconds=margin) < self.token_expires_at
+        )
+
+    async def get_access_token(self) -> Optional[str]:
+        if self._token_valid(TWITCH_TOKEN_REFRESH_MARGIN):
+            return self.access_token
+
+        if not self.client_id or not self.client_secret:
+            logging.error("Twitch Client ID or Client Secret not set in environment variables")
+            return None
+
+        # Concurrent callers share a single in-flight refresh
+        if self._token_refresh is None or self._token_refresh.done():
+            self._token_refresh = asyncio.create_task(self._refresh_token())
+        return await asyncio.shield(self._token_refresh)
+
+    def invalidate_token(self, access_token: str) -> None:
+        """Drop a token Twitch rejected, unless it was already replaced."""
+        if self.access_token == access_token:
+            self.access_token = None
+
+    async def _refresh_token(self) -> Optional[str]:
+        if not self._token_loaded:
+            self._token_loaded = True
+            await self._load_token()
+            if self._token_valid(TWITCH_TOKEN_REFRESH_MARGIN):
+                return self.access_token
+
+        data = {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'grant_type': 'client_credentials'
+        }
+
+        for attempt in range(TWITCH_MAX_RETRIES + 1):
+            try:
+                async with self.session.post(TWITCH_OAUTH_URL, data=data) as response:
+                    if response.status == 200:
+                        token_data = await response.json()
+                        self.access_token = token_data['access_token']
+                        expires_in = token_data.get('expires_in', 3600)
+                        self.token_expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+                        await self._save_token()
+                        return self.access_token
+
+                    logging.error(f"Failed to get Twitch access token: {response.status}")
+                    if response.status < 500 and response.status != 429:
+                        # Bad credentials; retrying won't help
+                        break
+            except Exception as e:
+                logging.error(f"Error getting Twitch access token: {e}")
+
+            if attempt < TWITCH_MAX_RETRIES:
+                await asyncio.sleep(min(2 ** attempt, 30) + random.random())
+
+        # Keep using the current token until it actually expires
+        return self.access_token if self._token_valid() else None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self.get_access_token()
+            delay = 30
+            if self._token_valid():
+                refresh_at = self.token_expires_at - timedelta(seconds=TWITCH_TOKEN_REFRESH_MARGIN)
+                delay = max((refresh_at - datetime.now(timezone.utc)).total_seconds(), delay)
+            await asyncio.sleep(delay)
+
+    async def _load_token(self) -> None:
+        try:
+            row = await self.token_store.get_app_token(self.client_id)
+            if row:
+                access_token = self._cipher.decrypt(row[0]).decode()
+                self.access_token = access_token
+                self.token_expires_at = datetime.fromisoformat(row[1])
+        except InvalidToken:
+            # Encrypted with a different client secret
+            pass
+        except Exception as e:
+            logging.error(f"Error loading cached Twitch access token: {e}")
+
+    async def _save_token(self) -> None:
+        if self._cipher is None:
+            return
+        try:
+            await self.token_store.save_app_token(
+                self.client_id,
+                self._cipher.encrypt(self.access_token.encode()),
+                self.token_expires_at.isoformat()
+            )
+        except Exception as e:
+            logging.error(f"Error caching Twitch access token: {e}")
+
+    async def helix_get(self, path: str, params: Any, priority: int = PRIORITY_BACKGROUND,
+                        ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """GET a Helix endpoint, returning the JSON body or None on failure.
+
+        With a ``ttl`` the response is cached by URL and revalidated with its
+        ETag, when Helix sent one, once the entry goes stale.
+        """
+        if not ttl:
+            status, payload, _ = await self._send('GET', path, params=params, priority=priority)
+            return payload if status == 200 else None
+
+        key = HelixCache.key(path, params)
+        entry = self.cache.get(key)
+        if entry and entry.fresh:
+            return entry.payload
+
+        headers = {'If-None-Match': entry.etag} if entry and entry.etag else None
+        status, payload, response_headers = await self._send(
+            'GET', path, params=params, priority=priority, headers=headers
+        )
+        if status == 304:
+            return self.cache.revalidated(key, ttl)
+        if status != 200:
+            return None
+        self.cache.store(key, payload, ttl, response_headers.get('ETag'))
+        return payload
+
+    async def helix_request(self, method: str, path: str, *, params: Any = None, json: Any = None,
+                            priority: int = PRIORITY_BACKGROUND,
+                            token: Optional[str] = None) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """Send a Helix request, waiting for rate limit capacity and retrying 429s.
+
+        Uses the app access token unless an explicit (user) ``token`` is given.
+        Returns the final status code and the decoded JSON body, if any; the
+        status is 0 when no request was sent (no token or breaker open).
+        """
+        status, payload, _ = await self._send(method, path, params=params, json=json, priority=priority, token=token)
+        return status, payload
+
+    async def _send(self, method: str, path: str, *, params: Any = None, json: Any = None,
+                    priority: int = PRIORITY_BACKGROUND, token: Optional[str] = None,
+                    headers: Optional[Dict[str, str]] = None) -> Tuple[int, Optional[Dict[str, Any]], Any]:
+        url = f"{TWITCH_API_BASE}/{path}"
+
+        for attempt in range(TWITCH_MAX_RETRIES + 1):
+            access_token = token or await self.get_access_token()
+            if not access_token:
+                return 0, None, {}
+
+            request_headers = {
+                'Client-ID': self.client_id,
+                'Authorization': f'Bearer {access_token}',
+                **(headers or {})
+            }
+
+            if self.breaker.blocking:
+                return 0, None, {}
+
+            await self.limiter.acquire(priority)
+            # Claim the breaker (possibly its single half-open probe) only once
+            # rate limit capacity is ours, so waiting in the queue can't hold it
+            if not self.breaker.allow():
+                return 0, None, {}
+            probe = self.breaker.probing
+            started = time.monotonic()
+            try:
+                response = await self.session.request(method, url, params=params, json=json, headers=request_headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.breaker.record(False, probe)
+                raise
+            except BaseException:
+                # Cancelled or failed unexpectedly; release a half-open probe
+                self.breaker.abandon(probe)
+                raise
+
+            async with response:
+                self.breaker.record(response.status < 500, probe)
+                self.limiter.update(response.headers)
+                if self.metrics:
+                    self.metrics.observe_request(path, response.status, time.monotonic() - started)
+
+                if response.status == 429 and response.headers.get('Ratelimit-Remaining', '0') == '0':
+                    delay = self.limiter.rate_limited(response.headers)
+                    logging.warning(f"Helix rate limit hit on /{path}, retrying in {delay:.1f}s")
+                    continue
+
+                if response.status == 401 and attempt == 0 and token is None:
+                    # Token revoked or expired early; fetch a new one and retry
+                    self.invalidate_token(access_token)
+                    continue
+
+                if response.status >= 500 and attempt < TWITCH_MAX_RETRIES and self.breaker.closed:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+
+                payload = None
+                if response.content_type == 'application/json':
+                    payload = await response.json()
+                if response.status >= 400:
+                    logging.error(f"Helix {method} /{path} failed with status {response.status}")
+                return response.status, payload, response.headers
+
+        logging.error(f"Helix {method} /{path} gave up after {TWITCH_MAX_RETRIES + 1} attempts")
+        return 429, None, {}
+
+    async def get_user_id(self, username: str, priority: int = PRIORITY_BACKGROUND) -> Optional[str]:
+        """Get Twitch user ID from username"""
+        if self.cache.is_missing(username):
+            return None
+        try:
+            data = await self.helix_get('users', {'login': username}, priority, ttl=TWITCH_USER_CACHE_TTL)
+            if data and data['data']:
+                self.cache.store_users(data['data'], TWITCH_USER_CACHE_TTL)
+                return data['data'][0]['id']
+            if data is not None:
+                self.cache.mark_missing(username, TWITCH_MISSING_LOGIN_TTL)
+            return None
+        except Exception as e:
+            logging.error(f"Error getting Twitch user ID for {username}: {e}")
+            return None
+
+    async def get_user_ids(self, usernames: List[str], priority: int = PRIORITY_BACKGROUND) -> Optional[Dict[str, str]]:
+        """Resolve up to 100 logins to Twitch user IDs in one request.
+
+        Logins that don't exist are absent from the result; None means the
+        lookup itself failed.
+        """
+        usernames = [name for name in usernames[:HELIX_BATCH_SIZE] if not self.cache.is_missing(name)]
+        if not usernames:
+            return {}
+        try:
+            data = await self.helix_get('users', [('login', name) for name in usernames], priority)
+            if data is None:
+                return None
+            self.cache.store_users(data['data'], TWITCH_USER_CACHE_TTL)
+            user_ids = {user['login']: user['id'] for user in data['data']}
+            for name in usernames:
+                if name not in user_ids:
+                    self.cache.mark_missing(name, TWITCH_MISSING_LOGIN_TTL)
+            return user_ids
+        except Exception as e:
+            logging.error(f"Error resolving Twitch user IDs: {e}")
+            return None
+
+    async def get_streams(self, user_ids: List[str], priority: int = PRIORITY_BACKGROUND,
+                          game_ids: Optional[Collection[str]] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Check up to 100 user IDs in one request.
+
+        Returns the stream status of every requested ID (offline ones
+        included), or None when the request failed. With game_ids, Twitch
+        only returns streams in those games and the rest read as offline.
+        """
+        user_ids = user_ids[:HELIX_BATCH_SIZE]
+        params = [('user_id', uid) for uid in user_ids] + [('first', HELIX_BATCH_SIZE)]
+        if game_ids and len(game_ids) <= HELIX_BATCH_SIZE:
+            params += [('game_id', game_id) for game_id in sorted(game_ids)]
+        try:
+            data = await self.helix_get('streams', params, priority)
+            if data is None:
+                return None
+            statuses = {uid: {'is_live': False} for uid in user_ids}
+            for stream_data in data['data']:
+                statuses[stream_data['user_id']] = _stream_status(stream_data)
+            return statuses
+        except Exception as e:
+            logging.error(f"Error checking stream status for {len(user_ids)} users: {e}")
+            return None
+
+    async def get_stream(self, user_id: str, priority: int = PRIORITY_BACKGROUND) -> Optional[Dict[str, Any]]:
+        try:
+            data = await self.helix_get('streams', {'user_id': user_id}, priority)
+            if data is None:
+                return None
+            if data['data']:
+                return _stream_status(data['data'][0])
+            return {'is_live': False}
+        except Exception as e:
+            logging.error(f"Error checking stream status for user {user_id}: {e}")
+            return None
+
+    async def get_games(self, names: List[str], priority: int = PRIORITY_BACKGROUND) -> Optional[Dict[str, str]]:
+        """Resolve up to 100 game or category names to ``{game_id: name}``.
+
+        Names Twitch doesn't know are absent from the result; None means the
+        lookup itself failed.
+        """
+        try:
+            data = await self.helix_get('games', [('name', name) for name in names[:HELIX_BATCH_SIZE]], priority)
+            if data is None:
+                return None
+            return {game['id']: game['name'] for game in data['data']}
+        except Exception as e:
+            logging.error(f"Error resolving Twitch games: {e}")
+            return None
+
+    async def get_user_info(self, user_id: str, priority: int = PRIORITY_BACKGROUND) -> Optional[Dict[str, Any]]:
+        try:
+            data = await self.helix_get('users', {'id': user_id}, priority, ttl=TWITCH_USER_CACHE_TTL)
+            if data and data['data']:
+                user_data = data['data'][0]
+                return {
+                    'id': user_data['id'],
+                    'display_name': user_data['display_name'],
+                    'profile_image_url': user_data['profile_image_url'],
+                    'login': user_data['login']
+                }
+            return None
+        except Exception as e:
+            logging.error(f"Error getting user info for {user_id}: {e}")
+            return None
+
+
+def _token_cipher(client_secret: Optional[str]):
+    """Fernet cipher keyed from the client secret, or None if unavailable."""
+    if Fernet is None or not client_secret:
+        return None
+    key = base64.urlsafe_b64encode(hashlib.sha256(client_secret.encode()).digest())
+    return Fernet(key)
+
+
+def _stream_status(stream_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'is_live': True,
+        'stream_id': stream_data['id'],
+        'title': stream_data['title'],
+        'game_id': stream_data.get('game_id'),
+        'game_name': stream_data['game_name'],
+        'viewer_count': stream_data['viewer_count'],
+        'started_at': stream_data['started_at'],
+        'thumbnail_url': stream_data['thumbnail_url']
+    }
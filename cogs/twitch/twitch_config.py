@@ -0,0 +1,130 @@
+"""
+Twitch Integration Settings
+
+Tunables for the Twitch client and poller. Every value can be overridden
+through an environment variable of the same name so deployments can adjust
+behaviour without code changes.
+"""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    try:
+        return float(value) if value is not None else default
+    except ValueError:
+        return default
+
+
+# Endpoints (overridable so the bot can run against a local mock server)
+TWITCH_API_BASE = os.getenv('TWITCH_API_BASE', 'https://api.twitch.tv/helix')
+TWITCH_OAUTH_URL = os.getenv('TWITCH_OAUTH_URL', 'https://id.twitch.tv/oauth2/token')
+
+# Helix rate limiting
+TWITCH_RATELIMIT_BUCKET = _env_int('TWITCH_RATELIMIT_BUCKET', 800)
+TWITCH_RATELIMIT_WINDOW = _env_float('TWITCH_RATELIMIT_WINDOW', 60.0)
+TWITCH_MAX_RETRIES = _env_int('TWITCH_MAX_RETRIES', 3)
+
+# App access token. Tokens are refreshed in the background this many seconds
+# before they expire, and cached (encrypted) in the local database.
+TWITCH_TOKEN_REFRESH_MARGIN = _env_int('TWITCH_TOKEN_REFRESH_MARGIN', 300)
+
+# Circuit breaker. Once at least TWITCH_BREAKER_MIN_REQUESTS Helix requests
+# were made in the last TWITCH_BREAKER_WINDOW seconds and the share that failed
+# (5xx or network errors) reaches TWITCH_BREAKER_ERROR_RATE, requests stop and
+# poll cycles are skipped. A probe is sent after TWITCH_BREAKER_BACKOFF seconds,
+# doubling on every failed probe up to TWITCH_BREAKER_MAX_BACKOFF. With fewer
+# streamers than that many batched requests per window, the minimum drops to
+# the expected request count.
+TWITCH_BREAKER_ERROR_RATE = _env_float('TWITCH_BREAKER_ERROR_RATE', 0.5)
+TWITCH_BREAKER_MIN_REQUESTS = _env_int('TWITCH_BREAKER_MIN_REQUESTS', 10)
+TWITCH_BREAKER_WINDOW = _env_float('TWITCH_BREAKER_WINDOW', 60.0)
+TWITCH_BREAKER_BACKOFF = _env_float('TWITCH_BREAKER_BACKOFF', 30.0)
+TWITCH_BREAKER_MAX_BACKOFF = _env_float('TWITCH_BREAKER_MAX_BACKOFF', 900.0)
+
+# Helix response cache. /users lookups are cached for TWITCH_USER_CACHE_TTL
+# seconds and logins Twitch reports as nonexistent for
+# TWITCH_MISSING_LOGIN_TTL seconds.
+TWITCH_CACHE_MAX_ENTRIES = _env_int('TWITCH_CACHE_MAX_ENTRIES', 10000)
+TWITCH_USER_CACHE_TTL = _env_int('TWITCH_USER_CACHE_TTL', 3600)
+TWITCH_MISSING_LOGIN_TTL = _env_int('TWITCH_MISSING_LOGIN_TTL', 600)
+
+# EventSub WebSocket push mode. The WebSocket transport requires a user access
+# token; push mode stays disabled (polling only) when none is configured.
+TWITCH_EVENTSUB_WS_URL = os.getenv('TWITCH_EVENTSUB_WS_URL', 'wss://eventsub.wss.twitch.tv/ws')
+TWITCH_EVENTSUB_TOKEN = os.getenv('TWITCH_EVENTSUB_TOKEN')
+
+# Adaptive polling. The poll loop ticks every TWITCH_POLL_INTERVAL seconds and
+# checks only the streamers that are due; each tier sets how often a streamer
+# comes due. The budget caps Helix requests per tick (100 streamers each).
+TWITCH_POLL_INTERVAL = _env_int('TWITCH_POLL_INTERVAL', 120)
+TWITCH_POLL_LIVE_INTERVAL = _env_int('TWITCH_POLL_LIVE_INTERVAL', 120)
+TWITCH_POLL_ACTIVE_INTERVAL = _env_int('TWITCH_POLL_ACTIVE_INTERVAL', 120)
+TWITCH_POLL_RECENT_INTERVAL = _env_int('TWITCH_POLL_RECENT_INTERVAL', 600)
+TWITCH_POLL_IDLE_INTERVAL = _env_int('TWITCH_POLL_IDLE_INTERVAL', 1800)
+TWITCH_POLL_DORMANT_INTERVAL = _env_int('TWITCH_POLL_DORMANT_INTERVAL', 3600)
+TWITCH_POLL_ACTIVE_DAYS = _env_int('TWITCH_POLL_ACTIVE_DAYS', 3)
+TWITCH_POLL_RECENT_DAYS = _env_int('TWITCH_POLL_RECENT_DAYS', 14)
+TWITCH_POLL_IDLE_DAYS = _env_int('TWITCH_POLL_IDLE_DAYS', 90)
+TWITCH_POLL_REQUEST_BUDGET = _env_int('TWITCH_POLL_REQUEST_BUDGET', 100)
+# Offline streamers whose go-lives arrive over EventSub are still polled, at
+# least this many seconds apart, in case a notification is lost or a
+# subscription is revoked
+TWITCH_POLL_PUSHED_INTERVAL = _env_int('TWITCH_POLL_PUSHED_INTERVAL', 1800)
+
+# Poll pacing. A tick's Helix batches are spread evenly over the first
+# TWITCH_POLL_SPREAD share of the interval rather than sent together, each
+# start shifted by a random share (up to TWITCH_POLL_JITTER) of its slot.
+# TWITCH_POLL_SPREAD=0 sends every batch at the start of the tick.
+TWITCH_POLL_SPREAD = _env_float('TWITCH_POLL_SPREAD', 0.75)
+TWITCH_POLL_JITTER = _env_float('TWITCH_POLL_JITTER', 0.5)
+
+# Poll cycle concurrency. Helix lookups and announcement sends each run at most
+# TWITCH_POLL_CONCURRENCY at a time; every HTTP request has its own timeout and
+# a whole cycle is abandoned once it runs past TWITCH_POLL_CYCLE_TIMEOUT.
+TWITCH_POLL_CONCURRENCY = _env_int('TWITCH_POLL_CONCURRENCY', 8)
+TWITCH_REQUEST_TIMEOUT = _env_float('TWITCH_REQUEST_TIMEOUT', 10.0)
+TWITCH_POLL_CYCLE_TIMEOUT = _env_float('TWITCH_POLL_CYCLE_TIMEOUT', max(TWITCH_POLL_INTERVAL - 10, 30))
+
+# Announcement dispatch. Announcements queue per channel and are sent by a
+# background worker; when TWITCH_DIGEST_THRESHOLD or more are pending for one
+# channel they go out as a single digest. TWITCH_DIGEST_WINDOW (seconds, 0 to
+# disable) holds each announcement briefly so near-simultaneous go-lives can
+# be grouped. Queued announcements are already recorded as announced, so on
+# unload the queues get up to TWITCH_DISPATCH_DRAIN_TIMEOUT seconds to empty.
+TWITCH_SEND_RETRIES = _env_int('TWITCH_SEND_RETRIES', 3)
+TWITCH_DIGEST_THRESHOLD = _env_int('TWITCH_DIGEST_THRESHOLD', 3)
+TWITCH_DIGEST_WINDOW = _env_float('TWITCH_DIGEST_WINDOW', 0.0)
+TWITCH_DISPATCH_DRAIN_TIMEOUT = _env_float('TWITCH_DISPATCH_DRAIN_TIMEOUT', 30.0)
+
+# Live announcement updates. Posted announcements are edited with the current
+# viewer count and title at most once per TWITCH_ANNOUNCE_EDIT_INTERVAL seconds
+# (0 disables these edits), and switched to an "ended" state when the stream ends.
+TWITCH_ANNOUNCE_EDIT_INTERVAL = _env_int('TWITCH_ANNOUNCE_EDIT_INTERVAL', 600)
+
+# Offline grace window (seconds). A stream that goes offline and comes back
+# within this window is treated as the same session: no new announcement and
+# no database write. 0 ends streams on the first offline observation.
+TWITCH_OFFLINE_GRACE = _env_int('TWITCH_OFFLINE_GRACE', 300)
+
+# Sharded polling. Instances sharing the same database file, each started with
+# a distinct TWITCH_POLL_INSTANCE_ID, split Twitch IDs between them by hash
+# range. Each renews a lease every cycle; an instance whose lease is older than
+# TWITCH_POLL_LEASE_SECONDS is dropped and its range spread over the rest.
+# Leave TWITCH_POLL_INSTANCE_ID unset to poll everything in this process.
+TWITCH_POLL_INSTANCE_ID = os.getenv('TWITCH_POLL_INSTANCE_ID')
+TWITCH_POLL_LEASE_SECONDS = _env_int('TWITCH_POLL_LEASE_SECONDS', 3 * TWITCH_POLL_INTERVAL)
+TWITCH_POLL_SHARD_REFRESH = _env_int('TWITCH_POLL_SHARD_REFRESH', 300)
+
+# Metrics export. When set, Prometheus-format metrics are written to this
+# file after every poll cycle (e.g. for a node_exporter textfile collector).
+TWITCH_METRICS_FILE = os.getenv('TWITCH_METRICS_FILE')
@@ -0,0 +1,400 @@
+import aiosqlite
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+class TwitchDatabase:
+    """Database access for the Twitch announcement system."""
+
+    def __init__(self):
+        self.db_path = "data/twitch_announce.db"
+
+    async def initialize(self):
+        """Initialize all database tables."""
+        os.makedirs("data", exist_ok=True)
+
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS twitch_settings (
+                    guild_id INTEGER PRIMARY KEY,
+                    channel_id INTEGER NOT NULL,
+                    role_id INTEGER,
+                    games TEXT,
+                    message TEXT,
+                    color INTEGER
+                )
+            """)
+            # games: allowlist, a JSON object of Helix game ID to name (NULL
+            # announces every game); message, color: announcement template
+            cursor = await db.execute("PRAGMA table_info(twitch_settings)")
+            columns = {row[1] for row in await cursor.fetchall()}
+            for column, column_type in (('games', 'TEXT'), ('message', 'TEXT'), ('color', 'INTEGER')):
+                if column not in columns:
+                    await db.execute(f"ALTER TABLE twitch_settings ADD COLUMN {column} {column_type}")
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS twitch_streamers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id INTEGER NOT NULL,
+                    twitch_username TEXT NOT NULL,
+                    is_live INTEGER DEFAULT 0,
+                    last_stream_id TEXT,
+                    twitch_user_id TEXT,
+                    last_live_at TEXT,
+                    UNIQUE(guild_id, twitch_username)
+                )
+            """)
+            # Databases created before these columns existed get them added;
+            # the poller backfills Twitch IDs on its next cycle.
+            cursor = await db.execute("PRAGMA table_info(twitch_streamers)")
+            columns = {row[1] for row in await cursor.fetchall()}
+            for column in ('twitch_user_id', 'last_live_at'):
+                if column not in columns:
+                    await db.execute(f"ALTER TABLE twitch_streamers ADD COLUMN {column} TEXT")
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_twitch_streamers_user_id
+                ON twitch_streamers (twitch_user_id)
+            """)
+            # Serves /twitch list pages: live first, then by name
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_twitch_streamers_guild_live
+                ON twitch_streamers (guild_id, is_live DESC, twitch_username)
+            """)
+            # Append-only: one row per finished live session
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS twitch_stream_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    twitch_user_id TEXT NOT NULL,
+                    stream_id TEXT,
+                    started_at TEXT NOT NULL,
+                    ended_at TEXT NOT NULL,
+                    peak_viewers INTEGER NOT NULL,
+                    avg_viewers REAL NOT NULL,
+                    title TEXT,
+                    game_name TEXT
+                )
+            """)
+            await db.execute("""
+                CREATE INDEX IF NOT EXISTS idx_twitch_stream_sessions_user
+                ON twitch_stream_sessions (twitch_user_id, started_at)
+            """)
+            # Running totals per streamer, updated with each session insert
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS twitch_streamer_stats (
+                    twitch_user_id TEXT PRIMARY KEY,
+                    sessions INTEGER NOT NULL,
+                    seconds_streamed REAL NOT NULL,
+                    viewer_seconds REAL NOT NULL,
+                    peak_viewers INTEGER NOT NULL,
+                    last_stream_at TEXT
+                )
+            """)
+            # Messages announcing streams that are still live, one per guild
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS twitch_announcements (
+                    guild_id INTEGER NOT NULL,
+                    twitch_user_id TEXT NOT NULL,
+                    stream_id TEXT NOT NULL,
+                    twitch_username TEXT NOT NULL,
+                    channel_id INTEGER NOT NULL,
+                    message_id INTEGER NOT NULL,
+                    role_id INTEGER,
+                    digest INTEGER DEFAULT 0,
+                    posted_at TEXT NOT NULL,
+                    PRIMARY KEY (guild_id, twitch_user_id, stream_id)
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS twitch_poll_leases (
+                    instance_id TEXT PRIMARY KEY,
+                    heartbeat_at REAL NOT NULL
+                )
+            """)
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS twitch_tokens (
+                    client_id TEXT PRIMARY KEY,
+                    access_token BLOB NOT NULL,
+                    expires_at TEXT NOT NULL
+                )
+            """)
+            await db.commit()
+
+    async def load_state(self) -> Tuple[List[Tuple], List[Tuple]]:
+        """Read every guild's settings and every monitored streamer in one
+        connection, for the startup warm-up.
+
+        Settings rows are ``(guild_id, channel_id, role_id, games, message,
+        color)`` with games decoded to ``{game_id: name}``. Streamer rows are
+        ``(guild_id, twitch_username, twitch_user_id, is_live, last_stream_id,
+        channel_id, role_id, last_live_at)``, joined with their guild's settings.
+        """
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("SELECT guild_id, channel_id, role_id, games, message, color FROM twitch_settings") as cursor:
+                settings = [
+                    (guild_id, channel_id, role_id, json.loads(games) if games else None, message, color)
+                    for guild_id, channel_id, role_id, games, message, color in await cursor.fetchall()
+                ]
+            async with db.execute("""
+                SELECT s.guild_id, s.twitch_username, s.twitch_user_id, s.is_live, s.last_stream_id,
+                       st.channel_id, st.role_id, s.last_live_at
+                FROM twitch_streamers s
+                JOIN twitch_settings st ON s.guild_id = st.guild_id
+            """) as cursor:
+                streamers = await cursor.fetchall()
+        return settings, streamers
+
+    async def set_guild_games(self, guild_id: int, games: Optional[Dict[str, str]]) -> bool:
+        """Store a guild's game allowlist; None or empty clears it.
+
+        Returns False when the guild has not run /twitch setup.
+        """
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "UPDATE twitch_settings SET games = ? WHERE guild_id = ?",
+                (json.dumps(games) if games else None, guild_id)
+            )
+            await db.commit()
+            return cursor.rowcount > 0
+
+    async def set_twitch_user_ids(self, user_ids: Dict[str, str]) -> None:
+        """Store resolved Twitch IDs for rows that don't have one yet."""
+        if not user_ids:
+            return
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany("""
+                UPDATE twitch_streamers SET twitch_user_id = ?
+                WHERE twitch_username = ? AND twitch_user_id IS NULL
+            """, [(user_id, username) for username, user_id in user_ids.items()])
+            await db.commit()
+
+    async def get_guild_usernames(self, guild_id: int) -> Set[str]:
+        """Get every monitored login for a guild."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                "SELECT twitch_username FROM twitch_streamers WHERE guild_id = ?", (guild_id,)
+            ) as cursor:
+                return {row[0] for row in await cursor.fetchall()}
+
+    async def count_streamers(self, guild_id: int) -> Tuple[int, int]:
+        """Get ``(total, live)`` monitored streamer counts for a guild."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(is_live), 0) FROM twitch_streamers WHERE guild_id = ?", (guild_id,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def get_streamer_page(self, guild_id: int, limit: int, after: Optional[Tuple[int, str]] = None,
+                                before: Optional[Tuple[int, str]] = None) -> List[Tuple[str, int]]:
+        """Get up to ``limit`` ``(twitch_username, is_live)`` rows, live first
+        and then by name.
+
+        Pages are keyset based: pass the ``(is_live, twitch_username)`` key of
+        the last row shown as ``after`` for the next page, or of the first row
+        shown as ``before`` for the previous one.
+        """
+        if before is not None:
+            query = """
+                SELECT twitch_username, is_live FROM twitch_streamers
+                WHERE guild_id = ? AND (is_live > ? OR (is_live = ? AND twitch_username < ?))
+                ORDER BY is_live ASC, twitch_username DESC LIMIT ?
+            """
+            params = (guild_id, before[0], before[0], before[1], limit)
+        elif after is not None:
+            query = """
+                SELECT twitch_username, is_live FROM twitch_streamers
+                WHERE guild_id = ? AND (is_live < ? OR (is_live = ? AND twitch_username > ?))
+                ORDER BY is_live DESC, twitch_username ASC LIMIT ?
+            """
+            params = (guild_id, after[0], after[0], after[1], limit)
+        else:
+            query = """
+                SELECT twitch_username, is_live FROM twitch_streamers
+                WHERE guild_id = ?
+                ORDER BY is_live DESC, twitch_username ASC LIMIT ?
+            """
+            params = (guild_id, limit)
+
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(query, params) as cursor:
+                rows = await cursor.fetchall()
+        return rows[::-1] if before is not None else rows
+
+    async def add_streamers(self, guild_id: int, streamers: Iterable[Tuple[str, str]]) -> int:
+        """Insert ``(username, twitch_user_id)`` rows for a guild in one
+        transaction, skipping ones already monitored. Returns rows inserted."""
+        async with aiosqlite.connect(self.db_path) as db:
+            before = db.total_changes
+            await db.executemany("""
+                INSERT OR IGNORE INTO twitch_streamers (guild_id, twitch_username, twitch_user_id)
+                VALUES (?, ?, ?)
+            """, [(guild_id, username, user_id) for username, user_id in streamers])
+            await db.commit()
+            return db.total_changes - before
+
+    async def save_transitions(self, went_live: Iterable[Tuple], went_offline: Iterable[Tuple],
+                               sessions: Iterable[Tuple] = ()) -> None:
+        """Persist live/offline transitions in a single transaction.
+
+        ``went_live`` holds ``(stream_id, last_live_at, guild_id, username)``
+        rows and ``went_offline`` holds ``(guild_id, username)`` rows.
+        ``sessions`` holds finished sessions from
+        ``StreamTracker.drain_sessions``; each is appended to the session
+        history and folded into the streamer's running totals.
+        """
+        went_live = list(went_live)
+        went_offline = list(went_offline)
+        sessions = list(sessions)
+        if not went_live and not went_offline and not sessions:
+            return
+
+        async with aiosqlite.connect(self.db_path) as db:
+            if went_live:
+                await db.executemany("""
+                    UPDATE twitch_streamers
+                    SET is_live = 1, last_stream_id = ?, last_live_at = ?
+                    WHERE guild_id = ? AND twitch_username = ?
+                """, went_live)
+            if went_offline:
+                await db.executemany("""
+                    UPDATE twitch_streamers
+                    SET is_live = 0
+                    WHERE guild_id = ? AND twitch_username = ?
+                """, went_offline)
+            if sessions:
+                rows = []
+                totals = []
+                for user_id, stream_id, started_at, ended_at, peak, avg, title, game_name in sessions:
+                    seconds = max((ended_at - started_at).total_seconds(), 0)
+                    rows.append((user_id, stream_id, started_at.isoformat(), ended_at.isoformat(), peak, avg, title, game_name))
+                    totals.append((user_id, seconds, avg * seconds, peak, ended_at.isoformat()))
+                await db.executemany("""
+                    INSERT INTO twitch_stream_sessions
+                        (twitch_user_id, stream_id, started_at, ended_at, peak_viewers, avg_viewers, title, game_name)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                await db.executemany("""
+                    INSERT INTO twitch_streamer_stats
+                        (twitch_user_id, sessions, seconds_streamed, viewer_seconds, peak_viewers, last_stream_at)
+                    VALUES (?, 1, ?, ?, ?, ?)
+                    ON CONFLICT(twitch_user_id) DO UPDATE SET
+                        sessions = sessions + 1,
+                        seconds_streamed = seconds_streamed + excluded.seconds_streamed,
+                        viewer_seconds = viewer_seconds + excluded.viewer_seconds,
+                        peak_viewers = MAX(peak_viewers, excluded.peak_viewers),
+                        last_stream_at = excluded.last_stream_at
+                """, totals)
+            await db.commit()
+
+    async def get_streamer_user_id(self, guild_id: int, username: str) -> Optional[str]:
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                "SELECT twitch_user_id FROM twitch_streamers WHERE guild_id = ? AND twitch_username = ?",
+                (guild_id, username)
+            ) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else None
+
+    async def get_streamer_stats(self, twitch_user_id: str) -> Optional[Tuple]:
+        """Get ``(sessions, seconds_streamed, viewer_seconds, peak_viewers,
+        last_stream_at)`` totals for a streamer."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("""
+                SELECT sessions, seconds_streamed, viewer_seconds, peak_viewers, last_stream_at
+                FROM twitch_streamer_stats WHERE twitch_user_id = ?
+            """, (twitch_user_id,)) as cursor:
+                return await cursor.fetchone()
+
+    async def get_recent_sessions(self, twitch_user_id: str, limit: int) -> List[Tuple]:
+        """Get the latest ``(started_at, ended_at, peak_viewers, avg_viewers,
+        title, game_name)`` sessions for a streamer, newest first."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("""
+                SELECT started_at, ended_at, peak_viewers, avg_viewers, title, game_name
+                FROM twitch_stream_sessions WHERE twitch_user_id = ?
+                ORDER BY started_at DESC LIMIT ?
+            """, (twitch_user_id, limit)) as cursor:
+                return await cursor.fetchall()
+
+    async def get_guild_top_streamers(self, guild_id: int, limit: int) -> List[Tuple]:
+        """Get ``(twitch_username, sessions, seconds_streamed, viewer_seconds,
+        peak_viewers)`` for a guild's streamers with the most hours streamed."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("""
+                SELECT s.twitch_username, t.sessions, t.seconds_streamed, t.viewer_seconds, t.peak_viewers
+                FROM twitch_streamers s
+                JOIN twitch_streamer_stats t ON t.twitch_user_id = s.twitch_user_id
+                WHERE s.guild_id = ?
+                ORDER BY t.seconds_streamed DESC LIMIT ?
+            """, (guild_id, limit)) as cursor:
+                return await cursor.fetchall()
+
+    async def save_announcements(self, rows: Iterable[Tuple]) -> None:
+        """Record posted announcements as ``(guild_id, twitch_user_id,
+        stream_id, twitch_username, channel_id, message_id, role_id, digest,
+        posted_at)`` rows."""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany("""
+                INSERT OR REPLACE INTO twitch_announcements
+                    (guild_id, twitch_user_id, stream_id, twitch_username, channel_id, message_id, role_id, digest, posted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            await db.commit()
+
+    async def get_announcements(self) -> List[Tuple]:
+        """Get every recorded announcement, as rows in the order
+        ``save_announcements`` takes them."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("""
+                SELECT guild_id, twitch_user_id, stream_id, twitch_username, channel_id, message_id, role_id, digest, posted_at
+                FROM twitch_announcements
+            """) as cursor:
+                return await cursor.fetchall()
+
+    async def delete_announcements(self, keys: Iterable[Tuple[int, str, str]]) -> None:
+        """Forget announcements by ``(guild_id, twitch_user_id, stream_id)``."""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany("""
+                DELETE FROM twitch_announcements
+                WHERE guild_id = ? AND twitch_user_id = ? AND stream_id = ?
+            """, keys)
+            await db.commit()
+
+    async def purge_announcements(self, posted_before: str) -> None:
+        """Forget announcements posted before the given ISO timestamp."""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("DELETE FROM twitch_announcements WHERE posted_at < ?", (posted_before,))
+            await db.commit()
+
+    async def renew_poll_lease(self, instance_id: str, now: float, lease_seconds: float) -> List[str]:
+        """Renew this instance's polling lease, expire stale ones and return
+        the IDs of every instance holding a lease, sorted."""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("""
+                INSERT INTO twitch_poll_leases (instance_id, heartbeat_at) VALUES (?, ?)
+                ON CONFLICT(instance_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+            """, (instance_id, now))
+            await db.execute("DELETE FROM twitch_poll_leases WHERE heartbeat_at < ?", (now - lease_seconds,))
+            await db.commit()
+            async with db.execute("SELECT instance_id FROM twitch_poll_leases ORDER BY instance_id") as cursor:
+                return [row[0] for row in await cursor.fetchall()]
+
+    async def release_poll_lease(self, instance_id: str) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("DELETE FROM twitch_poll_leases WHERE instance_id = ?", (instance_id,))
+            await db.commit()
+
+    async def get_app_token(self, client_id: str) -> Optional[Tuple[bytes, str]]:
+        """Get the stored ``(encrypted_token, expires_at)`` for a client ID."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(
+                "SELECT access_token, expires_at FROM twitch_tokens WHERE client_id = ?", (client_id,)
+            ) as cursor:
+                return await cursor.fetchone()
+
+    async def save_app_token(self, client_id: str, access_token: bytes, expires_at: str) -> None:
+        """Store an encrypted app access token, replacing any previous one."""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("""
+                INSERT OR REPLACE INTO twitch_tokens (client_id, access_token, expires_at)
+                VALUES (?, ?, ?)
+            """, (client_id, access_token, expires_at))
+            await db.commit()
@@ -0,0 +1,207 @@
+"""
+Announcement Dispatcher
+
+Decouples live announcements from the poll loop. The poller enqueues
+announcements and returns immediately; one worker per announcement channel
+sends them, retrying transient Discord failures with backoff. Because each
+channel drains its own queue, Discord's per-channel rate limits only ever
+slow down that channel, and several streamers going live in the same guild
+at once can be coalesced into a single digest message. Edits of posted
+announcements go through the same send slots and retry policy.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+from .twitch_config import (
+    TWITCH_SEND_RETRIES,
+    TWITCH_DIGEST_THRESHOLD,
+    TWITCH_DIGEST_WINDOW,
+    TWITCH_DISPATCH_DRAIN_TIMEOUT,
+    TWITCH_POLL_CONCURRENCY,
+)
+
+# Workers for channels that have been quiet this long are shut down
+WORKER_IDLE_TIMEOUT = 300
+
+Announcement = Dict[str, Any]
+Rendered = Tuple[str, discord.Embed]
+
+
+class AnnouncementDispatcher:
+    """Per-channel announcement queues with retries and digest coalescing."""
+
+    def __init__(self, bot, render: Callable[[discord.Guild, Announcement], Rendered],
+                 render_digest: Callable[[discord.Guild, List[Announcement]], Rendered],
+                 metrics=None, uncached_channels: bool = False,
+                 on_sent: Optional[Callable[[List[Announcement], discord.Message, bool], Awaitable[None]]] = None,
+                 resolve_channel: Optional[Callable[[int, int], Tuple[Optional[discord.Guild], Any]]] = None) -> None:
+        self.bot = bot
+        # Cached (guild, channel) lookup tried before the guild cache
+        self.resolve_channel = resolve_channel
+        # Send to channels of guilds this process doesn't see, by ID only
+        self.uncached_channels = uncached_channels
+        self.render = render
+        self.render_digest = render_digest
+        self.metrics = metrics
+        # Called with (announcements, message, is_digest) after each successful send
+        self.on_sent = on_sent
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._send_slots = asyncio.Semaphore(TWITCH_POLL_CONCURRENCY)
+        # Queued or being delivered
+        self._unfinished = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    def enqueue(self, announcement: Announcement) -> None:
+        """Queue an announcement for its channel without waiting on Discord."""
+        channel_id = announcement['channel_id']
+        announcement.setdefault('queued_at', time.monotonic())
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = asyncio.Queue()
+        queue.put_nowait(announcement)
+        self._unfinished += 1
+
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = asyncio.create_task(self._worker(channel_id, queue))
+
+    async def close(self, timeout: float = TWITCH_DISPATCH_DRAIN_TIMEOUT) -> None:
+        """Stop the workers once their queues are delivered, or after timeout.
+
+        Queued announcements have already been checkpointed as announced, so
+        whatever is still queued when the timeout passes is lost; it is logged.
+        """
+        if self._queues:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(queue.join() for queue in self._queues.values())), timeout
+                )
+            except asyncio.TimeoutError:
+                logging.error(f"Dropping {self._unfinished} undelivered Twitch announcements "
+                              f"after waiting {timeout:.0f}s on unload")
+        for worker in self._workers.values():
+            worker.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+        self._unfinished = 0
+
+    async def _worker(self, channel_id: int, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                first = await asyncio.wait_for(queue.get(), timeout=WORKER_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    self._queues.pop(channel_id, None)
+                    self._workers.pop(channel_id, None)
+                    return
+                continue
+
+            batch = [first] + await self._collect(queue)
+            try:
+                await self._deliver(batch)
+            except Exception as e:
+                logging.error(f"Error delivering announcements to channel {channel_id}: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+                self._unfinished -= len(batch)
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Announcement]:
+        """Gather announcements already queued, plus any within the digest window."""
+        batch = []
+        deadline = asyncio.get_running_loop().time() + TWITCH_DIGEST_WINDOW
+        while True:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return batch
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                return batch
+
+    def _channel(self, guild_id: int, channel_id: int) -> Tuple[Optional[discord.Guild], Any]:
+        if self.resolve_channel:
+            guild, channel = self.resolve_channel(guild_id, channel_id)
+            if channel:
+                return guild, channel
+        guild = self.bot.get_guild(guild_id)
+        if guild:
+            return guild, guild.get_channel(channel_id)
+        if self.uncached_channels:
+            return None, self.bot.get_partial_messageable(channel_id, guild_id=guild_id)
+        return None, None
+
+    async def _deliver(self, batch: List[Announcement]) -> None:
+        guild, channel = self._channel(batch[0]['guild_id'], batch[0]['channel_id'])
+        if not channel:
+            return
+
+        digest = TWITCH_DIGEST_THRESHOLD > 1 and len(batch) >= TWITCH_DIGEST_THRESHOLD
+        if digest:
+            messages = [(self.render_digest(guild, batch), batch)]
+        else:
+            messages = [(self.render(guild, announcement), [announcement]) for announcement in batch]
+
+        for (content, embed), announcements in messages:
+            message = await self._send(channel, content, embed)
+            if self.metrics:
+                now = time.monotonic()
+                for announcement in announcements:
+                    self.metrics.observe_send(now - announcement['queued_at'], message is not None)
+            if message and self.on_sent:
+                try:
+                    await self.on_sent(announcements, message, digest)
+                except Exception as e:
+                    logging.error(f"Error recording announcement message {message.id}: {e}")
+
+    async def edit(self, guild_id: int, channel_id: int, message_id: int,
+                   render: Callable[[Optional[discord.Guild]], Rendered]) -> bool:
+        """Replace a posted announcement with ``render(guild)``.
+
+        Returns False when the channel or message is gone or the edit failed.
+        """
+        guild, channel = self._channel(guild_id, channel_id)
+        if not channel:
+            return False
+        content, embed = render(guild)
+        message = channel.get_partial_message(message_id)
+        return await self._attempt(channel, lambda: message.edit(content=content, embed=embed)) is not None
+
+    async def _send(self, channel, content: str, embed: discord.Embed) -> Optional[discord.Message]:
+        return await self._attempt(channel, lambda: channel.send(content=content, embed=embed))
+
+    async def _attempt(self, channel, request: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        for attempt in range(TWITCH_SEND_RETRIES + 1):
+            try:
+                async with self._send_slots:
+                    return await request()
+            except (discord.Forbidden, discord.NotFound) as e:
+                logging.error(f"Cannot send announcement to channel {channel.id}: {e}")
+                return None
+            except discord.HTTPException as e:
+                if e.status < 500 and e.status != 429:
+                    logging.error(f"Announcement rejected by Discord in channel {channel.id}: {e}")
+                    return None
+                error = e
+            except (asyncio.TimeoutError, OSError) as e:
+                error = e
+
+            if attempt < TWITCH_SEND_RETRIES:
+                await asyncio.sleep(min(2 ** attempt, 30) + random.random())
+
+        logging.error(f"Giving up on announcement in channel {channel.id} after {TWITCH_SEND_RETRIES + 1} attempts: {error}")
+        return None
@@ -0,0 +1,306 @@
+"""
+EventSub WebSocket Transport
+
+Optional push transport for go-live detection. Subscribes to ``stream.online``
+and ``stream.offline`` for monitored broadcasters over an EventSub WebSocket
+session and forwards notifications to the announce handler. Streamers that
+are not covered by an active subscription (socket down, cost limit reached)
+keep being polled, so push mode only ever makes announcements faster.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+import aiohttp
+
+from .twitch_config import TWITCH_EVENTSUB_WS_URL
+
+SUBSCRIPTION_TYPES = ('stream.online', 'stream.offline')
+
+# Backoff before retrying a broadcaster whose subscription failed, doubling
+# per consecutive failure up to the maximum
+SUBSCRIBE_RETRY_BASE = 5
+SUBSCRIBE_RETRY_MAX = 300
+
+StreamCallback = Callable[[str, Dict], Awaitable[None]]
+
+
+class EventSubWebSocket:
+    """Maintains an EventSub WebSocket session and its stream subscriptions."""
+
+    def __init__(self, client, token: str, on_online: StreamCallback, on_offline: StreamCallback,
+                 url: str = TWITCH_EVENTSUB_WS_URL) -> None:
+        self.client = client
+        self.token = token
+        self.url = url
+        self.on_online = on_online
+        self.on_offline = on_offline
+        self.session_id: Optional[str] = None
+        self.keepalive_timeout = 10
+        self.monitored: Set[str] = set()
+        # Broadcaster ID -> {subscription type: subscription ID, None if unknown}
+        self.subscriptions: Dict[str, Dict[str, Optional[str]]] = {}
+        self.cost_exhausted = False
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        # Reconcile, retry and callback tasks, cancelled on stop()
+        self._tasks: Set[asyncio.Task] = set()
+        self._retry_task: Optional[asyncio.Task] = None
+        # Welcome, reconnect and sync() may all reconcile; one at a time
+        self._reconcile_lock = asyncio.Lock()
+        # Broadcaster ID -> (consecutive failures, monotonic time of next attempt)
+        self._retry_at: Dict[str, Tuple[int, float]] = {}
+        self._seen_ids = deque(maxlen=1000)
+
+    @property
+    def connected(self) -> bool:
+        return self.session_id is not None and self._ws is not None and not self._ws.closed
+
+    def covered_ids(self) -> Set[str]:
+        """Broadcaster IDs whose online and offline events arrive by push."""
+        if not self.connected:
+            return set()
+        return {
+            user_id for user_id, subs in self.subscriptions.items()
+            if len(subs) == len(SUBSCRIPTION_TYPES)
+        }
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (*self._tasks, self._task):
+            if task and not task.done():
+                task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self._ws and not self._ws.closed:
+            await self._ws.close()
+        self.session_id = None
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def sync(self, user_ids: Iterable[str]) -> None:
+        """Update the monitored broadcaster set and reconcile subscriptions."""
+        self.monitored = set(user_ids)
+        if self.connected:
+            await self._reconcile()
+
+    async def _run(self) -> None:
+        delay = 1
+        while True:
+            try:
+                ws = await self._connect(self.url, reconnect=False)
+                delay = 1
+                while ws is not None:
+                    ws = await self._consume(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"EventSub WebSocket error: {e}")
+
+            self.session_id = None
+            self.subscriptions.clear()
+            logging.warning(f"EventSub WebSocket disconnected, reconnecting in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    async def _connect(self, url: str, reconnect: bool) -> aiohttp.ClientWebSocketResponse:
+        """Open a socket and wait for its session_welcome message."""
+        ws = await self.client.session.ws_connect(url)
+        try:
+            message = await ws.receive_json(timeout=10)
+        except Exception:
+            await ws.close()
+            raise
+
+        metadata = message.get('metadata', {})
+        if metadata.get('message_type') != 'session_welcome':
+            await ws.close()
+            raise RuntimeError(f"Expected session_welcome, got {metadata.get('message_type')}")
+
+        session = message['payload']['session']
+        self.session_id = session['id']
+        self.keepalive_timeout = session.get('keepalive_timeout_seconds') or 10
+        self._ws = ws
+
+        if not reconnect:
+            # A fresh session starts without subscriptions; they must be
+            # created within a few seconds of the welcome message.
+            self.subscriptions.clear()
+            self.cost_exhausted = False
+            self._retry_at.clear()
+            self._spawn(self._reconcile())
+        return ws
+
+    async def _consume(self, ws: aiohttp.ClientWebSocketResponse) -> Optional[aiohttp.ClientWebSocketResponse]:
+        """Read messages until the socket closes or Twitch asks us to move.
+
+        Returns the replacement socket after a session_reconnect, or None when
+        the session is lost and must be re-established from scratch.
+        """
+        while True:
+            try:
+                msg = await ws.receive(timeout=self.keepalive_timeout + 5)
+            except asyncio.TimeoutError:
+                logging.warning("EventSub keepalive timed out")
+                await ws.close()
+                return None
+
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                return None
+
+            message = json.loads(msg.data)
+            metadata = message.get('metadata', {})
+            message_type = metadata.get('message_type')
+            payload = message.get('payload', {})
+
+            if message_type == 'session_keepalive':
+                continue
+
+            if message_type == 'notification':
+                message_id = metadata.get('message_id')
+                if message_id in self._seen_ids:
+                    continue
+                self._seen_ids.append(message_id)
+                self._dispatch(payload)
+
+            elif message_type == 'session_reconnect':
+                reconnect_url = payload['session']['reconnect_url']
+                try:
+                    return await self._connect(reconnect_url, reconnect=True)
+                finally:
+                    await ws.close()
+
+            elif message_type == 'revocation':
+                subscription = payload.get('subscription', {})
+                user_id = subscription.get('condition', {}).get('broadcaster_user_id')
+                self.subscriptions.get(user_id, {}).pop(subscription.get('type'), None)
+                logging.warning(f"EventSub subscription revoked for {user_id}: {subscription.get('status')}")
+
+    def _dispatch(self, payload: Dict) -> None:
+        subscription_type = payload.get('subscription', {}).get('type')
+        event = payload.get('event', {})
+        user_id = event.get('broadcaster_user_id')
+        if not user_id:
+            return
+
+        if subscription_type == 'stream.online':
+            callback = self.on_online
+        elif subscription_type == 'stream.offline':
+            callback = self.on_offline
+        else:
+            return
+        # Handle the event off the read loop so keepalives are never missed
+        self._spawn(self._run_callback(callback, user_id, event))
+
+    async def _run_callback(self, callback: StreamCallback, user_id: str, event: Dict) -> None:
+        try:
+            await callback(user_id, event)
+        except Exception as e:
+            logging.error(f"Error handling EventSub event for {user_id}: {e}")
+
+    async def _reconcile(self) -> None:
+        async with self._reconcile_lock:
+            for user_id in list(self.subscriptions):
+                if user_id not in self.monitored:
+                    await self._unsubscribe(user_id)
+            for user_id in list(self._retry_at):
+                if user_id not in self.monitored:
+                    del self._retry_at[user_id]
+
+            now = time.monotonic()
+            for user_id in self.monitored:
+                if len(self.subscriptions.get(user_id, ())) == len(SUBSCRIPTION_TYPES):
+                    continue
+                if self.cost_exhausted or not self.connected or not self.client.breaker.closed:
+                    break
+                if self._retry_at.get(user_id, (0, 0.0))[1] > now:
+                    continue
+                if await self._subscribe(user_id):
+                    self._retry_at.pop(user_id, None)
+                else:
+                    failures = self._retry_at.get(user_id, (0, 0.0))[0] + 1
+                    delay = min(SUBSCRIBE_RETRY_BASE * 2 ** (failures - 1), SUBSCRIBE_RETRY_MAX)
+                    self._retry_at[user_id] = (failures, time.monotonic() + delay)
+
+            self._schedule_retry()
+
+    def _schedule_retry(self) -> None:
+        """Reconcile again when the earliest failed subscription is due."""
+        if not self._retry_at or (self._retry_task and not self._retry_task.done()):
+            return
+        delay = max(min(at for _, at in self._retry_at.values()) - time.monotonic(), 0)
+        self._retry_task = self._spawn(self._retry_after(delay))
+
+    async def _retry_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._retry_task = None
+        if self.connected:
+            await self._reconcile()
+
+    async def _subscribe(self, user_id: str) -> bool:
+        """Create the missing subscriptions for user_id; False if one failed.
+
+        Hitting the cost limit is not a failure: the broadcaster stays polled
+        until a slot frees up.
+        """
+        subs = self.subscriptions.setdefault(user_id, {})
+        for subscription_type in SUBSCRIPTION_TYPES:
+            if subscription_type in subs:
+                continue
+            body = {
+                'type': subscription_type,
+                'version': '1',
+                'condition': {'broadcaster_user_id': user_id},
+                'transport': {'method': 'websocket', 'session_id': self.session_id}
+            }
+            status, data = await self.client.helix_request(
+                'POST', 'eventsub/subscriptions', json=body, token=self.token
+            )
+            if status == 202 and data and data.get('data'):
+                subs[subscription_type] = data['data'][0]['id']
+            elif status == 409:
+                # Already exists on this session (a reconnect or an earlier
+                # attempt that timed out after Twitch created it)
+                subs[subscription_type] = await self._existing_subscription(user_id, subscription_type)
+            elif status == 429:
+                # Transport cost limit reached; remaining streamers stay polled
+                self.cost_exhausted = True
+                return True
+            else:
+                logging.error(f"Failed to subscribe to {subscription_type} for {user_id}: {status}")
+                return False
+        return True
+
+    async def _existing_subscription(self, user_id: str, subscription_type: str) -> Optional[str]:
+        """ID of this session's subscription of the given type, if Twitch lists it."""
+        status, data = await self.client.helix_request(
+            'GET', 'eventsub/subscriptions', params={'user_id': user_id}, token=self.token
+        )
+        if status != 200 or not data:
+            return None
+        for subscription in data.get('data', []):
+            if (subscription.get('type') == subscription_type
+                    and subscription.get('transport', {}).get('session_id') == self.session_id):
+                return subscription['id']
+        return None
+
+    async def _unsubscribe(self, user_id: str) -> None:
+        subs = self.subscriptions.pop(user_id, {})
+        # IDs of subscriptions that already existed may be unknown; those end
+        # with the session
+        for subscription_id in filter(None, subs.values()):
+            await self.client.helix_request(
+                'DELETE', 'eventsub/subscriptions', params={'id': subscription_id}, token=self.token
+            )
+        self.cost_exhausted = False
@@ -0,0 +1,188 @@
+"""
+Live Announcement Messages
+
+Remembers which Discord message announced which stream in each guild, so a
+restart never announces a stream twice, and keeps those messages current.
+Every live sample may refresh the viewer count and title, but a message is
+edited at most once per TWITCH_ANNOUNCE_EDIT_INTERVAL and only when what it
+shows changed; samples in between just replace the pending state. When the
+stream ends each message is switched to a final "ended" state and forgotten.
+
+Digest messages cover several streams, so they are recorded for duplicate
+detection but never edited.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import discord
+
+from .twitch_config import TWITCH_ANNOUNCE_EDIT_INTERVAL
+
+# Records of streams that never reported an end (e.g. the streamer was
+# removed while live) are dropped at startup after this long
+ANNOUNCEMENT_RETENTION = timedelta(days=2)
+
+
+class LiveMessage:
+    """One posted announcement and what it currently shows."""
+
+    __slots__ = ('guild_id', 'channel_id', 'message_id', 'user_id', 'stream_id', 'username', 'role_id',
+                 'digest', 'user_info', 'stream_status', 'edited_at', 'shown', 'task')
+
+    def __init__(self, guild_id: int, channel_id: int, message_id: int, user_id: str, stream_id: str,
+                 username: str, role_id: Optional[int], digest: bool) -> None:
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.user_id = user_id
+        self.stream_id = stream_id
+        self.username = username
+        self.role_id = role_id
+        self.digest = digest
+        self.user_info: Optional[Dict[str, Any]] = None
+        self.stream_status: Optional[Dict[str, Any]] = None
+        self.edited_at = time.monotonic()
+        self.shown: Optional[tuple] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def announcement(self) -> Dict[str, Any]:
+        return {
+            'guild_id': self.guild_id,
+            'channel_id': self.channel_id,
+            'role_id': self.role_id,
+            'username': self.username,
+            'user_info': self.user_info,
+            'stream_status': self.stream_status
+        }
+
+
+def _shown(stream_status: Dict[str, Any]) -> tuple:
+    return stream_status.get('viewer_count'), stream_status.get('title'), stream_status.get('game_name')
+
+
+class LiveMessageUpdater:
+    """Posted announcements per stream, with coalesced in-place edits."""
+
+    def __init__(self, db, dispatcher, render_live: Callable, render_ended: Callable,
+                 get_user_info: Callable[[str], Awaitable[Optional[Dict[str, Any]]]],
+                 edit_interval: int = TWITCH_ANNOUNCE_EDIT_INTERVAL) -> None:
+        self.db = db
+        self.dispatcher = dispatcher
+        self.render_live = render_live
+        self.render_ended = render_ended
+        self.get_user_info = get_user_info
+        self.edit_interval = edit_interval
+        # Twitch user ID -> guild ID -> message
+        self.messages: Dict[str, Dict[int, LiveMessage]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self) -> None:
+        cutoff = datetime.now(timezone.utc) - ANNOUNCEMENT_RETENTION
+        await self.db.purge_announcements(cutoff.isoformat())
+        self.messages.clear()
+        for guild_id, user_id, stream_id, username, channel_id, message_id, role_id, digest, _ in await self.db.get_announcements():
+            self.messages.setdefault(user_id, {})[guild_id] = LiveMessage(
+                guild_id, channel_id, message_id, user_id, stream_id, username, role_id, bool(digest)
+            )
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def announced(self, user_id: str, guild_id: int, stream_id: str) -> bool:
+        """Whether this stream already has a message in this guild."""
+        record = self.messages.get(user_id, {}).get(guild_id)
+        return record is not None and record.stream_id == stream_id
+
+    async def add(self, announcements: List[Dict[str, Any]], message: discord.Message, digest: bool) -> None:
+        """Record a sent message; the dispatcher's ``on_sent`` callback."""
+        posted_at = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for announcement in announcements:
+            stream_status = announcement['stream_status']
+            record = LiveMessage(
+                announcement['guild_id'], message.channel.id, message.id,
+                announcement['user_info']['id'], stream_status['stream_id'],
+                announcement['username'], announcement['role_id'], digest
+            )
+            record.user_info = announcement['user_info']
+            record.stream_status = stream_status
+            record.shown = _shown(stream_status)
+            self.messages.setdefault(record.user_id, {})[record.guild_id] = record
+            rows.append((
+                record.guild_id, record.user_id, record.stream_id, record.username,
+                record.channel_id, record.message_id, record.role_id, int(digest), posted_at
+            ))
+        await self.db.save_announcements(rows)
+
+    def refresh(self, user_id: str, stream_status: Dict[str, Any]) -> None:
+        """Take a live sample, editing messages whose edit interval has passed."""
+        records = self.messages.get(user_id)
+        if not records:
+            return
+        now = time.monotonic()
+        for record in records.values():
+            if record.digest:
+                continue
+            record.stream_status = stream_status
+            if not self.edit_interval or now - record.edited_at < self.edit_interval:
+                continue
+            if record.shown == _shown(stream_status) or (record.task and not record.task.done()):
+                continue
+            record.task = self._spawn(self._edit(record))
+
+    def finish(self, user_id: str, session: Optional[tuple]) -> None:
+        """Switch every message for user_id to its ended state and forget them.
+
+        ``session`` is the ``StreamTracker.drain_sessions`` tuple, if any.
+        """
+        records = self.messages.pop(user_id, None)
+        if records:
+            self._spawn(self._finish(list(records.values()), session))
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _edit(self, record: LiveMessage, session: Optional[tuple] = None, ended: bool = False) -> None:
+        try:
+            if record.user_info is None:
+                # Recorded before a restart; the profile comes from the Helix cache
+                record.user_info = await self.get_user_info(record.user_id)
+                if record.user_info is None:
+                    return
+            announcement = record.announcement()
+            if ended:
+                render = lambda guild: self.render_ended(guild, announcement, session)
+            elif record.stream_status:
+                render = lambda guild: self.render_live(guild, announcement)
+            else:
+                return
+            shown = _shown(record.stream_status) if record.stream_status else None
+            await self.dispatcher.edit(record.guild_id, record.channel_id, record.message_id, render)
+            # Failed edits also wait out the interval rather than retrying every sample
+            record.edited_at = time.monotonic()
+            record.shown = shown
+        except Exception as e:
+            logging.error(f"Error updating announcement {record.message_id} for Twitch user {record.user_id}: {e}")
+
+    async def _finish(self, records: List[LiveMessage], session: Optional[tuple]) -> None:
+        for record in records:
+            if record.task and not record.task.done():
+                # Let an in-flight live edit land first so it can't overwrite the end state
+                await asyncio.gather(record.task, return_exceptions=True)
+        await asyncio.gather(*(
+            self._edit(record, session, ended=True) for record in records if not record.digest
+        ))
+        try:
+            await self.db.delete_announcements([(r.guild_id, r.user_id, r.stream_id) for r in records])
+        except Exception as e:
+            logging.error(f"Error forgetting announcements for Twitch user {records[0].user_id}: {e}")
@@ -0,0 +1,164 @@
+"""
+Twitch Poller Metrics
+
+In-process counters and histograms for the Twitch integration: poll cycle
+duration, Helix request latency per endpoint, requests per cycle, 429
+responses and announcement send latency. ``/twitch stats`` shows a summary
+and the same numbers can be exported in the Prometheus text format, either
+attached to that command or written to TWITCH_METRICS_FILE after every cycle
+for a node_exporter textfile collector.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CYCLE_BUCKETS = (1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+REQUEST_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500)
+SEND_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+    def render(self, name: str, labels: str = '') -> List[str]:
+        prefix = f"{labels}," if labels else ''
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else f"{bound:g}"
+            lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ''
+        lines.append(f"{name}_sum{suffix} {self.sum:.6f}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class TwitchMetrics:
+    """Metrics shared by the Twitch client, poller and dispatcher."""
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self.cycles = 0
+        self.cycle_timeouts = 0
+        self.cycles_skipped = 0
+        self.cycle_duration = Histogram(CYCLE_BUCKETS)
+        self.cycle_requests = Histogram(REQUEST_BUCKETS)
+        self.last_cycle: Dict[str, float] = {}
+        self.http_latency: Dict[str, Histogram] = {}
+        self.http_responses: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+        self.send_latency = Histogram(SEND_BUCKETS)
+        self.sends = Counter()
+        self._requests = 0
+        self._cycle_start: Optional[Tuple[float, int, int]] = None
+
+    def observe_request(self, endpoint: str, status: int, seconds: float) -> None:
+        histogram = self.http_latency.get(endpoint)
+        if histogram is None:
+            histogram = self.http_latency[endpoint] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(seconds)
+        self.http_responses[(endpoint, status)] += 1
+        if status == 429:
+            self.rate_limited[endpoint] += 1
+        self._requests += 1
+
+    def observe_send(self, seconds: float, delivered: bool) -> None:
+        self.sends['delivered' if delivered else 'failed'] += 1
+        if delivered:
+            self.send_latency.observe(seconds)
+
+    def start_cycle(self) -> None:
+        self._cycle_start = (time.monotonic(), self._requests, sum(self.rate_limited.values()))
+
+    def end_cycle(self, timed_out: bool = False) -> None:
+        if self._cycle_start is None:
+            return
+        started, requests, rate_limited = self._cycle_start
+        self._cycle_start = None
+        duration = time.monotonic() - started
+        requests = self._requests - requests
+        self.cycles += 1
+        self.cycle_timeouts += timed_out
+        self.cycle_duration.observe(duration)
+        self.cycle_requests.observe(requests)
+        self.last_cycle = {
+            'finished_at': time.time(),
+            'duration': duration,
+            'requests': requests,
+            'rate_limited': sum(self.rate_limited.values()) - rate_limited,
+        }
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = [
+            '# TYPE twitch_poll_cycles_total counter',
+            f'twitch_poll_cycles_total {self.cycles}',
+            '# TYPE twitch_poll_cycle_timeouts_total counter',
+            f'twitch_poll_cycle_timeouts_total {self.cycle_timeouts}',
+            '# TYPE twitch_poll_cycles_skipped_total counter',
+            f'twitch_poll_cycles_skipped_total {self.cycles_skipped}',
+            '# TYPE twitch_poll_cycle_seconds histogram',
+            *self.cycle_duration.render('twitch_poll_cycle_seconds'),
+            '# TYPE twitch_poll_cycle_requests histogram',
+            *self.cycle_requests.render('twitch_poll_cycle_requests'),
+            '# TYPE twitch_helix_request_seconds histogram',
+        ]
+        for endpoint, histogram in sorted(self.http_latency.items()):
+            lines.extend(histogram.render('twitch_helix_request_seconds', f'endpoint="{endpoint}"'))
+        lines.append('# TYPE twitch_helix_responses_total counter')
+        for (endpoint, status), count in sorted(self.http_responses.items()):
+            lines.append(f'twitch_helix_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines.append('# TYPE twitch_helix_rate_limited_total counter')
+        for endpoint, count in sorted(self.rate_limited.items()):
+            lines.append(f'twitch_helix_rate_limited_total{{endpoint="{endpoint}"}} {count}')
+        lines.append('# TYPE twitch_announcement_send_seconds histogram')
+        lines.extend(self.send_latency.render('twitch_announcement_send_seconds'))
+        lines.append('# TYPE twitch_announcements_total counter')
+        for outcome, count in sorted(self.sends.items()):
+            lines.append(f'twitch_announcements_total{{outcome="{outcome}"}} {count}')
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str, gauges: Optional[Dict[str, float]] = None) -> None:
+        """Atomically write the Prometheus text to path."""
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.render_prometheus(gauges))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Error exporting Twitch metrics to {path}: {e}")
@@ -0,0 +1,165 @@
+"""
+Adaptive Poll Schedule
+
+Keeps a per-streamer polling schedule that adapts to observed activity.
+Streamers who are live, went live recently, or usually go live around the
+current hour are checked every tick; streamers who have been dark for weeks
+drift to progressively longer intervals. Offline streamers covered by
+EventSub are only polled as a fallback, on a long interval. Each tick the
+poller asks for the streamers that are due, most overdue first, capped by
+its request budget, and spreads the resulting batches over the tick with
+``spread_offsets``.
+"""
+
+import heapq
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from .twitch_config import (
+    TWITCH_POLL_LIVE_INTERVAL,
+    TWITCH_POLL_ACTIVE_INTERVAL,
+    TWITCH_POLL_RECENT_INTERVAL,
+    TWITCH_POLL_IDLE_INTERVAL,
+    TWITCH_POLL_DORMANT_INTERVAL,
+    TWITCH_POLL_PUSHED_INTERVAL,
+    TWITCH_POLL_ACTIVE_DAYS,
+    TWITCH_POLL_RECENT_DAYS,
+    TWITCH_POLL_IDLE_DAYS,
+)
+
+# Share of past go-lives that must fall within an hour of now for the
+# current hour to count as one of the streamer's usual hours
+USUAL_HOUR_SHARE = 0.25
+
+# Checks due within this margin count as due now, so a streamer on the same
+# interval as the poll tick is not pushed back by a tick of clock jitter
+DUE_TOLERANCE = timedelta(seconds=5)
+
+
+def spread_offsets(count: int, window: float, jitter: float) -> List[float]:
+    """Start offsets (seconds) spreading ``count`` batches evenly over
+    ``window``, each shifted by a random share of up to ``jitter`` of its
+    slot. A lone batch goes out immediately."""
+    if count <= 1 or window <= 0:
+        return [0.0] * count
+    slot = window / count
+    return [(i + random.random() * jitter) * slot for i in range(count)]
+
+
+class StreamerSchedule:
+    """Observed activity and next check time for one Twitch user ID."""
+
+    __slots__ = ('user_id', 'is_live', 'last_live_at', 'tracked_since', 'last_checked', 'next_due', 'live_hours')
+
+    def __init__(self, user_id: str, is_live: bool = False, last_live_at: Optional[datetime] = None,
+                 tracked_since: Optional[datetime] = None) -> None:
+        self.user_id = user_id
+        self.is_live = is_live
+        self.last_live_at = last_live_at
+        # Stands in for last_live_at until the streamer is first seen live, so
+        # new and upgraded rows start in the active tier and decay from there
+        self.tracked_since = tracked_since or datetime.now(timezone.utc)
+        self.last_checked: Optional[datetime] = None
+        self.next_due: Optional[datetime] = None
+        self.live_hours = [0] * 24
+        if last_live_at:
+            self.live_hours[last_live_at.hour] += 1
+
+    def in_usual_hours(self, now: datetime) -> bool:
+        total = sum(self.live_hours)
+        if not total:
+            return False
+        window = sum(self.live_hours[(now.hour + offset) % 24] for offset in (-1, 0, 1))
+        return window / total >= USUAL_HOUR_SHARE
+
+
+class AdaptivePollScheduler:
+    """Tracks per-streamer schedules and picks who to poll each tick."""
+
+    def __init__(self) -> None:
+        self.schedules: Dict[str, StreamerSchedule] = {}
+        # IDs whose go-lives arrive by push
+        self.pushed: FrozenSet[str] = frozenset()
+
+    def sync(self, streamers: Dict[str, tuple]) -> None:
+        """Track exactly the given IDs, seeding new ones from stored state.
+
+        ``streamers`` maps a Twitch user ID to ``(is_live, last_live_at)``.
+        """
+        for user_id in list(self.schedules):
+            if user_id not in streamers:
+                del self.schedules[user_id]
+        for user_id, (is_live, last_live_at) in streamers.items():
+            if user_id not in self.schedules:
+                self.schedules[user_id] = StreamerSchedule(user_id, bool(is_live), last_live_at)
+
+    def set_pushed(self, user_ids: Iterable[str]) -> None:
+        """Poll these IDs only as a fallback while they are offline.
+
+        IDs that just became pushed keep their current due time and move to
+        the longer interval after their next check.
+        """
+        self.pushed = frozenset(user_ids)
+
+    def interval_for(self, schedule: StreamerSchedule, now: datetime) -> int:
+        """Seconds between checks for a streamer given its activity."""
+        if schedule.is_live:
+            return TWITCH_POLL_LIVE_INTERVAL
+        if schedule.user_id in self.pushed:
+            return max(self._tier_interval(schedule, now), TWITCH_POLL_PUSHED_INTERVAL)
+        return self._tier_interval(schedule, now)
+
+    def _tier_interval(self, schedule: StreamerSchedule, now: datetime) -> int:
+        if schedule.in_usual_hours(now):
+            return TWITCH_POLL_ACTIVE_INTERVAL
+        dark_for = now - (schedule.last_live_at or schedule.tracked_since)
+        if dark_for <= timedelta(days=TWITCH_POLL_ACTIVE_DAYS):
+            return TWITCH_POLL_ACTIVE_INTERVAL
+        if dark_for <= timedelta(days=TWITCH_POLL_RECENT_DAYS):
+            return TWITCH_POLL_RECENT_INTERVAL
+        if dark_for <= timedelta(days=TWITCH_POLL_IDLE_DAYS):
+            return TWITCH_POLL_IDLE_INTERVAL
+        return TWITCH_POLL_DORMANT_INTERVAL
+
+    def due(self, now: Optional[datetime] = None, limit: Optional[int] = None,
+            batch_size: int = 1) -> List[str]:
+        """IDs due for a check, most overdue first, at most ``limit`` of them.
+
+        With a ``batch_size``, the spare room in the last batch is filled with
+        the streamers due soonest, so they are checked early at no extra
+        request cost.
+        """
+        now = now or datetime.now(timezone.utc)
+        horizon = now + DUE_TOLERANCE
+        due, early = [], []
+        for schedule in self.schedules.values():
+            if schedule.next_due is None or schedule.next_due <= horizon:
+                due.append(schedule)
+            else:
+                early.append(schedule)
+        # Never-checked streamers sort first, then by how long they are overdue
+        due.sort(key=lambda s: s.next_due or datetime.min.replace(tzinfo=timezone.utc))
+        if limit is not None:
+            due = due[:limit]
+        spare = -len(due) % batch_size
+        if limit is not None:
+            spare = min(spare, limit - len(due))
+        if due and spare and early:
+            due.extend(heapq.nsmallest(spare, early, key=lambda s: s.next_due))
+        return [schedule.user_id for schedule in due]
+
+    def observe(self, user_id: str, is_live: bool, now: Optional[datetime] = None) -> None:
+        """Record a check result and schedule the next check."""
+        schedule = self.schedules.get(user_id)
+        if schedule is None:
+            return
+
+        now = now or datetime.now(timezone.utc)
+        if is_live:
+            if not schedule.is_live:
+                schedule.live_hours[now.hour] += 1
+            schedule.last_live_at = now
+        schedule.is_live = is_live
+        schedule.last_checked = now
+        schedule.next_due = now + timedelta(seconds=self.interval_for(schedule, now))
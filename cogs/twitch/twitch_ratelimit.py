@@ -0,0 +1,136 @@
+"""
+Helix Rate Limiter
+
+Twitch meters Helix calls with a token bucket per client ID and reports its
+state on every response through the ``Ratelimit-Limit``, ``Ratelimit-Remaining``
+and ``Ratelimit-Reset`` headers. The limiter keeps a local mirror of that
+bucket so callers wait for capacity instead of running into 429s, and hands
+capacity out by priority lane so interactive lookups are served before
+background polling.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Mapping, Optional
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class HelixRateLimiter:
+    """Token bucket synced to Helix rate limit headers with priority lanes."""
+
+    def __init__(self, limit: int = 800, window: float = 60.0) -> None:
+        self.limit = limit
+        self.window = window
+        self.tokens = float(limit)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of callers currently waiting for capacity."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int = PRIORITY_BACKGROUND) -> None:
+        """Wait until a request may be sent in the given priority lane."""
+        self._refill()
+        if not self._waiters and self._available():
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._grant()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Capacity was granted right before cancellation; hand it back
+                self.tokens += 1
+                self._grant()
+            raise
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Sync the local bucket with the headers of a Helix response."""
+        limit = _header_int(headers, 'Ratelimit-Limit')
+        remaining = _header_int(headers, 'Ratelimit-Remaining')
+        reset = _header_int(headers, 'Ratelimit-Reset')
+
+        self._refill()
+        if limit:
+            self.limit = limit
+        if remaining is not None:
+            self.tokens = float(remaining)
+            if remaining <= 0 and reset:
+                self._block_until_reset(reset)
+        if self._waiters and self._wakeup is None:
+            self._grant()
+
+    def rate_limited(self, headers: Mapping[str, str]) -> float:
+        """Drain the bucket after a 429 and return the seconds until reset."""
+        self._refill()
+        self.tokens = 0.0
+        reset = _header_int(headers, 'Ratelimit-Reset')
+        if reset:
+            self._block_until_reset(reset)
+        else:
+            self.blocked_until = time.monotonic() + self.window / self.limit
+        self._grant()
+        return max(0.0, self.blocked_until - time.monotonic())
+
+    def _block_until_reset(self, reset_epoch: int) -> None:
+        delay = max(0.0, reset_epoch - time.time())
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        rate = self.limit / self.window
+        self.tokens = min(float(self.limit), self.tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def _available(self) -> bool:
+        return self.tokens >= 1 and time.monotonic() >= self.blocked_until
+
+    def _seconds_until_available(self) -> float:
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        rate = self.limit / self.window
+        return max(0.0, (1 - self.tokens) / rate)
+
+    def _grant(self) -> None:
+        """Hand out available capacity to waiters in priority order."""
+        self._refill()
+        while self._waiters and self._available():
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.tokens -= 1
+            future.set_result(None)
+
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+        if self._waiters and self._wakeup is None:
+            delay = self._seconds_until_available()
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._on_wakeup)
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._grant()
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
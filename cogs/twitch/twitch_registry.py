@@ -0,0 +1,185 @@
+"""
+Streamer Registry
+
+Compact storage for (guild, streamer) subscriptions, sized for league-wide
+deployments with tens of thousands of them. Instead of a dict and a list per
+subscription, everything lives in flat parallel arrays indexed by slot:
+
+    streamer slot   Twitch ID (unsigned 64-bit), first subscription
+    subscription    guild ID, streamer slot, next subscription of the same
+                    streamer, live and pending flags, login, last announced
+                    stream ID
+
+A streamer's subscriptions form a chain through the ``next`` array, which
+is the index from Twitch ID to its guilds. Logins and stream IDs are
+interned, so a login followed by many guilds is stored once. A subscription
+costs 17 bytes of array storage plus two shared references, 33 bytes in all
+on a 64-bit build; freed slots are reused.
+"""
+
+import sys
+from array import array
+from typing import Iterator, List, Optional, Tuple
+
+NONE = -1
+LIVE_FLAG = 0x01
+# Claimed by an announcement that is still being prepared
+PENDING_FLAG = 0x02
+
+
+class StreamerRegistry:
+    """Flat-array (guild, streamer) subscription store."""
+
+    def __init__(self) -> None:
+        # Streamer slots
+        self.twitch_ids = array('Q')
+        self._first = array('i')
+        self._free_streamers: List[int] = []
+        # Subscription slots
+        self._guild = array('q')
+        self._streamer = array('i')
+        self._next = array('i')
+        self._flags = bytearray()
+        self._login: List[Optional[str]] = []
+        self._stream_id: List[Optional[str]] = []
+        self._free_subscriptions: List[int] = []
+        self.subscriptions = 0
+
+    def clear(self) -> None:
+        self.__init__()
+
+    # Streamers
+
+    def add_streamer(self, user_id: str) -> int:
+        if self._free_streamers:
+            slot = self._free_streamers.pop()
+            self.twitch_ids[slot] = int(user_id)
+            self._first[slot] = NONE
+            return slot
+        self.twitch_ids.append(int(user_id))
+        self._first.append(NONE)
+        return len(self.twitch_ids) - 1
+
+    def drop_streamer(self, slot: int) -> None:
+        """Free a streamer slot and every subscription chained to it."""
+        sub = self._first[slot]
+        while sub != NONE:
+            following = self._next[sub]
+            self._free(sub)
+            sub = following
+        self._first[slot] = NONE
+        self.twitch_ids[slot] = 0
+        self._free_streamers.append(slot)
+
+    # Subscriptions
+
+    def subscribe(self, slot: int, guild_id: int, login: str, is_live: bool = False,
+                  stream_id: Optional[str] = None) -> int:
+        """Add or overwrite the subscription of guild_id to the streamer in slot."""
+        sub = self.find(slot, guild_id)
+        if sub == NONE:
+            if self._free_subscriptions:
+                sub = self._free_subscriptions.pop()
+                self._guild[sub] = guild_id
+                self._streamer[sub] = slot
+                self._next[sub] = self._first[slot]
+            else:
+                sub = len(self._guild)
+                self._guild.append(guild_id)
+                self._streamer.append(slot)
+                self._next.append(self._first[slot])
+                self._flags.append(0)
+                self._login.append(None)
+                self._stream_id.append(None)
+            self._first[slot] = sub
+            self.subscriptions += 1
+        self._flags[sub] = LIVE_FLAG if is_live else 0
+        self._login[sub] = sys.intern(login)
+        self._stream_id[sub] = sys.intern(stream_id) if stream_id else None
+        return sub
+
+    def unsubscribe(self, slot: int, guild_id: int) -> bool:
+        """Remove a subscription; returns False if there was none."""
+        previous = NONE
+        sub = self._first[slot]
+        while sub != NONE:
+            if self._guild[sub] == guild_id:
+                if previous == NONE:
+                    self._first[slot] = self._next[sub]
+                else:
+                    self._next[previous] = self._next[sub]
+                self._free(sub)
+                return True
+            previous, sub = sub, self._next[sub]
+        return False
+
+    def _free(self, sub: int) -> None:
+        self._streamer[sub] = NONE
+        self._next[sub] = NONE
+        self._flags[sub] = 0
+        self._login[sub] = None
+        self._stream_id[sub] = None
+        self._free_subscriptions.append(sub)
+        self.subscriptions -= 1
+
+    def find(self, slot: int, guild_id: int) -> int:
+        sub = self._first[slot]
+        while sub != NONE and self._guild[sub] != guild_id:
+            sub = self._next[sub]
+        return sub
+
+    def chain(self, slot: int) -> Iterator[int]:
+        """Subscription slots of one streamer."""
+        sub = self._first[slot]
+        while sub != NONE:
+            yield sub
+            sub = self._next[sub]
+
+    def has_subscribers(self, slot: int) -> bool:
+        return self._first[slot] != NONE
+
+    def guilds(self, slot: int) -> List[int]:
+        return [self._guild[sub] for sub in self.chain(slot)]
+
+    def in_guild(self, guild_id: int) -> List[Tuple[int, int]]:
+        """``(streamer slot, subscription)`` pairs of one guild."""
+        return [
+            (self._streamer[sub], sub) for sub, guild in enumerate(self._guild)
+            if guild == guild_id and self._streamer[sub] != NONE
+        ]
+
+    # Subscription fields
+
+    def guild(self, sub: int) -> int:
+        return self._guild[sub]
+
+    def login(self, sub: int) -> str:
+        return self._login[sub]
+
+    def is_live(self, sub: int) -> bool:
+        return bool(self._flags[sub] & LIVE_FLAG)
+
+    def stream_id(self, sub: int) -> Optional[str]:
+        return self._stream_id[sub]
+
+    def is_pending(self, sub: int) -> bool:
+        return bool(self._flags[sub] & PENDING_FLAG)
+
+    def set_pending(self, sub: int) -> None:
+        self._flags[sub] |= PENDING_FLAG
+
+    def clear_pending(self, sub: int) -> None:
+        self._flags[sub] &= ~PENDING_FLAG
+
+    def set_live(self, sub: int, stream_id: str) -> None:
+        self._flags[sub] = LIVE_FLAG
+        self._stream_id[sub] = sys.intern(stream_id)
+
+    def set_offline(self, sub: int) -> None:
+        self._flags[sub] &= ~LIVE_FLAG
+
+    def nbytes(self) -> int:
+        """Bytes held by the arrays themselves (shared strings excluded)."""
+        arrays = (self.twitch_ids, self._first, self._guild, self._streamer, self._next)
+        return (sum(a.buffer_info()[1] * a.itemsize for a in arrays) + len(self._flags)
+                + 8 * (len(self._login) + len(self._stream_id)))
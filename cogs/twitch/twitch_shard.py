@@ -0,0 +1,66 @@
+"""
+Poll Sharding
+
+Splits Twitch IDs between poller instances that share the Twitch database.
+Instances register a lease in ``twitch_poll_leases`` and renew it every poll
+cycle; the live instances, sorted by ID, divide a 32-bit hash space into equal
+contiguous ranges and each polls only the IDs hashing into its own range.
+When an instance stops renewing, its lease expires and the next renewal by
+any other instance shrinks the set, so its range is absorbed automatically.
+
+SQLite coordination only works for instances that can open the same database
+file, i.e. processes on one host or on a shared volume.
+"""
+
+import hashlib
+import logging
+import time
+from typing import Optional
+
+HASH_SPACE = 2 ** 32
+
+
+def shard_hash(user_id: str) -> int:
+    """Stable 32-bit hash of a Twitch ID (``hash()`` differs per process)."""
+    return int.from_bytes(hashlib.blake2b(user_id.encode(), digest_size=4).digest(), 'big')
+
+
+class ShardCoordinator:
+    """Lease-based assignment of Twitch ID hash ranges to poller instances."""
+
+    def __init__(self, db, instance_id: Optional[str], lease_seconds: float) -> None:
+        self.db = db
+        self.instance_id = instance_id
+        self.lease_seconds = lease_seconds
+        self.index = 0
+        self.count = 1
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.instance_id)
+
+    async def renew(self) -> bool:
+        """Renew the lease and recompute this instance's range.
+
+        Returns True when the assignment changed since the last renewal.
+        """
+        if not self.enabled:
+            return False
+
+        instances = await self.db.renew_poll_lease(self.instance_id, time.time(), self.lease_seconds)
+        index, count = instances.index(self.instance_id), len(instances)
+        changed = (index, count) != (self.index, self.count)
+        if changed:
+            logging.warning(f"Twitch poll shard {self.instance_id} now owns range {index + 1}/{count}")
+        self.index, self.count = index, count
+        return changed
+
+    async def release(self) -> None:
+        """Drop the lease so other instances take over immediately."""
+        if self.enabled:
+            await self.db.release_poll_lease(self.instance_id)
+
+    def owns(self, user_id: str) -> bool:
+        if not self.enabled or self.count == 1:
+            return True
+        return shard_hash(user_id) * self.count // HASH_SPACE == self.index
@@ -0,0 +1,347 @@
+"""
+Stream State Tracker
+
+Resident state for every monitored Twitch ID, loaded from SQLite once at
+startup and kept current by poll results, EventSub events and the /twitch
+commands. Each ID moves through a small state machine:
+
+    OFFLINE --live--> LIVE --offline--> ENDING --grace expired--> OFFLINE
+                        ^                  |
+                        +------live--------+
+
+ENDING holds a stream for the offline grace window. If the streamer comes
+back within it, even under a new stream ID after a dropped connection, it is
+the same session: nothing is announced and nothing is written. Per-guild
+subscriptions mirror the ``is_live`` and ``last_stream_id`` columns and are
+only written back when they change; they are kept in a compact
+``StreamerRegistry`` rather than per-stream dicts.
+
+``observe_live`` claims the subscribers it returns until they are marked
+announced or released, so a push event and a poll that see the same go-live
+while the announcement is being prepared don't both announce it.
+
+Guilds may restrict announcements to a set of Helix game IDs. A stream in a
+game that none of its subscribers allow is treated exactly like an offline
+one, so switching to another game mid-stream ends the session once the grace
+window passes and switching back does not announce the same stream again.
+
+While a stream is live its session (start, peak and average viewers, title,
+game) is accumulated in memory and handed to the database once, when the
+stream ends.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .twitch_config import TWITCH_OFFLINE_GRACE
+from .twitch_registry import NONE, StreamerRegistry
+
+OFFLINE = 'offline'
+LIVE = 'live'
+ENDING = 'ending'
+
+
+class StreamSession:
+    """Running statistics for the current live session of one Twitch ID."""
+
+    __slots__ = ('started_at', 'peak_viewers', 'viewer_sum', 'samples', 'title', 'game_name')
+
+    def __init__(self, started_at: datetime) -> None:
+        self.started_at = started_at
+        self.peak_viewers = 0
+        self.viewer_sum = 0
+        self.samples = 0
+        self.title: Optional[str] = None
+        self.game_name: Optional[str] = None
+
+
+class TrackedStream:
+    """State of one Twitch ID; ``slot`` locates its subscriptions in the
+    tracker's registry."""
+
+    __slots__ = ('user_id', 'slot', 'state', 'stream_id', 'last_live_at', 'ending_since', 'session')
+
+    def __init__(self, user_id: str, slot: int) -> None:
+        self.user_id = user_id
+        self.slot = slot
+        self.state = OFFLINE
+        self.stream_id: Optional[str] = None
+        self.last_live_at: Optional[datetime] = None
+        self.ending_since: Optional[datetime] = None
+        self.session: Optional[StreamSession] = None
+
+
+class StreamTracker:
+    """In-memory stream state machine for all monitored Twitch IDs."""
+
+    def __init__(self, grace_seconds: int = TWITCH_OFFLINE_GRACE) -> None:
+        self.grace = timedelta(seconds=grace_seconds)
+        self.streams: Dict[str, TrackedStream] = {}
+        self.registry = StreamerRegistry()
+        # Bumped whenever a Twitch ID starts or stops being tracked
+        self.version = 0
+        self._ending: Set[str] = set()
+        # Sessions and IDs that ended since the last drain_sessions() and
+        # drain_ended() calls
+        self._finished: List[tuple] = []
+        self._ended: List[str] = []
+        self.settings: Dict[int, Tuple[int, Optional[int]]] = {}
+        # Game ID allowlists of guilds that restrict announcements
+        self.game_filters: Dict[int, FrozenSet[str]] = {}
+        # Legacy rows without a stored Twitch ID, keyed by (guild_id, username)
+        self.unresolved: Dict[Tuple[int, str], tuple] = {}
+
+    def load(self, settings: Iterable[Tuple], rows: Iterable[Tuple], keep: Iterable[str] = ()) -> None:
+        """Rebuild state from ``TwitchDatabase.load_state`` rows: settings
+        cut to ``(guild_id, channel_id, role_id, games)`` and streamer rows.
+
+        The database only knows live or not, so for the IDs in ``keep`` (the
+        ones this process has been polling) the in-memory state, ENDING
+        grace, running session and announcement claims are carried over to
+        the rebuilt streams.
+        """
+        carried = [self.streams[user_id] for user_id in keep if user_id in self.streams]
+        claims = {
+            (stream.user_id, self.registry.guild(sub))
+            for stream in carried for sub in self.registry.chain(stream.slot)
+            if self.registry.is_pending(sub)
+        }
+        self.streams.clear()
+        self.registry.clear()
+        self.version += 1
+        self._ending.clear()
+        self.unresolved.clear()
+        self.settings.clear()
+        self.game_filters.clear()
+        for guild_id, channel_id, role_id, games in settings:
+            self.set_guild_settings(guild_id, channel_id, role_id)
+            self.set_game_filter(guild_id, games)
+        for guild_id, username, user_id, is_live, last_stream_id, _, _, last_live_at in rows:
+            if user_id:
+                self.add(guild_id, username, user_id, bool(is_live), last_stream_id, _parse_timestamp(last_live_at))
+            else:
+                self.unresolved[(guild_id, username)] = (bool(is_live), last_stream_id, _parse_timestamp(last_live_at))
+        for previous in carried:
+            stream = self.streams.get(previous.user_id)
+            if stream is None:
+                continue
+            stream.state = previous.state
+            stream.stream_id = previous.stream_id
+            stream.ending_since = previous.ending_since
+            stream.session = previous.session
+            if previous.last_live_at and (stream.last_live_at is None or previous.last_live_at > stream.last_live_at):
+                stream.last_live_at = previous.last_live_at
+            if stream.state == ENDING:
+                self._ending.add(stream.user_id)
+        for user_id, guild_id in claims:
+            sub = self.registry.find(self.streams[user_id].slot, guild_id) if user_id in self.streams else NONE
+            if sub != NONE and not self.registry.is_live(sub):
+                self.registry.set_pending(sub)
+
+    def get(self, user_id: str) -> Optional[TrackedStream]:
+        return self.streams.get(user_id)
+
+    def set_guild_settings(self, guild_id: int, channel_id: int, role_id: Optional[int]) -> None:
+        self.settings[guild_id] = (channel_id, role_id)
+
+    def set_game_filter(self, guild_id: int, game_ids: Optional[Iterable[str]]) -> None:
+        """Restrict a guild's announcements to game_ids; None or empty allows every game."""
+        if game_ids:
+            self.game_filters[guild_id] = frozenset(game_ids)
+        else:
+            self.game_filters.pop(guild_id, None)
+
+    def game_filter(self, user_id: str) -> Optional[FrozenSet[str]]:
+        """Game IDs any subscriber of user_id announces, or None when at
+        least one subscriber announces every game."""
+        stream = self.streams.get(user_id)
+        if stream is None or not self.game_filters:
+            return None
+        allowed = set()
+        for guild_id in self.registry.guilds(stream.slot):
+            games = self.game_filters.get(guild_id)
+            if games is None:
+                return None
+            allowed |= games
+        return frozenset(allowed)
+
+    def allows_game(self, guild_id: int, game_id: Optional[str]) -> bool:
+        games = self.game_filters.get(guild_id)
+        return games is None or game_id in games
+
+    def remove_guild(self, guild_id: int) -> None:
+        self.settings.pop(guild_id, None)
+        self.game_filters.pop(guild_id, None)
+        for slot, _ in self.registry.in_guild(guild_id):
+            self._unsubscribe(str(self.registry.twitch_ids[slot]), guild_id)
+        for key in [key for key in self.unresolved if key[0] == guild_id]:
+            del self.unresolved[key]
+
+    def add(self, guild_id: int, username: str, user_id: str, is_live: bool = False,
+            last_stream_id: Optional[str] = None, last_live_at: Optional[datetime] = None) -> None:
+        """Start tracking a (guild, streamer) subscription."""
+        self.unresolved.pop((guild_id, username), None)
+        stream = self.streams.get(user_id)
+        if stream is None:
+            stream = self.streams[user_id] = TrackedStream(user_id, self.registry.add_streamer(user_id))
+            self.version += 1
+        self.registry.subscribe(stream.slot, guild_id, username, is_live, last_stream_id)
+        if is_live and stream.state == OFFLINE:
+            stream.state = LIVE
+            stream.stream_id = last_stream_id
+        if last_live_at and (stream.last_live_at is None or last_live_at > stream.last_live_at):
+            stream.last_live_at = last_live_at
+
+    def resolve(self, guild_id: int, username: str, user_id: str) -> None:
+        """Move a legacy row to the tracked set once its Twitch ID is known."""
+        row = self.unresolved.pop((guild_id, username), None)
+        if row is not None:
+            self.add(guild_id, username, user_id, *row)
+
+    def remove(self, guild_id: int, username: str) -> None:
+        self.unresolved.pop((guild_id, username), None)
+        for slot, sub in self.registry.in_guild(guild_id):
+            if self.registry.login(sub) == username:
+                self._unsubscribe(str(self.registry.twitch_ids[slot]), guild_id)
+
+    def _unsubscribe(self, user_id: str, guild_id: int) -> None:
+        stream = self.streams.get(user_id)
+        if stream and self.registry.unsubscribe(stream.slot, guild_id) and not self.registry.has_subscribers(stream.slot):
+            self.registry.drop_streamer(stream.slot)
+            del self.streams[user_id]
+            self._ending.discard(user_id)
+            self.version += 1
+
+    def observe_live(self, user_id: str, stream_id: str) -> List[Tuple[int, str]]:
+        """Record that user_id is live and return ``(guild_id, username)``
+        subscribers that have not been told about this session yet.
+
+        The returned subscribers are claimed: later calls skip them until
+        ``mark_announced`` or ``release``.
+        """
+        stream = self.streams.get(user_id)
+        if stream is None:
+            return []
+
+        if stream.state == OFFLINE:
+            stream.session = None
+        # Back within the grace window: same session, subscribers stay live
+        self._ending.discard(user_id)
+        stream.state = LIVE
+        stream.stream_id = stream_id
+        stream.ending_since = None
+        stream.last_live_at = datetime.now(timezone.utc)
+        registry = self.registry
+        claimed = []
+        for sub in registry.chain(stream.slot):
+            if registry.is_live(sub) or registry.is_pending(sub) or registry.stream_id(sub) == stream_id:
+                continue
+            registry.set_pending(sub)
+            claimed.append((registry.guild(sub), registry.login(sub)))
+        return claimed
+
+    def record_sample(self, user_id: str, stream_status: dict) -> None:
+        """Fold a live stream status into the current session's statistics."""
+        stream = self.streams.get(user_id)
+        if stream is None:
+            return
+        session = stream.session
+        if session is None:
+            started_at = _parse_timestamp((stream_status.get('started_at') or '').replace('Z', '+00:00'))
+            session = stream.session = StreamSession(started_at or datetime.now(timezone.utc))
+        viewers = stream_status.get('viewer_count') or 0
+        session.peak_viewers = max(session.peak_viewers, viewers)
+        session.viewer_sum += viewers
+        session.samples += 1
+        session.title = stream_status.get('title')
+        session.game_name = stream_status.get('game_name')
+
+    def drain_sessions(self) -> List[tuple]:
+        """Return and forget the sessions that ended, as
+        ``(user_id, stream_id, started_at, ended_at, peak_viewers,
+        avg_viewers, title, game_name)`` tuples."""
+        finished, self._finished = self._finished, []
+        return finished
+
+    def drain_ended(self) -> List[str]:
+        """Return and forget the IDs whose stream ended, with or without a
+        recorded session."""
+        ended, self._ended = self._ended, []
+        return ended
+
+    def mark_announced(self, user_id: str, guild_id: int, stream_id: str) -> None:
+        stream = self.streams.get(user_id)
+        sub = self.registry.find(stream.slot, guild_id) if stream else NONE
+        if sub != NONE:
+            self.registry.set_live(sub, stream_id)
+
+    def release(self, user_id: str, guild_id: int) -> None:
+        """Drop an ``observe_live`` claim that was not announced."""
+        stream = self.streams.get(user_id)
+        sub = self.registry.find(stream.slot, guild_id) if stream else NONE
+        if sub != NONE:
+            self.registry.clear_pending(sub)
+
+    def observe_offline(self, user_id: str, now: Optional[datetime] = None) -> List[Tuple[int, str]]:
+        """Record that user_id is not live.
+
+        A live stream first moves to ENDING and is only ended by
+        ``expire_ending`` once the grace window passes. Returns the
+        ``(guild_id, username)`` subscribers whose stored state flips to
+        offline right away (only when the grace window is disabled).
+        """
+        stream = self.streams.get(user_id)
+        if stream is None or stream.state != LIVE:
+            return []
+
+        if not self.grace:
+            return self._end(stream, now)
+
+        stream.state = ENDING
+        stream.ending_since = now or datetime.now(timezone.utc)
+        self._ending.add(user_id)
+        return []
+
+    def expire_ending(self, now: Optional[datetime] = None) -> List[Tuple[int, str]]:
+        """End every stream whose grace window has passed.
+
+        Returns the ``(guild_id, username)`` subscribers that flip offline.
+        """
+        now = now or datetime.now(timezone.utc)
+        ended = []
+        for user_id in list(self._ending):
+            stream = self.streams.get(user_id)
+            if stream is None:
+                self._ending.discard(user_id)
+            elif now - stream.ending_since >= self.grace:
+                ended.extend(self._end(stream, stream.ending_since))
+        return ended
+
+    def _end(self, stream: TrackedStream, ended_at: Optional[datetime] = None) -> List[Tuple[int, str]]:
+        self._ending.discard(stream.user_id)
+        self._ended.append(stream.user_id)
+        session = stream.session
+        if session and session.samples:
+            self._finished.append((
+                stream.user_id, stream.stream_id,
+                session.started_at, ended_at or datetime.now(timezone.utc),
+                session.peak_viewers, session.viewer_sum / session.samples,
+                session.title, session.game_name
+            ))
+        stream.session = None
+        stream.state = OFFLINE
+        stream.ending_since = None
+        registry = self.registry
+        ended = []
+        for sub in registry.chain(stream.slot):
+            if registry.is_live(sub):
+                registry.set_offline(sub)
+                ended.append((registry.guild(sub), registry.login(sub)))
+        return ended
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,263 @@
+"""
+Announcement Templates
+
+Per-guild announcement layout, compiled once and cached. A template holds
+the guild's content format, embed color and role mention, together with the
+resolved channel and role objects, so a go-live only fills in the stream
+fields. Templates are compiled when /twitch setup runs and otherwise on
+first use; guild, channel and role changes drop the compiled copy so the
+next announcement recompiles it.
+
+The content format may use these placeholders:
+
+    {mention}   the ping role, if one is set
+    {streamer}  the streamer's display name
+    {title}     the stream title
+    {game}      the game or category
+    {url}       the channel URL
+"""
+
+import string
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import discord
+
+TWITCH_ICON_URL = "https://static-cdn.jtvnw.net/jtv_user_pictures/8a6381c7-d0c0-4576-b179-38bd5ce1d6af-profile_image-70x70.png"
+TWITCH_COLOR = 0x9146FF
+ENDED_COLOR = 0x6E6E6E
+
+DEFAULT_MESSAGE = "{mention} **{streamer}** is now live! 🎮"
+MESSAGE_FIELDS = frozenset({'mention', 'streamer', 'title', 'game', 'url'})
+MESSAGE_MAX_LENGTH = 500
+# Values for the test render of a content format before it is saved
+SAMPLE_FIELDS = {
+    'mention': "<@&0>",
+    'streamer': "Streamer",
+    'title': "Stream title",
+    'game': "Assetto Corsa",
+    'url': "https://twitch.tv/streamer",
+}
+
+# Streamers listed individually in a digest before it is summarised
+DIGEST_MAX_LINES = 20
+
+Rendered = Tuple[str, discord.Embed]
+
+
+def compile_message(message: Optional[str]) -> str:
+    """Validate a content format, returning the default for an empty one.
+
+    Raises ValueError naming the problem.
+    """
+    if not message:
+        return DEFAULT_MESSAGE
+    if len(message) > MESSAGE_MAX_LENGTH:
+        raise ValueError(f"The message can be at most {MESSAGE_MAX_LENGTH} characters.")
+    try:
+        parsed = [(field, spec, conversion) for _, field, spec, conversion in string.Formatter().parse(message)
+                  if field is not None]
+    except ValueError:
+        raise ValueError("The message has an unmatched `{` or `}`.")
+    unknown = sorted({field for field, _, _ in parsed} - MESSAGE_FIELDS)
+    if unknown:
+        names = ', '.join(f"{{{field}}}" for field in unknown)
+        raise ValueError(f"Unknown placeholder {names}. Use {', '.join(f'{{{f}}}' for f in sorted(MESSAGE_FIELDS))}.")
+    # Format specs and conversions ({streamer:>5000}, {title!r}) could pad
+    # every announcement to any size or fail at render time; plain fields only
+    formatted = sorted({f"{{{field}}}" for field, spec, conversion in parsed if spec or conversion})
+    if formatted:
+        raise ValueError(f"Placeholders can't have a format or conversion: {', '.join(formatted)}.")
+    try:
+        message.format(**SAMPLE_FIELDS)
+    except (IndexError, KeyError, ValueError) as e:
+        raise ValueError(f"The message can't be rendered: {e}")
+    return message
+
+
+def parse_color(color: Optional[str]) -> Optional[int]:
+    """Parse a ``#RRGGBB`` hex color; None for an empty one.
+
+    Raises ValueError if it isn't one.
+    """
+    if not color:
+        return None
+    try:
+        value = int(color.strip().lstrip('#'), 16)
+    except ValueError:
+        raise ValueError("The color must be a hex code like `#9146FF`.")
+    if not 0 <= value <= 0xFFFFFF:
+        raise ValueError("The color must be a hex code like `#9146FF`.")
+    return value
+
+
+class AnnouncementTemplate:
+    """A guild's compiled announcement layout."""
+
+    __slots__ = ('guild', 'channel', 'role', 'mention', 'message', 'color', 'footer')
+
+    def __init__(self, guild: Optional[discord.Guild], channel_id: Optional[int], role_id: Optional[int],
+                 message: Optional[str] = None, color: Optional[int] = None) -> None:
+        self.guild = guild
+        self.channel = guild.get_channel(channel_id) if guild and channel_id else None
+        self.role = guild.get_role(role_id) if guild and role_id else None
+        if self.role:
+            self.mention = self.role.mention
+        elif role_id and guild is None:
+            # Guild not cached here (sharded poller); mention by ID
+            self.mention = f"<@&{role_id}>"
+        else:
+            self.mention = ""
+        self.message = compile_message(message)
+        self.color = TWITCH_COLOR if color is None else color
+        self.footer = {'text': "Twitch", 'icon_url': TWITCH_ICON_URL}
+
+    def _content(self, text: str) -> str:
+        return f"{self.mention} {text}" if self.mention else text
+
+    def _finish(self, embed: discord.Embed, user_info: Dict[str, Any]) -> discord.Embed:
+        if user_info['profile_image_url']:
+            embed.set_author(
+                name=user_info['display_name'],
+                icon_url=user_info['profile_image_url'],
+                url=f"https://twitch.tv/{user_info['login']}"
+            )
+        embed.set_footer(**self.footer)
+        return embed
+
+    def render_live(self, user_info: Dict[str, Any], stream_status: Dict[str, Any]) -> Rendered:
+        url = f"https://twitch.tv/{user_info['login']}"
+        embed = discord.Embed(
+            title=f"🔴 {user_info['display_name']} is now live on Twitch!",
+            description=stream_status['title'],
+            color=self.color,
+            url=url
+        )
+
+        if stream_status['game_name']:
+            embed.add_field(name="Game", value=stream_status['game_name'], inline=True)
+
+        embed.add_field(name="Viewers", value=str(stream_status['viewer_count']), inline=True)
+
+        try:
+            started_at = datetime.fromisoformat(stream_status['started_at'].replace('Z', '+00:00'))
+            embed.add_field(name="Started", value=f"<t:{int(started_at.timestamp())}:R>", inline=True)
+        except (AttributeError, KeyError, ValueError):
+            pass
+
+        if stream_status['thumbnail_url']:
+            embed.set_image(url=stream_status['thumbnail_url'].format(width=320, height=180))
+
+        content = self.message.format(
+            mention=self.mention,
+            streamer=user_info['display_name'],
+            title=stream_status['title'],
+            game=stream_status['game_name'] or '',
+            url=url
+        ).strip()
+        return content, self._finish(embed, user_info)
+
+    def render_ended(self, user_info: Dict[str, Any], stream_status: Optional[Dict[str, Any]],
+                     session: Optional[tuple]) -> Rendered:
+        """Final state of an announcement; ``session`` is the finished
+        ``StreamTracker`` session tuple, or None when no sample was taken."""
+        stream_status = stream_status or {}
+        title = session[6] if session else stream_status.get('title')
+        game_name = session[7] if session else stream_status.get('game_name')
+
+        embed = discord.Embed(
+            title=f"⚫ {user_info['display_name']} was live on Twitch",
+            description=title,
+            color=ENDED_COLOR,
+            url=f"https://twitch.tv/{user_info['login']}"
+        )
+
+        if game_name:
+            embed.add_field(name="Game", value=game_name, inline=True)
+
+        if session:
+            started_at, ended_at, peak_viewers = session[2], session[3], session[4]
+            hours = max((ended_at - started_at).total_seconds(), 0) / 3600
+            embed.add_field(name="Peak Viewers", value=str(peak_viewers), inline=True)
+            embed.add_field(name="Streamed", value=f"{hours:.1f}h", inline=True)
+            embed.add_field(name="Ended", value=f"<t:{int(ended_at.timestamp())}:R>", inline=True)
+
+        return self._content(f"**{user_info['display_name']}** was live."), self._finish(embed, user_info)
+
+    def render_digest(self, announcements: List[Dict[str, Any]]) -> Rendered:
+        lines = []
+        for announcement in announcements[:DIGEST_MAX_LINES]:
+            user_info = announcement['user_info']
+            stream_status = announcement['stream_status']
+            line = f"🔴 **[{user_info['display_name']}](https://twitch.tv/{user_info['login']})** — {stream_status['title'][:100]}"
+            if stream_status['game_name']:
+                line += f" · *{stream_status['game_name']}*"
+            lines.append(line)
+        if len(announcements) > DIGEST_MAX_LINES:
+            lines.append(f"…and {len(announcements) - DIGEST_MAX_LINES} more")
+
+        embed = discord.Embed(
+            title=f"🔴 {len(announcements)} streamers are now live on Twitch!",
+            description="\n".join(lines),
+            color=self.color
+        )
+        embed.set_footer(**self.footer)
+        return self._content(f"**{len(announcements)} streamers** are now live! 🎮"), embed
+
+
+class TemplateCache:
+    """Compiled templates per guild, built from the stored settings."""
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+        # guild ID -> (channel_id, role_id, message, color) as stored
+        self.settings: Dict[int, Tuple[int, Optional[int], Optional[str], Optional[int]]] = {}
+        self._compiled: Dict[int, AnnouncementTemplate] = {}
+
+    def load(self, rows) -> None:
+        """Rebuild from ``(guild_id, channel_id, role_id, message, color)``
+        rows taken from ``TwitchDatabase.load_state`` settings."""
+        self.settings = {guild_id: tuple(settings) for guild_id, *settings in rows}
+        self._compiled.clear()
+
+    def configure(self, guild_id: int, channel_id: int, role_id: Optional[int],
+                  message: Optional[str] = None, color: Optional[int] = None) -> AnnouncementTemplate:
+        """Store a guild's settings and compile its template now."""
+        self.settings[guild_id] = (channel_id, role_id, message, color)
+        self._compiled.pop(guild_id, None)
+        return self.get(guild_id)
+
+    def remove(self, guild_id: int) -> None:
+        self.settings.pop(guild_id, None)
+        self._compiled.pop(guild_id, None)
+
+    def invalidate(self, guild_id: int) -> None:
+        """Drop the compiled template; it is rebuilt on next use."""
+        self._compiled.pop(guild_id, None)
+
+    def get(self, guild_id: int, role_id: Optional[int] = None) -> AnnouncementTemplate:
+        """The guild's template, or a default one with role_id for a guild
+        without stored settings."""
+        template = self._compiled.get(guild_id)
+        if template is not None:
+            return template
+
+        guild = self.bot.get_guild(guild_id)
+        channel_id, role_id, message, color = self.settings.get(guild_id, (None, role_id, None, None))
+        try:
+            template = AnnouncementTemplate(guild, channel_id, role_id, message, color)
+        except ValueError:
+            # Invalid format written to the database by hand; use the default text
+            template = AnnouncementTemplate(guild, channel_id, role_id, None, color)
+        if guild is not None and guild_id in self.settings:
+            # Only cache once the guild is available, so objects get resolved
+            self._compiled[guild_id] = template
+        return template
+
+    def channel(self, guild_id: int, channel_id: int) -> Tuple[Optional[discord.Guild], Any]:
+        """Cached ``(guild, channel)`` for the dispatcher, if the template
+        still points at channel_id."""
+        template = self.get(guild_id)
+        if template.channel is not None and template.channel.id == channel_id:
+            return template.guild, template.channel
+        return template.guild, None
@@ -3,6 +3,7 @@ from discord.ext import commands
 import os
 import aiosqlite
 import logging
+import logging.handlers
 import dotenv
 from dotenv import load_dotenv
 
@@ -10,7 +11,9 @@ load_dotenv()
 
 intents = discord.Intents.all()
 
-handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
+handler = logging.handlers.RotatingFileHandler(
+    filename='discord.log', encoding='utf-8', maxBytes=5 * 1024 * 1024, backupCount=5
+)
 
 class MyBot(commands.Bot):
     def __init__(self) -> None:
@@ -40,4 +43,7 @@ bot = MyBot()
 
 TOKEN = str(os.getenv('TOKEN'))
 
-bot.run(TOKEN, log_handler=handler, log_level=logging.ERROR)
\ No newline at end of file
+# The handler goes on the root logger so the cogs' own logging reaches
+# discord.log too; discord.py itself stays at ERROR
+logging.getLogger('discord').setLevel(logging.ERROR)
+bot.run(TOKEN, log_handler=handler, log_level=logging.INFO, root_logger=True)
\ No newline at end of file
@@ -0,0 +1,88 @@
+import asyncio
+
+from cogs.twitch.twitch_announce_handler import TwitchAnnounceHandler
+from cogs.twitch.twitch_state import StreamTracker
+
+STREAM = {
+    'is_live': True, 'stream_id': 's1', 'title': "Race", 'game_id': '1', 'game_name': "AC",
+    'viewer_count': 5, 'started_at': '2026-01-01T19:00:00Z', 'thumbnail_url': None,
+}
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.sent = []
+
+    def enqueue(self, announcement):
+        self.sent.append((announcement['guild_id'], announcement['username']))
+
+
+class FakeLiveMessages:
+    def announced(self, user_id, guild_id, stream_id):
+        return False
+
+    def refresh(self, user_id, stream_status):
+        pass
+
+
+def _handler(user_info):
+    """A handler wired to an in-memory tracker; user_info(user_id) stands in for Helix."""
+    handler = TwitchAnnounceHandler.__new__(TwitchAnnounceHandler)
+    handler.tracker = StreamTracker()
+    for guild_id in (1, 2):
+        handler.tracker.set_guild_settings(guild_id, 10 + guild_id, None)
+        handler.tracker.add(guild_id, 'racer', '100')
+    handler.dispatcher = FakeDispatcher()
+    handler.live_messages = FakeLiveMessages()
+    handler._helix_slots = asyncio.Semaphore(4)
+    handler.get_user_info = user_info
+    return handler
+
+
+def test_push_and_poll_racing_announce_a_go_live_once():
+    async def slow_user_info(user_id):
+        await asyncio.sleep(0.01)
+        return {'display_name': "Racer", 'login': 'racer', 'profile_image_url': None}
+
+    async def run():
+        handler = _handler(slow_user_info)
+        transitions = [([], []) for _ in range(3)]
+        await asyncio.gather(*(handler._apply_stream_status('100', dict(STREAM), t) for t in transitions))
+        return handler, transitions
+
+    handler, transitions = asyncio.run(run())
+    assert sorted(handler.dispatcher.sent) == [(1, 'racer'), (2, 'racer')]
+    assert sum(len(went_live) for went_live, _ in transitions) == 2
+
+
+def test_failed_user_lookup_releases_the_claim():
+    results = [None, {'display_name': "Racer", 'login': 'racer', 'profile_image_url': None}]
+
+    async def flaky_user_info(user_id):
+        return results.pop(0)
+
+    async def run():
+        handler = _handler(flaky_user_info)
+        await handler._apply_stream_status('100', dict(STREAM), ([], []))
+        assert handler.dispatcher.sent == []
+        await handler._apply_stream_status('100', dict(STREAM), ([], []))
+        return handler
+
+    handler = asyncio.run(run())
+    assert sorted(handler.dispatcher.sent) == [(1, 'racer'), (2, 'racer')]
+
+
+def test_game_filtered_guild_is_released_for_a_later_game():
+    async def user_info(user_id):
+        return {'display_name': "Racer", 'login': 'racer', 'profile_image_url': None}
+
+    async def run():
+        handler = _handler(user_info)
+        handler.tracker.set_game_filter(2, ['2'])
+        await handler._apply_stream_status('100', dict(STREAM), ([], []))
+        assert handler.dispatcher.sent == [(1, 'racer')]
+        await handler._apply_stream_status('100', dict(STREAM, game_id='2'), ([], []))
+        return handler
+
+    handler = asyncio.run(run())
+    assert handler.dispatcher.sent == [(1, 'racer'), (2, 'racer')]
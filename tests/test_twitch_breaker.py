@@ -0,0 +1,109 @@
+import types
+
+import pytest
+
+from cogs.twitch import twitch_breaker
+from cogs.twitch.twitch_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(twitch_breaker, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _breaker():
+    return CircuitBreaker(error_rate=0.5, min_requests=4, window=60, backoff=30, max_backoff=120)
+
+
+def _trip(breaker):
+    for _ in range(breaker.min_requests):
+        breaker.record(False)
+    assert breaker.state == OPEN
+
+
+def test_opens_once_the_error_rate_is_reached(clock):
+    breaker = _breaker()
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(True)
+    assert breaker.closed
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.blocking
+    assert not breaker.allow()
+
+
+def test_outcomes_outside_the_window_are_forgotten(clock):
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record(False)
+    clock[0] += 61
+    breaker.record(False)
+    assert breaker.closed
+
+
+def test_single_probe_after_backoff(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock[0] += 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN and breaker.probing
+    assert not breaker.allow()
+
+    breaker.record(True, probe=True)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_doubles_the_backoff(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    for backoff in (60, 120, 120):
+        clock[0] += breaker.backoff
+        assert breaker.allow()
+        breaker.record(False, probe=True)
+        assert breaker.state == OPEN
+        assert breaker.backoff == backoff
+
+
+def test_stale_in_flight_outcomes_do_not_settle_the_probe(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock[0] += 30
+    assert breaker.allow()
+
+    # Responses to requests sent before the breaker opened
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == HALF_OPEN and breaker.probing
+
+    breaker.record(False, probe=True)
+    assert breaker.state == OPEN
+
+
+def test_abandoned_probe_reopens(clock):
+    breaker = _breaker()
+    _trip(breaker)
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.abandon(probe=True)
+    assert breaker.state == OPEN
+    clock[0] += breaker.backoff
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize('per_window, expected', [(0.5, 2), (3.2, 4), (50, 4)])
+def test_scale_bounds_min_requests(per_window, expected):
+    breaker = _breaker()
+    breaker.scale(per_window)
+    assert breaker.min_requests == expected
+
+
+def test_scaled_breaker_trips_on_a_small_deployment(clock):
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=10, window=60, backoff=30, max_backoff=120)
+    # One batched request per 120s poll tick
+    breaker.scale(60 / 120)
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == OPEN
@@ -0,0 +1,70 @@
+import asyncio
+
+import aiosqlite
+import pytest
+
+from cogs.twitch.twitch_database import TwitchDatabase
+
+GUILD = 1
+LIVE = {'b03', 'b11', 'b17'}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database = TwitchDatabase()
+
+    async def setup():
+        await database.initialize()
+        await database.add_streamers(GUILD, [(f'b{i:02}', str(i)) for i in range(25)])
+        await database.add_streamers(GUILD + 1, [('elsewhere', '99')])
+        async with aiosqlite.connect(database.db_path) as conn:
+            await conn.executemany("UPDATE twitch_streamers SET is_live = 1 WHERE twitch_username = ?",
+                                   [(name,) for name in LIVE])
+            await conn.execute("INSERT INTO twitch_settings (guild_id, channel_id, games) VALUES (?, ?, ?)",
+                               (GUILD, 10, '{"1": "Assetto Corsa"}'))
+            await conn.commit()
+
+    asyncio.run(setup())
+    return database
+
+
+def _key(row):
+    username, is_live = row
+    return is_live, username
+
+
+def test_pages_cover_every_row_once_live_first(db):
+    async def run():
+        pages, after = [], None
+        while True:
+            page = await db.get_streamer_page(GUILD, 10, after=after)
+            if not page:
+                return pages
+            pages.append(page)
+            after = _key(page[-1])
+
+    pages = asyncio.run(run())
+    rows = [row for page in pages for row in page]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [name for name, _ in rows[:3]] == sorted(LIVE)
+    assert [name for name, _ in rows[3:]] == sorted({f'b{i:02}' for i in range(25)} - LIVE)
+
+
+def test_before_returns_the_previous_page_in_order(db):
+    async def run():
+        first = await db.get_streamer_page(GUILD, 10)
+        second = await db.get_streamer_page(GUILD, 10, after=_key(first[-1]))
+        back = await db.get_streamer_page(GUILD, 10, before=_key(second[0]))
+        return first, back
+
+    first, back = asyncio.run(run())
+    assert back == first
+
+
+def test_load_state_joins_streamers_to_configured_guilds(db):
+    settings, streamers = asyncio.run(db.load_state())
+    assert settings == [(GUILD, 10, None, {'1': "Assetto Corsa"}, None, None)]
+    # The second guild never ran /twitch setup
+    assert len(streamers) == 25
+    assert {row[0] for row in streamers} == {GUILD}
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import types
+
+import aiohttp
+
+from cogs.twitch import twitch_eventsub
+from cogs.twitch.twitch_eventsub import SUBSCRIPTION_TYPES, EventSubWebSocket
+
+
+class FakeHelix:
+    """Answers subscription requests with the queued statuses, then 202."""
+
+    def __init__(self, statuses=()):
+        self.breaker = types.SimpleNamespace(closed=True)
+        self.statuses = list(statuses)
+        self.posts = []
+        self.existing = []
+
+    async def helix_request(self, method, path, **kwargs):
+        await asyncio.sleep(0)
+        if method == 'POST':
+            self.posts.append(kwargs['json']['type'])
+            status = self.statuses.pop(0) if self.statuses else 202
+            return status, {'data': [{'id': f'sub{len(self.posts)}'}]} if status == 202 else None
+        if method == 'GET':
+            return 200, {'data': self.existing}
+        return 204, None
+
+
+class FakeSocket:
+    def __init__(self, messages=()):
+        self.closed = False
+        self.messages = list(messages)
+
+    async def receive(self, timeout=None):
+        return types.SimpleNamespace(type=aiohttp.WSMsgType.TEXT, data=json.dumps(self.messages.pop(0)))
+
+    async def close(self):
+        self.closed = True
+
+
+async def _noop(*args):
+    pass
+
+
+def _eventsub(helix, monitored=('100',)):
+    eventsub = EventSubWebSocket(helix, 'token', _noop, _noop)
+    eventsub.session_id = 'session'
+    eventsub._ws = FakeSocket()
+    eventsub.monitored = set(monitored)
+    return eventsub
+
+
+def test_concurrent_reconciles_subscribe_once():
+    async def run():
+        helix = FakeHelix()
+        eventsub = _eventsub(helix)
+        await asyncio.gather(*(eventsub._reconcile() for _ in range(3)))
+        return helix, eventsub
+
+    helix, eventsub = asyncio.run(run())
+    assert sorted(helix.posts) == sorted(SUBSCRIPTION_TYPES)
+    assert eventsub.covered_ids() == {'100'}
+
+
+def test_failed_subscribe_is_retried_with_backoff(monkeypatch):
+    monkeypatch.setattr(twitch_eventsub, 'SUBSCRIBE_RETRY_BASE', 0.01)
+
+    async def run():
+        helix = FakeHelix([500, 500])
+        eventsub = _eventsub(helix)
+        await eventsub._reconcile()
+        assert eventsub.covered_ids() == set()
+        failures, _ = eventsub._retry_at['100']
+        assert failures == 1
+        await asyncio.sleep(0.2)
+        covered = eventsub.covered_ids()
+        await eventsub.stop()
+        return helix, eventsub, covered
+
+    helix, eventsub, covered = asyncio.run(run())
+    assert covered == {'100'}
+    assert eventsub._retry_at == {}
+    assert eventsub._tasks == set()
+
+
+def test_conflict_records_the_existing_subscription():
+    async def run():
+        helix = FakeHelix([409])
+        helix.existing = [{'id': 'old', 'type': SUBSCRIPTION_TYPES[0], 'transport': {'session_id': 'session'}}]
+        eventsub = _eventsub(helix)
+        await eventsub._reconcile()
+        return eventsub
+
+    eventsub = asyncio.run(run())
+    assert eventsub.subscriptions['100'][SUBSCRIPTION_TYPES[0]] == 'old'
+    assert eventsub.covered_ids() == {'100'}
+    assert eventsub._retry_at == {}
+
+
+def test_failed_session_reconnect_closes_the_old_socket():
+    async def run():
+        eventsub = _eventsub(FakeHelix())
+        socket = FakeSocket([{
+            'metadata': {'message_type': 'session_reconnect'},
+            'payload': {'session': {'reconnect_url': 'wss://example.invalid'}},
+        }])
+
+        async def refuse(url, reconnect):
+            raise aiohttp.ClientError("refused")
+
+        eventsub._connect = refuse
+        try:
+            await eventsub._consume(socket)
+        except aiohttp.ClientError:
+            pass
+        return socket
+
+    assert asyncio.run(run()).closed
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+from cogs.twitch.twitch_config import (
+    TWITCH_POLL_ACTIVE_INTERVAL,
+    TWITCH_POLL_DORMANT_INTERVAL,
+    TWITCH_POLL_PUSHED_INTERVAL,
+)
+from cogs.twitch.twitch_poll_schedule import AdaptivePollScheduler, spread_offsets
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _scheduler(streamers):
+    scheduler = AdaptivePollScheduler()
+    scheduler.sync(streamers)
+    return scheduler
+
+
+def test_never_checked_streamers_are_due_first():
+    scheduler = _scheduler({'1': (False, NOW), '2': (False, NOW)})
+    scheduler.observe('1', False, NOW - timedelta(hours=1))
+    assert scheduler.due(NOW) == ['2', '1']
+
+
+def test_dark_streamers_decay_to_longer_intervals():
+    scheduler = _scheduler({'new': (False, None), 'dark': (False, NOW - timedelta(days=200, hours=6))})
+    assert scheduler.interval_for(scheduler.schedules['new'], NOW) == TWITCH_POLL_ACTIVE_INTERVAL
+    assert scheduler.interval_for(scheduler.schedules['dark'], NOW) == TWITCH_POLL_DORMANT_INTERVAL
+
+
+def test_pushed_streamers_are_still_polled_on_the_fallback_interval():
+    scheduler = _scheduler({'1': (False, NOW), '2': (False, NOW)})
+    scheduler.set_pushed(['1'])
+    assert scheduler.due(NOW) == ['1', '2']
+    scheduler.observe('1', False, NOW)
+    scheduler.observe('2', False, NOW)
+
+    assert scheduler.due(NOW + timedelta(seconds=TWITCH_POLL_ACTIVE_INTERVAL)) == ['2']
+    assert '1' in scheduler.due(NOW + timedelta(seconds=TWITCH_POLL_PUSHED_INTERVAL))
+
+    # Once live it is polled as usual for viewer and title updates
+    scheduler.observe('1', True, NOW)
+    assert '1' in scheduler.due(NOW + timedelta(seconds=TWITCH_POLL_ACTIVE_INTERVAL))
+
+
+def test_spare_batch_room_is_filled_with_the_soonest_due():
+    scheduler = _scheduler({str(i): (False, NOW) for i in range(5)})
+    for i in range(5):
+        scheduler.observe(str(i), False, NOW - timedelta(seconds=TWITCH_POLL_ACTIVE_INTERVAL - 10 * i))
+    due = scheduler.due(NOW, batch_size=4)
+    assert due == ['0', '1', '2', '3']
+
+
+def test_spread_offsets():
+    assert spread_offsets(1, 90, 0.5) == [0.0]
+    offsets = spread_offsets(3, 90, 0.5)
+    assert all(slot * 30 <= offset < slot * 30 + 15 for slot, offset in enumerate(offsets))
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from cogs.twitch.twitch_ratelimit import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, HelixRateLimiter
+
+
+def test_acquire_spends_tokens_without_waiting():
+    async def run():
+        limiter = HelixRateLimiter(limit=5, window=60)
+        for _ in range(5):
+            await asyncio.wait_for(limiter.acquire(), timeout=0.1)
+        assert limiter.tokens < 1
+
+    asyncio.run(run())
+
+
+def test_waiters_are_served_by_priority():
+    async def run():
+        limiter = HelixRateLimiter(limit=1, window=0.1)
+        await limiter.acquire()
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+
+        background = asyncio.create_task(request('background', PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request('interactive', PRIORITY_INTERACTIVE))
+        await asyncio.wait_for(asyncio.gather(background, interactive), timeout=1)
+        return order
+
+    assert asyncio.run(run()) == ['interactive', 'background']
+
+
+def test_headers_sync_the_bucket():
+    async def run():
+        limiter = HelixRateLimiter(limit=800, window=60)
+        limiter.update({'Ratelimit-Limit': '100', 'Ratelimit-Remaining': '7'})
+        assert limiter.limit == 100
+        assert 7 <= limiter.tokens < 8
+
+        reset = int(time.time()) + 30
+        limiter.update({'Ratelimit-Remaining': '0', 'Ratelimit-Reset': str(reset)})
+        assert limiter.blocked_until > time.monotonic() + 20
+
+    asyncio.run(run())
+
+
+def test_rate_limited_blocks_until_reset():
+    async def run():
+        limiter = HelixRateLimiter(limit=800, window=60)
+        delay = limiter.rate_limited({'Ratelimit-Reset': str(int(time.time()) + 10)})
+        assert 8 < delay <= 10
+        assert limiter.tokens < 1
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        assert limiter.pending == 1
+        waiter.cancel()
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_hands_back_granted_capacity():
+    async def run():
+        limiter = HelixRateLimiter(limit=1, window=0.1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        # The next caller still gets the refilled token
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+    asyncio.run(run())
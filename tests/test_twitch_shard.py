@@ -0,0 +1,64 @@
+import asyncio
+
+from cogs.twitch.twitch_shard import HASH_SPACE, ShardCoordinator, shard_hash
+
+USER_IDS = [str(user_id) for user_id in range(10000, 12000)]
+
+
+class FakeLeases:
+    def __init__(self, instances):
+        self.instances = instances
+        self.released = []
+
+    async def renew_poll_lease(self, instance_id, now, lease_seconds):
+        return sorted(self.instances)
+
+    async def release_poll_lease(self, instance_id):
+        self.released.append(instance_id)
+
+
+def _shard(leases, instance_id):
+    shard = ShardCoordinator(leases, instance_id, lease_seconds=360)
+    asyncio.run(shard.renew())
+    return shard
+
+
+def test_hash_is_stable_and_in_range():
+    assert shard_hash('12345') == shard_hash('12345')
+    assert all(0 <= shard_hash(user_id) < HASH_SPACE for user_id in USER_IDS)
+
+
+def test_disabled_coordinator_owns_everything():
+    shard = ShardCoordinator(None, None, lease_seconds=360)
+    assert not shard.enabled
+    assert asyncio.run(shard.renew()) is False
+    assert all(shard.owns(user_id) for user_id in USER_IDS)
+
+
+def test_instances_split_ids_into_disjoint_contiguous_ranges():
+    leases = FakeLeases(['a', 'b', 'c'])
+    shards = [_shard(leases, instance_id) for instance_id in ('a', 'b', 'c')]
+    assert [(shard.index, shard.count) for shard in shards] == [(0, 3), (1, 3), (2, 3)]
+
+    for user_id in USER_IDS:
+        owners = [shard.index for shard in shards if shard.owns(user_id)]
+        assert owners == [shard_hash(user_id) * 3 // HASH_SPACE]
+
+    # Each range gets a fair share
+    for shard in shards:
+        owned = sum(1 for user_id in USER_IDS if shard.owns(user_id))
+        assert 500 < owned < 830
+
+
+def test_expired_lease_is_absorbed_on_renewal():
+    leases = FakeLeases(['a', 'b', 'c'])
+    shard = _shard(leases, 'c')
+    assert (shard.index, shard.count) == (2, 3)
+
+    leases.instances = ['a', 'c']
+    assert asyncio.run(shard.renew()) is True
+    assert (shard.index, shard.count) == (1, 2)
+    assert asyncio.run(shard.renew()) is False
+
+    asyncio.run(shard.release())
+    assert leases.released == ['c']
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+
+from cogs.twitch.twitch_state import ENDING, LIVE, OFFLINE, StreamTracker
+
+T0 = datetime(2026, 1, 1, 20, 0, tzinfo=timezone.utc)
+
+
+def _tracker(grace=300):
+    tracker = StreamTracker(grace_seconds=grace)
+    tracker.add(1, 'racer', '100')
+    tracker.add(2, 'racer', '100')
+    return tracker
+
+
+def _announce(tracker, user_id, stream_id):
+    claimed = tracker.observe_live(user_id, stream_id)
+    for guild_id, _ in claimed:
+        tracker.mark_announced(user_id, guild_id, stream_id)
+    return claimed
+
+
+def test_go_live_returns_every_subscriber_once():
+    tracker = _tracker()
+    assert sorted(_announce(tracker, '100', 's1')) == [(1, 'racer'), (2, 'racer')]
+    assert tracker.get('100').state == LIVE
+    assert tracker.observe_live('100', 's1') == []
+
+
+def test_observe_live_claims_subscribers_until_released():
+    tracker = _tracker()
+    claimed = tracker.observe_live('100', 's1')
+    assert len(claimed) == 2
+    # A second observer while the announcement is being prepared gets nothing
+    assert tracker.observe_live('100', 's1') == []
+
+    tracker.mark_announced('100', 1, 's1')
+    tracker.release('100', 1)
+    tracker.release('100', 2)
+    assert tracker.observe_live('100', 's1') == [(2, 'racer')]
+
+
+def test_offline_within_grace_window_keeps_the_session():
+    tracker = _tracker()
+    _announce(tracker, '100', 's1')
+
+    assert tracker.observe_offline('100', T0) == []
+    assert tracker.get('100').state == ENDING
+    assert tracker.expire_ending(T0 + timedelta(seconds=299)) == []
+
+    # Back under a new stream ID after a dropped connection: not announced again
+    assert tracker.observe_live('100', 's2') == []
+    assert tracker.get('100').state == LIVE
+    assert tracker.expire_ending(T0 + timedelta(seconds=600)) == []
+
+
+def test_grace_window_expiry_ends_the_stream_and_records_the_session():
+    tracker = _tracker()
+    _announce(tracker, '100', 's1')
+    tracker.record_sample('100', {'viewer_count': 10, 'title': "Race", 'game_name': "AC",
+                                  'started_at': '2026-01-01T19:00:00Z'})
+    tracker.record_sample('100', {'viewer_count': 30, 'title': "Race", 'game_name': "AC"})
+
+    tracker.observe_offline('100', T0)
+    ended = tracker.expire_ending(T0 + timedelta(seconds=300))
+
+    assert sorted(ended) == [(1, 'racer'), (2, 'racer')]
+    assert tracker.get('100').state == OFFLINE
+    assert tracker.drain_ended() == ['100']
+    [session] = tracker.drain_sessions()
+    user_id, stream_id, started_at, ended_at, peak, average, title, game = session
+    assert (user_id, stream_id, ended_at, peak, average, title) == ('100', 's1', T0, 30, 20, "Race")
+    # A new stream after the session ended is announced again
+    assert len(tracker.observe_live('100', 's3')) == 2
+
+
+def test_no_grace_window_ends_immediately():
+    tracker = _tracker(grace=0)
+    _announce(tracker, '100', 's1')
+    assert sorted(tracker.observe_offline('100', T0)) == [(1, 'racer'), (2, 'racer')]
+    assert tracker.get('100').state == OFFLINE
+
+
+def test_reload_keeps_ending_state_and_claims_of_kept_ids():
+    tracker = _tracker()
+    _announce(tracker, '100', 's1')
+    tracker.observe_offline('100', T0)
+    tracker.add(3, 'other', '200')
+    assert tracker.observe_live('200', 'x1') == [(3, 'other')]
+
+    rows = [
+        (1, 'racer', '100', 1, 's1', None, None, None),
+        (2, 'racer', '100', 1, 's1', None, None, None),
+        (3, 'other', '200', 0, None, None, None, None),
+    ]
+    tracker.load([], rows, keep=['100', '200'])
+
+    assert tracker.get('100').state == ENDING
+    assert tracker.get('100').ending_since == T0
+    # The claim on the in-flight announcement survives the reload
+    assert tracker.observe_live('200', 'x1') == []
+
+
+def test_removing_the_last_subscriber_stops_tracking():
+    tracker = _tracker()
+    version = tracker.version
+    tracker.remove(1, 'racer')
+    assert '100' in tracker.streams
+    tracker.remove(2, 'racer')
+    assert '100' not in tracker.streams
+    assert tracker.version > version
+
+
+def test_game_filter_unions_guild_allowlists():
+    tracker = _tracker()
+    tracker.set_game_filter(1, ['a'])
+    assert tracker.game_filter('100') is None
+    tracker.set_game_filter(2, ['b'])
+    assert tracker.game_filter('100') == frozenset({'a', 'b'})
+    assert tracker.allows_game(1, 'a') and not tracker.allows_game(1, 'b')
@@ -0,0 +1,63 @@
+import pytest
+
+from cogs.twitch.twitch_templates import (
+    DEFAULT_MESSAGE,
+    MESSAGE_MAX_LENGTH,
+    AnnouncementTemplate,
+    compile_message,
+    parse_color,
+)
+
+USER = {'display_name': "Racer", 'login': 'racer', 'profile_image_url': None}
+STREAM = {
+    'title': "Nordschleife laps", 'game_name': "Assetto Corsa", 'viewer_count': 12,
+    'started_at': '2026-01-01T19:00:00Z', 'thumbnail_url': None,
+}
+
+
+def test_empty_message_uses_the_default():
+    assert compile_message(None) == DEFAULT_MESSAGE
+    assert compile_message("") == DEFAULT_MESSAGE
+
+
+def test_valid_message_is_kept():
+    message = "{mention} {streamer} is playing {game}: {title} {url}"
+    assert compile_message(message) == message
+
+
+@pytest.mark.parametrize('message, error', [
+    ("{viewers} watching", "Unknown placeholder {viewers}"),
+    ("{streamer", "unmatched"),
+    ("{streamer:>5000}", "format or conversion"),
+    ("{title!r}", "format or conversion"),
+    ("{0}", "Unknown placeholder"),
+    ("x" * (MESSAGE_MAX_LENGTH + 1), "at most"),
+])
+def test_invalid_messages_are_rejected(message, error):
+    with pytest.raises(ValueError, match=error):
+        compile_message(message)
+
+
+def test_parse_color():
+    assert parse_color(None) is None
+    assert parse_color("#9146FF") == 0x9146FF
+    assert parse_color("00ff00") == 0x00FF00
+    for color in ("purple", "#1000000"):
+        with pytest.raises(ValueError):
+            parse_color(color)
+
+
+def test_render_live_fills_the_content_format():
+    template = AnnouncementTemplate(None, None, 42, "{mention} {streamer} on {game}")
+    content, embed = template.render_live(USER, STREAM)
+    assert content == "<@&42> Racer on Assetto Corsa"
+    assert embed.url == "https://twitch.tv/racer"
+    assert [field.name for field in embed.fields] == ["Game", "Viewers", "Started"]
+
+
+def test_render_digest_summarises_long_lists():
+    template = AnnouncementTemplate(None, None, None)
+    announcements = [{'user_info': USER, 'stream_status': STREAM}] * 25
+    content, embed = template.render_digest(announcements)
+    assert content == "**25 streamers** are now live! 🎮"
+    assert embed.description.endswith("…and 5 more")
@@ -0,0 +1,184 @@
+"""
+Twitch Poller Benchmark
+
+Runs the real ``TwitchAnnounceHandler`` poll cycle against ``MockHelixServer``
+for growing numbers of monitored streamers and reports, per cycle, the Helix
+requests made, 429s received, wall time and memory. The first cycle checks
+every streamer (none has been checked yet); later cycles advance the schedule
+and both rate limit buckets by one poll interval and churn the live set in
+between, so they show the steady state.
+
+    python tools/bench_twitch_poller.py
+    python tools/bench_twitch_poller.py --sizes 1000 10000 50000 --cycles 3 --latency 0.05
+    python tools/bench_twitch_poller.py --trace-memory
+    python tools/bench_twitch_poller.py --sizes 10000 --paced
+
+Batches are sent back to back unless --paced is given, so wall time measures
+throughput rather than TWITCH_POLL_SPREAD pacing.
+
+Announcements are rendered and queued as usual but never reach Discord: the
+benchmark bot is not connected, so the dispatcher drops them.
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tools'))
+
+# Streamers per simulated guild
+GUILD_SIZE = 100
+
+
+def _rss_mb() -> float:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _seed_database(db_path: str, size: int) -> None:
+    import aiosqlite
+
+    guilds = range(1, (size + GUILD_SIZE - 1) // GUILD_SIZE + 1)
+    async with aiosqlite.connect(db_path) as db:
+        await db.executemany(
+            "INSERT INTO twitch_settings (guild_id, channel_id, role_id) VALUES (?, ?, NULL)",
+            [(guild_id, 1000 + guild_id) for guild_id in guilds]
+        )
+        await db.executemany(
+            "INSERT INTO twitch_streamers (guild_id, twitch_username, twitch_user_id) VALUES (?, ?, ?)",
+            [((i - 1) // GUILD_SIZE + 1, f'user{i}', str(i)) for i in range(1, size + 1)]
+        )
+        await db.commit()
+
+
+def _advance_clock(handler, server, seconds: float) -> None:
+    """Make ``seconds`` pass for the schedule and both rate limiters."""
+    for schedule in handler.schedule.schedules.values():
+        if schedule.next_due:
+            schedule.next_due -= timedelta(seconds=seconds)
+    limiter = handler.client.limiter
+    limiter.tokens = min(float(limiter.limit), limiter.tokens + seconds * limiter.limit / limiter.window)
+    server.advance(seconds)
+
+
+async def bench_size(size: int, args) -> None:
+    import discord
+    from aiohttp import web
+    from discord.ext import commands
+
+    from cogs.twitch.twitch_announce_handler import TwitchAnnounceHandler
+    from cogs.twitch.twitch_config import TWITCH_POLL_INTERVAL
+    from mock_helix import MockHelixServer
+
+    server = MockHelixServer(
+        size, args.live_fraction, args.churn, args.latency,
+        args.rate_limit, args.rate_window, seed=size
+    )
+    runner = web.AppRunner(server.build_app())
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.port).start()
+
+    workdir = tempfile.mkdtemp(prefix='twitch-bench-')
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    handler = None
+    try:
+        bot = commands.Bot(command_prefix='!', intents=discord.Intents.none())
+        handler = TwitchAnnounceHandler(bot)
+        handler.check_live_streams.cancel()
+        await handler.db.initialize()
+        await _seed_database(handler.db.db_path, size)
+
+        started = time.perf_counter()
+        rss_before = _rss_mb()
+        await handler.cog_load()
+        print(f"\n{size:,} streamers ({len(server.live):,} live): "
+              f"loaded in {time.perf_counter() - started:.2f}s, +{_rss_mb() - rss_before:.1f} MB")
+        print(f"{'cycle':>5} {'checked':>8} {'requests':>8} {'429s':>5} {'wall s':>7} {'rss MB':>7} {'peak MB':>8}")
+
+        for cycle in range(1, args.cycles + 1):
+            if cycle > 1:
+                server.churn()
+                _advance_clock(handler, server, TWITCH_POLL_INTERVAL)
+
+            requests_before = sum(count for endpoint, count in server.requests.items() if endpoint != '429')
+            rate_limited_before = server.requests['429']
+            if args.trace_memory:
+                tracemalloc.reset_peak()
+
+            cycle_start = datetime.now(timezone.utc)
+            started = time.perf_counter()
+            await handler.check_live_streams()
+            wall = time.perf_counter() - started
+
+            requests = sum(count for endpoint, count in server.requests.items() if endpoint != '429') - requests_before
+            checked = sum(
+                1 for schedule in handler.schedule.schedules.values()
+                if schedule.last_checked and schedule.last_checked >= cycle_start
+            )
+            peak = f"{tracemalloc.get_traced_memory()[1] / 2 ** 20:8.1f}" if args.trace_memory else f"{'-':>8}"
+            print(f"{cycle:>5} {checked:>8,} {requests:>8,} "
+                  f"{server.requests['429'] - rate_limited_before:>5} {wall:>7.2f} {_rss_mb():>7.1f} {peak}")
+    finally:
+        if handler:
+            await handler.cog_unload()
+        await runner.cleanup()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def run(args) -> None:
+    if args.trace_memory:
+        tracemalloc.start()
+    for size in args.sizes:
+        await bench_size(size, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the Twitch poller against a mock Helix server.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--port', type=int, default=8091)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=800)
+    parser.add_argument('--rate-window', type=float, default=60.0)
+    parser.add_argument('--live-fraction', type=float, default=0.05)
+    parser.add_argument('--churn', type=float, default=0.1)
+    parser.add_argument('--budget', type=int, help='Helix requests per cycle (TWITCH_POLL_REQUEST_BUDGET)')
+    parser.add_argument('--paced', action='store_true',
+                        help='Spread batches over the poll interval as in production (cycles take minutes)')
+    parser.add_argument('--trace-memory', action='store_true', help='Report tracemalloc peak per cycle (slower)')
+    args = parser.parse_args()
+
+    # Settings are read at import time, so point the client at the mock first
+    base = f"http://127.0.0.1:{args.port}"
+    os.environ.update(
+        TWITCH_API_BASE=base,
+        TWITCH_OAUTH_URL=f"{base}/oauth2/token",
+        TWITCH_CLIENT_ID='bench',
+        TWITCH_CLIENT_SECRET='bench',
+    )
+    os.environ.pop('TWITCH_EVENTSUB_TOKEN', None)
+    os.environ.pop('TWITCH_METRICS_FILE', None)
+    if not args.paced:
+        os.environ['TWITCH_POLL_SPREAD'] = '0'
+    if args.budget:
+        os.environ['TWITCH_POLL_REQUEST_BUDGET'] = str(args.budget)
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Mock EventSub Server
+
+Local stand-in for Twitch's EventSub WebSocket service, used to exercise the
+bot's push mode without real credentials. It serves:
+
+    GET    /ws                          EventSub WebSocket (welcome + keepalives)
+    POST   /eventsub/subscriptions      create a websocket subscription
+    DELETE /eventsub/subscriptions      delete a subscription (?id=)
+    POST   /oauth2/token                app access token
+    GET    /streams, /users             minimal Helix lookups for triggered streams
+
+Control endpoints drive the scenario:
+
+    POST /trigger/online?user_id=123    broadcaster goes live (sends stream.online)
+    POST /trigger/offline?user_id=123   broadcaster ends stream (sends stream.offline)
+    POST /trigger/reconnect             send session_reconnect to every session
+    POST /trigger/drop                  close every socket without warning
+
+Run it and point the bot at it:
+
+    python tools/mock_eventsub.py --port 8080
+    TWITCH_EVENTSUB_WS_URL=ws://127.0.0.1:8080/ws
+    TWITCH_API_BASE=http://127.0.0.1:8080
+    TWITCH_OAUTH_URL=http://127.0.0.1:8080/oauth2/token
+    TWITCH_EVENTSUB_TOKEN=mock
+"""
+
+import argparse
+import asyncio
+import itertools
+import uuid
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+MAX_TOTAL_COST = 10
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _message(message_type: str, payload: dict, subscription_type: str = None) -> dict:
+    metadata = {
+        'message_id': str(uuid.uuid4()),
+        'message_type': message_type,
+        'message_timestamp': _now()
+    }
+    if subscription_type:
+        metadata['subscription_type'] = subscription_type
+        metadata['subscription_version'] = '1'
+    return {'metadata': metadata, 'payload': payload}
+
+
+class MockEventSubServer:
+    """In-memory EventSub WebSocket service with a minimal Helix surface."""
+
+    def __init__(self, keepalive_seconds: int = 10, max_total_cost: int = MAX_TOTAL_COST) -> None:
+        self.keepalive_seconds = keepalive_seconds
+        self.max_total_cost = max_total_cost
+        self.sockets = {}
+        self.subscriptions = {}
+        self.live = {}
+        self._stream_ids = itertools.count(1000)
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/ws', self.handle_ws)
+        app.router.add_post('/eventsub/subscriptions', self.create_subscription)
+        app.router.add_delete('/eventsub/subscriptions', self.delete_subscription)
+        app.router.add_post('/oauth2/token', self.issue_token)
+        app.router.add_get('/streams', self.get_streams)
+        app.router.add_get('/users', self.get_users)
+        app.router.add_post('/trigger/online', self.trigger_online)
+        app.router.add_post('/trigger/offline', self.trigger_offline)
+        app.router.add_post('/trigger/reconnect', self.trigger_reconnect)
+        app.router.add_post('/trigger/drop', self.trigger_drop)
+        return app
+
+    async def handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        # A reconnect URL carries the old session ID so subscriptions move over
+        session_id = request.query.get('session') or str(uuid.uuid4())
+        self.sockets[session_id] = ws
+        await ws.send_json(_message('session_welcome', {
+            'session': {
+                'id': session_id,
+                'status': 'connected',
+                'keepalive_timeout_seconds': self.keepalive_seconds,
+                'reconnect_url': None,
+                'connected_at': _now()
+            }
+        }))
+
+        keepalive = asyncio.create_task(self._keepalive(ws))
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            keepalive.cancel()
+            if self.sockets.get(session_id) is ws:
+                del self.sockets[session_id]
+                self.subscriptions = {
+                    sub_id: sub for sub_id, sub in self.subscriptions.items()
+                    if sub['transport']['session_id'] != session_id
+                }
+        return ws
+
+    async def _keepalive(self, ws: web.WebSocketResponse) -> None:
+        while not ws.closed:
+            await asyncio.sleep(self.keepalive_seconds / 2)
+            if not ws.closed:
+                await ws.send_json(_message('session_keepalive', {}))
+
+    async def create_subscription(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        session_id = body.get('transport', {}).get('session_id')
+        if session_id not in self.sockets:
+            return web.json_response({'error': 'Bad Request', 'message': 'unknown session'}, status=400)
+
+        session_subs = [
+            sub for sub in self.subscriptions.values()
+            if sub['transport']['session_id'] == session_id
+        ]
+        if len(session_subs) >= self.max_total_cost:
+            return web.json_response(
+                {'error': 'Too Many Requests', 'message': 'max total cost exceeded'},
+                status=429, headers={'Ratelimit-Remaining': '799'}
+            )
+
+        subscription = {
+            'id': str(uuid.uuid4()),
+            'status': 'enabled',
+            'type': body['type'],
+            'version': body.get('version', '1'),
+            'condition': body['condition'],
+            'transport': {'method': 'websocket', 'session_id': session_id},
+            'created_at': _now(),
+            'cost': 1
+        }
+        self.subscriptions[subscription['id']] = subscription
+        return web.json_response({
+            'data': [subscription],
+            'total': len(self.subscriptions),
+            'total_cost': len(session_subs) + 1,
+            'max_total_cost': self.max_total_cost
+        }, status=202)
+
+    async def delete_subscription(self, request: web.Request) -> web.Response:
+        if self.subscriptions.pop(request.query.get('id'), None) is None:
+            return web.json_response({'error': 'Not Found'}, status=404)
+        return web.Response(status=204)
+
+    async def issue_token(self, request: web.Request) -> web.Response:
+        return web.json_response({'access_token': 'mock-token', 'expires_in': 3600, 'token_type': 'bearer'})
+
+    async def get_streams(self, request: web.Request) -> web.Response:
+        user_ids = request.query.getall('user_id', [])
+        return web.json_response({'data': [self.live[uid] for uid in user_ids if uid in self.live]})
+
+    async def get_users(self, request: web.Request) -> web.Response:
+        users = [
+            {'id': uid, 'login': f'user{uid}', 'display_name': f'User{uid}', 'profile_image_url': ''}
+            for uid in request.query.getall('id', [])
+        ]
+        users += [
+            {'id': login[4:], 'login': login, 'display_name': login.title(), 'profile_image_url': ''}
+            for login in request.query.getall('login', []) if login.startswith('user')
+        ]
+        return web.json_response({'data': users})
+
+    async def trigger_online(self, request: web.Request) -> web.Response:
+        user_id = request.query['user_id']
+        stream_id = str(next(self._stream_ids))
+        self.live[user_id] = {
+            'id': stream_id,
+            'user_id': user_id,
+            'user_login': f'user{user_id}',
+            'user_name': f'User{user_id}',
+            'game_name': 'Assetto Corsa',
+            'title': 'Mock stream',
+            'viewer_count': 1,
+            'started_at': _now(),
+            'thumbnail_url': ''
+        }
+        sent = await self._notify('stream.online', user_id, {
+            'id': stream_id,
+            'broadcaster_user_id': user_id,
+            'broadcaster_user_login': f'user{user_id}',
+            'broadcaster_user_name': f'User{user_id}',
+            'type': 'live',
+            'started_at': self.live[user_id]['started_at']
+        })
+        return web.json_response({'notified': sent})
+
+    async def trigger_offline(self, request: web.Request) -> web.Response:
+        user_id = request.query['user_id']
+        self.live.pop(user_id, None)
+        sent = await self._notify('stream.offline', user_id, {
+            'broadcaster_user_id': user_id,
+            'broadcaster_user_login': f'user{user_id}',
+            'broadcaster_user_name': f'User{user_id}'
+        })
+        return web.json_response({'notified': sent})
+
+    async def trigger_reconnect(self, request: web.Request) -> web.Response:
+        base = f"ws://{request.host}/ws"
+        for session_id, ws in list(self.sockets.items()):
+            await ws.send_json(_message('session_reconnect', {
+                'session': {
+                    'id': session_id,
+                    'status': 'reconnecting',
+                    'keepalive_timeout_seconds': None,
+                    'reconnect_url': f"{base}?session={session_id}",
+                    'connected_at': _now()
+                }
+            }))
+        return web.json_response({'sessions': len(self.sockets)})
+
+    async def trigger_drop(self, request: web.Request) -> web.Response:
+        count = len(self.sockets)
+        for ws in list(self.sockets.values()):
+            await ws.close()
+        return web.json_response({'dropped': count})
+
+    async def _notify(self, subscription_type: str, user_id: str, event: dict) -> int:
+        sent = 0
+        for subscription in list(self.subscriptions.values()):
+            if subscription['type'] != subscription_type:
+                continue
+            if subscription['condition'].get('broadcaster_user_id') != user_id:
+                continue
+            ws = self.sockets.get(subscription['transport']['session_id'])
+            if ws is None or ws.closed:
+                continue
+            await ws.send_json(_message('notification', {
+                'subscription': subscription,
+                'event': event
+            }, subscription_type))
+            sent += 1
+        return sent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run a local mock EventSub server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--keepalive', type=int, default=10)
+    args = parser.parse_args()
+    web.run_app(MockEventSubServer(args.keepalive).build_app(), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Mock Helix Server
+
+Local stand-in for the Twitch Helix API and OAuth endpoint, sized for load
+testing the poller. It simulates a population of ``userN`` accounts, a share
+of which are live at any time, and serves:
+
+    POST /oauth2/token      app access token
+    GET  /users             lookup by ?login=userN or ?id=N (up to 100 each)
+    GET  /streams           live streams among ?user_id= (up to 100), optionally ?game_id=
+    GET  /games             lookup by ?name= among GAMES
+    GET  /stats             request counts per endpoint, as JSON
+
+Behaviour is configurable:
+
+    --latency 0.05          seconds added to every Helix response
+    --rate-limit 800        requests per --rate-window seconds before 429s
+    --live-fraction 0.05    share of the population live at any time
+    --churn 0.1             share of the live set replaced every --churn-interval
+
+Run it and point the bot at it:
+
+    python tools/mock_helix.py --port 8090 --population 10000
+    TWITCH_API_BASE=http://127.0.0.1:8090
+    TWITCH_OAUTH_URL=http://127.0.0.1:8090/oauth2/token
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+HELIX_BATCH_SIZE = 100
+
+# Simulated categories; live streams pick one at random
+GAMES = {'1001': 'Assetto Corsa', '1002': 'Just Chatting'}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+class MockHelixServer:
+    """Helix ``/users`` and ``/streams`` over a simulated streamer population."""
+
+    def __init__(self, population: int = 10000, live_fraction: float = 0.05, churn: float = 0.1,
+                 latency: float = 0.0, rate_limit: int = 800, rate_window: float = 60.0,
+                 seed: int = None) -> None:
+        self.population = population
+        self.live_fraction = live_fraction
+        self.churn_fraction = churn
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.requests = Counter()
+        self.live = {}
+        self._random = random.Random(seed)
+        self._stream_ids = itertools.count(1000)
+        self._tokens = float(rate_limit)
+        self._refilled = time.monotonic()
+        self._go_live(self._random.sample(range(1, population + 1), int(population * live_fraction)))
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/oauth2/token', self.issue_token)
+        app.router.add_get('/users', self.get_users)
+        app.router.add_get('/streams', self.get_streams)
+        app.router.add_get('/games', self.get_games)
+        app.router.add_get('/stats', self.get_stats)
+        return app
+
+    def churn(self) -> None:
+        """Replace a share of the live set: some streams end, others start."""
+        count = int(len(self.live) * self.churn_fraction)
+        for user_id in self._random.sample(sorted(self.live), min(count, len(self.live))):
+            del self.live[user_id]
+        offline = self.population - len(self.live)
+        starting = set()
+        while len(starting) < min(count, offline):
+            user_id = str(self._random.randint(1, self.population))
+            if user_id not in self.live:
+                starting.add(user_id)
+        self._go_live(starting)
+
+    def advance(self, seconds: float) -> None:
+        """Refill the rate limit bucket as if ``seconds`` had passed."""
+        self._tokens = min(self.rate_limit, self._tokens + seconds * self.rate_limit / self.rate_window)
+
+    async def run_churn(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.churn()
+
+    def _go_live(self, user_ids) -> None:
+        for user_id in user_ids:
+            user_id = str(user_id)
+            game_id = self._random.choice(sorted(GAMES))
+            self.live[user_id] = {
+                'id': str(next(self._stream_ids)),
+                'user_id': user_id,
+                'user_login': f'user{user_id}',
+                'user_name': f'User{user_id}',
+                'game_id': game_id,
+                'game_name': GAMES[game_id],
+                'title': 'Mock stream',
+                'viewer_count': self._random.randint(1, 500),
+                'started_at': _now(),
+                'thumbnail_url': ''
+            }
+
+    def _take_token(self) -> dict:
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit / self.rate_window)
+        self._refilled = now
+        allowed = self._tokens >= 1
+        if allowed:
+            self._tokens -= 1
+        reset = int(time.time() + (self.rate_limit - self._tokens) * self.rate_window / self.rate_limit)
+        return {
+            'allowed': allowed,
+            'headers': {
+                'Ratelimit-Limit': str(self.rate_limit),
+                'Ratelimit-Remaining': str(int(self._tokens)),
+                'Ratelimit-Reset': str(reset)
+            }
+        }
+
+    async def _helix(self, endpoint: str, data) -> web.Response:
+        self.requests[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        bucket = self._take_token()
+        if not bucket['allowed']:
+            self.requests['429'] += 1
+            return web.json_response(
+                {'error': 'Too Many Requests', 'status': 429, 'message': ''},
+                status=429, headers=bucket['headers']
+            )
+        return web.json_response({'data': data()}, headers=bucket['headers'])
+
+    async def issue_token(self, request: web.Request) -> web.Response:
+        self.requests['oauth2/token'] += 1
+        return web.json_response({'access_token': 'mock-token', 'expires_in': 3600, 'token_type': 'bearer'})
+
+    async def get_users(self, request: web.Request) -> web.Response:
+        def users():
+            ids = request.query.getall('id', [])[:HELIX_BATCH_SIZE]
+            ids += [
+                login[4:] for login in request.query.getall('login', [])[:HELIX_BATCH_SIZE]
+                if login.startswith('user') and login[4:].isdigit()
+            ]
+            return [
+                {'id': uid, 'login': f'user{uid}', 'display_name': f'User{uid}', 'profile_image_url': ''}
+                for uid in ids if uid.isdigit() and 1 <= int(uid) <= self.population
+            ]
+        return await self._helix('users', users)
+
+    async def get_streams(self, request: web.Request) -> web.Response:
+        def streams():
+            user_ids = request.query.getall('user_id', [])[:HELIX_BATCH_SIZE]
+            game_ids = set(request.query.getall('game_id', []))
+            return [
+                self.live[uid] for uid in user_ids
+                if uid in self.live and (not game_ids or self.live[uid]['game_id'] in game_ids)
+            ]
+        return await self._helix('streams', streams)
+
+    async def get_games(self, request: web.Request) -> web.Response:
+        def games():
+            names = {name.lower() for name in request.query.getall('name', [])[:HELIX_BATCH_SIZE]}
+            return [{'id': game_id, 'name': name} for game_id, name in GAMES.items() if name.lower() in names]
+        return await self._helix('games', games)
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({'requests': dict(self.requests), 'live': len(self.live)})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run a local mock Helix server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--population', type=int, default=10000)
+    parser.add_argument('--live-fraction', type=float, default=0.05)
+    parser.add_argument('--churn', type=float, default=0.1)
+    parser.add_argument('--churn-interval', type=float, default=60.0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=int, default=800)
+    parser.add_argument('--rate-window', type=float, default=60.0)
+    args = parser.parse_args()
+
+    server = MockHelixServer(
+        args.population, args.live_fraction, args.churn,
+        args.latency, args.rate_limit, args.rate_window
+    )
+    app = server.build_app()
+
+    async def start_churn(app):
+        app['churn'] = asyncio.create_task(server.run_churn(args.churn_interval))
+
+    async def stop_churn(app):
+        app['churn'].cancel()
+
+    app.on_startup.append(start_churn)
+    app.on_cleanup.append(stop_churn)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()